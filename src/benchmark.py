@@ -0,0 +1,285 @@
+"""
+Benchmarks of the simulation hot paths on synthetic networks, to know whether an optimization actually helped
+    - a case is one synthetic letters -> words network: words, letters, max_delay, corpus_length,
+      the delay implementation (history: `delay.SynapseDelay`, weight: `weight_effect_delay.SynapseDelay`)
+      and the connectivity (dense | words, see `make_connectivity`)
+    - scaling curves: every axis is swept on its own around the base case, with each delay and connectivity
+    - timed: the whole step (`simulate_iteration`, mean and p99 over `steps * repeats` steps) and every behaviour alone
+      (median of its `new_iteration`, see `BehaviourProfiler`)
+    - the results are saved as a json baseline, `compare` flags the timings slower than the baseline by `tolerance`
+      and exits with 1 when there is any
+
+python -m src.benchmark run --output out/benchmarks/baseline.json
+python -m src.benchmark run --output out/benchmarks/current.json --axes words --steps 200
+python -m src.benchmark compare out/benchmarks/baseline.json out/benchmarks/current.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import string
+import sys
+import time
+
+import numpy as np
+
+BASE_CASE = {"words": 16, "letters": 26, "max_delay": 4, "corpus_length": 5000}
+AXES = {
+    "words": [4, 16, 64, 256],
+    "letters": [8, 26, 64],
+    "max_delay": [1, 4, 8, 16],
+    "corpus_length": [1000, 5000, 50000],
+}
+DELAYS = ["history", "weight"]
+CONNECTIVITIES = ["dense", "words"]
+
+
+def make_alphabet(size):
+    """the lowercase letters first, then other (unicode) letters"""
+    extra = "".join(chr(0x100 + i) for i in range(max(0, size - 26)))
+    return (string.ascii_lowercase + extra)[:size]
+
+
+def make_corpus(words_count, letters, length, gap=7, seed=42):
+    """random words of 3 to 5 letters and their `length` steps long joined corpus"""
+    random = np.random.default_rng(seed)
+    words = []
+    while len(words) < words_count:
+        word = "".join(random.choice(list(letters), random.integers(3, 6)))
+        if word not in words:
+            words.append(word)
+
+    corpus = []
+    while (len(corpus) + 1) * (5 + gap) < length:
+        corpus.append(words[random.integers(words_count)])
+    return words, corpus
+
+
+def make_benchmark_network(case):
+    """the network of a case and the steps of its stream (shorter than `corpus_length`)"""
+    from PymoNNto import Network, NeuronGroup, SynapseGroup
+    from src.core.learning.connectivity import make_connectivity
+    from src.core.learning.delay import SynapseDelay
+    from src.core.learning.reinforcement import Supervisor
+    from src.core.learning.stdp import SynapsePairWiseSTDP
+    from src.core.learning.weight_effect_delay import (
+        SynapseDelay as WeightEffectSynapseDelay,
+    )
+    from src.core.metrics.metrics import Metrics
+    from src.core.neurons.current import CurrentStimulus
+    from src.core.neurons.neurons import StreamableLIFNeurons
+    from src.core.neurons.trace import TraceHistory
+    from src.core.stabilizer.activity_base_homeostasis import ActivityBaseHomeostasis
+    from src.core.stabilizer.winner_take_all import WinnerTakeAll
+    from src.data.spike_generator import encode_labels, encode_spikes
+    from src.helpers.base import reset_random_seed
+
+    reset_random_seed()
+    letters = make_alphabet(case["letters"])
+    words, corpus = make_corpus(case["words"], letters, case["corpus_length"])
+    gap = 7
+    text = "".join(word + " " * gap for word in corpus)
+    spikes, labels = encode_spikes(text, letters), encode_labels(corpus, words, gap)
+    max_delay = case["max_delay"]
+    delay = {"history": SynapseDelay, "weight": WeightEffectSynapseDelay}[case["delay"]]
+    lif_base = {"v_rest": -65, "v_reset": -65, "threshold": -55, "dt": 1.0, "tau": 7}
+
+    network = Network()
+    letters_ng = NeuronGroup(
+        net=network,
+        tag="letters",
+        size=len(letters),
+        behaviour={
+            1: StreamableLIFNeurons(stream=spikes, **lif_base),
+            2: TraceHistory(max_delay=max_delay),
+        },
+    )
+    words_ng = NeuronGroup(
+        net=network,
+        tag="words",
+        size=len(words),
+        behaviour={
+            2: CurrentStimulus(
+                adaptive_noise_scale=0.9,
+                noise_scale_factor=0.1,
+                synapse_lens_selector=["GLUTAMATE", 0],
+            ),
+            3: StreamableLIFNeurons(
+                **lif_base, has_long_term_effect=True, capture_old_v=True
+            ),
+            4: TraceHistory(max_delay=max_delay),
+            5: ActivityBaseHomeostasis(
+                window_size=1000, updating_rate=0.01, activity_rate=80
+            ),
+            6: WinnerTakeAll(),
+            7: Supervisor(dopamine_decay=1 / (max_delay + 1), outputs=labels),
+            9: Metrics(words=words, outputs=labels),
+        },
+    )
+    synapse = SynapseGroup(
+        net=network,
+        src=letters_ng,
+        dst=words_ng,
+        tag="GLUTAMATE",
+        behaviour={
+            1: delay(max_delay=max_delay, mode="random", use_shared_weights=False),
+            8: SynapsePairWiseSTDP(
+                tau_plus=4.0,
+                tau_minus=4.0,
+                a_plus=0.2,
+                a_minus=-0.1,
+                delay_a_plus=0.2,
+                delay_a_minus=-0.5,
+                w_min=0,
+                w_max=4.0,
+                min_delay_threshold=1,
+                weight_decay=0.999,
+                stdp_factor=0.02,
+                max_delay=max_delay,
+                delay_factor=0.02,
+            ),
+        },
+    )
+    synapse.connectivity = make_connectivity(
+        case["connectivity"], len(words), len(letters), words=words, letters=letters
+    )
+    network.initialize(info=False)
+    return network, len(spikes)
+
+
+def benchmark_case(case, steps=500, repeats=5, warmup=50):
+    """`{step_us, step_p99_us, behaviours: {name: median_us}}` of a case"""
+    from src.helpers.profiler import BehaviourProfiler
+
+    network, stream_length = make_benchmark_network(case)
+    steps = min(steps, (stream_length - warmup) // repeats - 1)
+    network.simulate_iterations(warmup, measure_block_time=False)
+
+    step_times = np.empty(steps * repeats)
+    for step in range(len(step_times)):
+        start = time.perf_counter_ns()
+        network.simulate_iteration()
+        step_times[step] = (time.perf_counter_ns() - start) / 1000
+
+    # timed apart, the profiler itself slows the whole step down
+    network.iteration = warmup
+    profiler = BehaviourProfiler(network).attach()
+    network.simulate_iterations(len(step_times), measure_block_time=False)
+    profiler.detach()
+    report = profiler.report()
+    return {
+        "step_us": float(step_times.mean()),
+        "step_p99_us": float(np.percentile(step_times, 99)),
+        "behaviours": dict(zip(report["behaviour"], report["median_us"].astype(float))),
+    }
+
+
+def benchmark_cases(axes=None, delays=DELAYS, connectivities=CONNECTIVITIES):
+    """the base case and every value of the axes, each with every delay and connectivity"""
+    points = [BASE_CASE]
+    for axis in axes or AXES:
+        points += [{**BASE_CASE, axis: v} for v in AXES[axis] if v != BASE_CASE[axis]]
+    for point in points:
+        for delay in delays:
+            for connectivity in connectivities:
+                yield {**point, "delay": delay, "connectivity": connectivity}
+
+
+def case_key(case):
+    return ",".join(f"{name}={case[name]}" for name in sorted(case))
+
+
+def run(output, axes=None, steps=500, repeats=5):
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    from src.configs import feature_flags
+    from src.configs.plotters import disable_plotters
+
+    feature_flags.enable_cm_plot = False
+    feature_flags.enable_metric_logs = False
+    disable_plotters()
+
+    results = {}
+    for case in benchmark_cases(axes):
+        results[case_key(case)] = {
+            "case": case,
+            **benchmark_case(case, steps=steps, repeats=repeats),
+        }
+        print(
+            f"[benchmark] {case_key(case)}: {results[case_key(case)]['step_us']:.1f}us"
+        )
+
+    baseline = {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+        },
+        "steps": steps,
+        "repeats": repeats,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(baseline, file, indent=2)
+    return baseline
+
+
+def compare(baseline, current, tolerance=0.2, min_difference_us=1.0):
+    """
+    `(case, timing, baseline_us, current_us, ratio)` of the timings slower than the baseline by `tolerance`
+        - min_difference_us: smaller slowdowns are the noise of the clock (e.g. the tiny behaviours)
+    """
+    regressions = []
+    for key, result in current["results"].items():
+        if key not in baseline["results"]:
+            continue
+        expected = baseline["results"][key]
+        timings = [("step", expected["step_us"], result["step_us"])]
+        timings += [
+            (name, expected["behaviours"][name], value)
+            for name, value in result["behaviours"].items()
+            if name in expected["behaviours"]
+        ]
+        for timing, before, after in timings:
+            ratio = after / before if before > 0 else np.inf
+            if ratio > 1 + tolerance and after - before > min_difference_us:
+                regressions.append((key, timing, before, after, ratio))
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--output", default="out/benchmarks/current.json")
+    run_parser.add_argument("--axes", nargs="+", choices=list(AXES), default=None)
+    run_parser.add_argument("--steps", type=int, default=500)
+    run_parser.add_argument("--repeats", type=int, default=5)
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--tolerance", type=float, default=0.2)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "run":
+        run(args.output, axes=args.axes, steps=args.steps, repeats=args.repeats)
+    else:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        with open(args.current) as file:
+            current = json.load(file)
+        regressions = compare(baseline, current, args.tolerance)
+        for key, timing, before, after, ratio in regressions:
+            print(
+                f"[benchmark] {key} {timing}: {before:.1f}us -> {after:.1f}us (x{ratio:.2f})"
+            )
+        print(f"[benchmark] {len(regressions)} regressions over {args.tolerance:.0%}")
+        sys.exit(1 if regressions else 0)
@@ -7,3 +7,9 @@ words = ["arc", "car"]
 words_capture_window_size = words_spacing_gap + max(map(len, words))
 words_average_size_occupation = words_spacing_gap + sum(map(len, words)) / len(words)
 UNK = "UNK"
+# None: a brand new corpus every run, int: the seeded corpus cached on disk (see src.data.cache)
+corpus_seed = None
+# plain text file to train on (see src.data.text_corpus), None for the generated corpus of the words above
+text_corpus_path = None
+text_min_count = 5
+text_vocabulary_size = None
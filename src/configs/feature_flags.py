@@ -6,3 +6,20 @@ enable_metric_logs = False
 enable_neuron_reset_factory = False
 enabled_c_profiler = False
 enable_plotter = True
+enable_event_driven_simulation = False
+# render the plots and exports in a background thread (see src.core.visualizer.plot_worker)
+enable_async_plotter = False
+# save the figures into out/plots instead of showing them, e.g. on servers
+headless_plotter = False
+async_plotter_queue_size = 64
+# append the recorder series to one chunked store instead of csv files (see src.core.visualizer.telemetry)
+enable_telemetry = False
+telemetry_directory = "out/telemetry"
+# time every behaviour step by step and export the report every episode into out/profile (see src.helpers.profiler)
+enable_behaviour_profiler = False
+# the allocated bytes too, much slower
+track_behaviour_allocations = False
+# LIF + homeostasis + winner take all of the words in one behaviour (see src.core.neurons.fused)
+enable_fused_output_neurons = False
+# homeostasis over integer spike counts, the activity is only derived at the window ends (see count_base_homeostasis)
+enable_count_homeostasis = False
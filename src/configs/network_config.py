@@ -2,3 +2,19 @@ epochs = 60
 max_delay = 4
 is_debug_mode = True
 calculate_fire_effect_via_fire_history = True
+# dense | words (sparse word -> letters synapses) | float (sparse connection probability)
+connectivity = "dense"
+# number of independent networks simulated together (see src.helpers.batch)
+batch_size = 1
+# dtype of the network state (see src.helpers.precision): float32 | float64 (the reference)
+precision = "float32"
+# dtype W and delay are stored in: None (same as the precision) | float16 | int8 (quantized in the checkpoints only)
+weight_storage = None
+# Metrics: None scores every step, k scores only the labeled steps with the words fired within ±k steps
+label_window = None
+# save a checkpoint every N epochs and resume from the latest one (see src.helpers.checkpoint), None to disable
+# NOTE: set corpus_config.corpus_seed as well, so the resumed training sees the same corpus
+checkpoint_every = None
+checkpoint_directory = "out/checkpoints"
+# split the words layer into N worker processes (see src.helpers.sharding), None simulates it in this process
+word_shards = None
@@ -3,7 +3,7 @@ from src.core.visualizer.history_recoreder_1d import HistoryRecorder1D
 from src.core.visualizer.history_recoreder_2d import HistoryRecorder2D
 
 dopamine_plotter = HistoryRecorder1D(
-    title="dopamine", window_size=25, enabled=enable_plotter and False
+    title="dopamine", window_size=25, grow=True, enabled=enable_plotter and False
 )
 dw_plotter = HistoryRecorder2D(
     title="dw", window_size=4, enabled=enable_plotter and False
@@ -16,6 +16,7 @@ delay_plotter = HistoryRecorder2D(
 )
 activity_plotter = HistoryRecorder1D(
     title="activity",
+    grow=True,
     window_size=25,
     vertical_history_separator=True,
     enabled=enable_plotter and False,
@@ -23,12 +24,14 @@ activity_plotter = HistoryRecorder1D(
 )
 selected_dw_plotter = HistoryRecorder1D(
     title="selected::dw",
+    grow=True,
     vertical_history_separator=True,
     window_size=25,
     enabled=enable_plotter and False,
 )
 threshold_plotter = HistoryRecorder1D(
     title="threshold",
+    grow=True,
     vertical_history_separator=True,
     should_copy_on_add=True,
     enabled=enable_plotter and True,
@@ -42,6 +45,7 @@ words_stimulus_plotter = HistoryRecorder1D(
 )
 selected_delay_plotter = HistoryRecorder1D(
     title="selected::delay",
+    grow=True,
     window_size=25,
     vertical_history_separator=True,
     enabled=enable_plotter and True,
@@ -49,6 +53,7 @@ selected_delay_plotter = HistoryRecorder1D(
 )
 selected_weights_plotter = HistoryRecorder1D(
     title="selected::weights",
+    grow=True,
     window_size=3,
     vertical_history_separator=True,
     enabled=enable_plotter and True,
@@ -58,8 +63,37 @@ selected_weights_plotter = HistoryRecorder1D(
 
 dst_firing_plotter = HistoryRecorder1D(
     title="dst firing",
+    grow=True,
     vertical_history_separator=True,
     should_copy_on_add=True,
     save_as_csv=False,
     enabled=enable_plotter and False,
 )
+
+
+PLOTTERS = [
+    dopamine_plotter,
+    dw_plotter,
+    w_plotter,
+    delay_plotter,
+    activity_plotter,
+    selected_dw_plotter,
+    threshold_plotter,
+    words_stimulus_plotter,
+    selected_delay_plotter,
+    selected_weights_plotter,
+    dst_firing_plotter,
+]
+
+
+def disable_plotters():
+    """e.g. for the headless runs, returns the previous states (see `restore_plotters`)"""
+    states = [plotter.enabled for plotter in PLOTTERS]
+    for plotter in PLOTTERS:
+        plotter.enabled = False
+    return states
+
+
+def restore_plotters(states):
+    for plotter, enabled in zip(PLOTTERS, states):
+        plotter.enabled = enabled
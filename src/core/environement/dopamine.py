@@ -1,16 +1,88 @@
+import numpy as np
+
+
+def spread(values, size):
+    """per network values over `size` levels (e.g. the neurons of every network), scalars are kept as they are"""
+    if np.ndim(values) == 0 or np.size(values) == size:
+        return values
+    return np.repeat(values, size // np.size(values))
+
+
 class DopamineEnvironmentProvider:
-    _dopamine = 0.0
+    """
+    Dopamine level (reward signal) of a network, attached to it as `network.dopamine_environment`
+        - `size=None`: a single (scalar) dopamine level
+        - `size=N`: N levels, e.g. one per network of a batch (see `src.helpers.batch`) or one per word neuron;
+          per network values are spread over the levels of each network
+        - level: the initial dopamine level
+        - where: only the given levels (or networks) are set or decayed
+        - `decay(factor, steps)` decays over `steps` steps at once (e.g. the steps skipped by `EventDrivenSimulator`)
+    """
+
+    def __init__(self, size=None, level=0.0):
+        self._dopamine = float(level) if size is None else np.full(size, float(level))
 
     def get(self):
         return self._dopamine
 
-    def set(self, new_dopamine):
-        if not -1 <= new_dopamine <= 1:
+    def set(self, new_dopamine, where=None):
+        new_dopamine = np.asarray(new_dopamine)
+        if not np.all((-1 <= new_dopamine) & (new_dopamine <= 1)):
             raise AssertionError
-        self._dopamine = new_dopamine
+        if np.ndim(self._dopamine) == 0:
+            if where is None or np.all(where):
+                self._dopamine = np.asarray(new_dopamine).item()
+        elif where is None:
+            self._dopamine[:] = spread(new_dopamine, self._dopamine.size)
+        else:
+            where = np.asarray(spread(where, self._dopamine.size), dtype=bool)
+            new_dopamine = spread(new_dopamine, self._dopamine.size)
+            self._dopamine[where] = np.broadcast_to(new_dopamine, where.shape)[where]
+
+    def decay(self, decay_factor, steps=1, where=None):
+        decay_factor = decay_factor**steps
+        if np.ndim(self._dopamine) == 0:
+            if where is None or np.all(where):
+                self._dopamine *= decay_factor
+        elif where is None:
+            self._dopamine *= decay_factor
+        else:
+            where = np.asarray(spread(where, self._dopamine.size), dtype=bool)
+            self._dopamine[where] *= decay_factor
+
+
+class ModulatedDopamine:
+    """
+    Dopamine of another environment scaled by a gain, e.g. the reward of a single synapse group
+        - gain: scalar or one value per level (e.g. per dst neuron of the synapse group)
+        - read only, the reward is still set on the modulated environment
+    """
+
+    def __init__(self, environment, gain):
+        self.environment = environment
+        self.gain = gain
+
+    def get(self):
+        return spread(self.environment.get(), np.size(self.gain)) * self.gain
+
 
-    def decay(self, decay_factor):
-        self._dopamine *= decay_factor
+def modulate(group, gain):
+    """scale the dopamine seen by a group (e.g. its STDP) by `gain`"""
+    group.dopamine_environment = ModulatedDopamine(
+        get_dopamine_environment(group.network), gain
+    )
+    return group.dopamine_environment
 
 
-DopamineEnvironment = DopamineEnvironmentProvider()
+def get_dopamine_environment(obj):
+    """
+    Dopamine of a group (or a network): its own modulated one, else the one of its network,
+    a scalar environment is attached to the network on first use
+    """
+    environment = getattr(obj, "dopamine_environment", None)
+    if environment is not None:
+        return environment
+    network = getattr(obj, "network", obj)
+    if getattr(network, "dopamine_environment", None) is None:
+        network.dopamine_environment = DopamineEnvironmentProvider()
+    return network.dopamine_environment
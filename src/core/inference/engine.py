@@ -0,0 +1,251 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+from src.core.learning.connectivity import get_connectivity
+from src.core.metrics.confusion import ConfusionMatrix
+from src.core.neurons.current import CurrentStimulus
+from src.core.neurons.neurons import StreamableLIFNeurons
+from src.core.stabilizer.winner_take_all import NO_WINNER
+from src.data.spike_generator import NO_LABEL, iter_chunks
+from src.helpers.batch import batch_size
+
+
+class InferenceEngine:
+    """
+    Frozen letters -> words network of a trained network, only W, delay and threshold are kept
+        - kernel[lag]: effective `(words, letters)` weights of the letters seen `lag` steps ago,
+          the fractional delays are split between their lower and upper lags (same as `DelayInterpolationPlan`)
+        - the stimulus of a whole chunk is `max_delay + 1` matrix products and the membrane is a linear (IIR) filter
+        - the reset after a spike only depends on the last spike, so the potential is only corrected
+          at the (few) steps where the linear potential is over the threshold
+        - the winner of a step has the highest potential (`WinnerTakeAll`)
+        - chunked streams are classified chunk by chunk, the state is carried over the chunks
+
+    @note: no noise, learning or homeostasis, same spikes as the trained network in test mode without noise
+    """
+
+    def __init__(
+        self,
+        kernel,
+        threshold,
+        v_rest=-65,
+        v_reset=-65,
+        tau=3,
+        dt=1.0,
+        R=1,
+        stimulus_scale_factor=1,
+    ):
+        self.kernel = kernel
+        self.threshold = np.asarray(threshold, dtype=float) * np.ones(kernel.shape[1])
+        self.v_rest = v_rest
+        self.v_reset = v_reset
+        self.R = R
+        self.stimulus_scale_factor = stimulus_scale_factor
+        # v - v_rest = leak * (v - v_rest) + R * I
+        self.dt = dt
+        self.tau = tau
+        self.leak = 1 - dt / tau
+        self.reset()
+
+    @property
+    def max_delay(self):
+        return self.kernel.shape[0] - 1
+
+    @property
+    def words_count(self):
+        return self.kernel.shape[1]
+
+    @classmethod
+    def from_network(cls, network, network_index=0, synapse_tag="GLUTAMATE"):
+        """frozen copy of the words of one network of the (batched) trained network"""
+        synapse = network[synapse_tag, 0]
+        words, letters = synapse.dst, synapse.src
+        connectivity = get_connectivity(synapse)
+        rows = np.arange(words.size).reshape(batch_size(words), -1)[network_index]
+        cols = np.arange(letters.size).reshape(batch_size(letters), -1)[network_index]
+        W = connectivity.dense(connectivity.values(synapse.W))[np.ix_(rows, cols)]
+        delay = connectivity.dense(connectivity.values(synapse.delay))
+        delay = delay[np.ix_(rows, cols)]
+
+        kernel = make_kernel(W, delay, synapse.delay_plan.max_delay)
+        lif = find_behaviour(words, StreamableLIFNeurons)
+        stimulus = find_behaviour(words, CurrentStimulus)
+        return cls(
+            kernel,
+            np.asarray(words.threshold * np.ones(words.size))[rows],
+            v_rest=words.v_rest,
+            v_reset=words.v_reset,
+            tau=words.tau,
+            dt=lif.dt,
+            R=words.R,
+            stimulus_scale_factor=stimulus.stimulus_scale_factor,
+        )
+
+    def state(self):
+        return {
+            "kernel": self.kernel,
+            "threshold": self.threshold,
+            "v_rest": self.v_rest,
+            "v_reset": self.v_reset,
+            "tau": self.tau,
+            "dt": self.dt,
+            "R": self.R,
+            "stimulus_scale_factor": self.stimulus_scale_factor,
+        }
+
+    @classmethod
+    def from_checkpoint(cls, path, network_index=0):
+        """frozen network saved in a checkpoint (see `src.helpers.checkpoint`), without any training network"""
+        prefix = f"inference/{network_index}/"
+        with np.load(path) as state:
+            values = {
+                key[len(prefix) :]: state[key]
+                for key in state.files
+                if key.startswith(prefix)
+            }
+        if not values:
+            raise AssertionError(f"{path} has no inference state of {network_index}")
+        kernel, threshold = values.pop("kernel"), values.pop("threshold")
+        return cls(kernel, threshold, **{k: v.item() for k, v in values.items()})
+
+    def reset(self):
+        """back to the rest, e.g. before a brand new stream"""
+        self._spikes = np.zeros((self.max_delay, self.kernel.shape[2]))
+        # filter state, i.e. `leak * (v - v_rest)` of the last step
+        self._state = np.zeros((1, self.words_count))
+
+    def stimulus(self, spikes):
+        """`(T, words)` stimulus of the `(T, letters)` spikes following the carried spikes"""
+        spikes = np.concatenate((self._spikes, spikes))
+        steps = len(spikes) - self.max_delay
+        stimulus = np.zeros((steps, self.words_count))
+        for lag in range(self.max_delay + 1):
+            start = self.max_delay - lag
+            stimulus += spikes[start : start + steps] @ self.kernel[lag].T
+        self._spikes = spikes[len(spikes) - self.max_delay :]
+        return stimulus * self.stimulus_scale_factor
+
+    def winners(self, spikes):
+        """`(T,)` firing word of every step, `NO_WINNER` when no word fires"""
+        if len(spikes) == 0:
+            return np.zeros(0, dtype=int)
+        # potential (above the rest) of the chunk without any reset
+        v, _ = lfilter(
+            [self.R], [1, -self.leak], self.stimulus(spikes), axis=0, zi=self._state
+        )
+        steps, neurons, fired_v = [], [], []
+        last_v = v[-1].copy()
+        for neuron in range(self.words_count):
+            fired, potential = self.fire(v[:, neuron], neuron)
+            if len(fired):
+                steps.append(fired)
+                neurons.append(np.full(len(fired), neuron))
+                fired_v.append(potential)
+                last_v[neuron] = self.reset_potential(
+                    v[:, neuron], fired[-1], len(v) - 1
+                )
+        self._state = self.leak * last_v[np.newaxis]
+
+        winners = np.full(len(v), NO_WINNER)
+        if steps:
+            steps, neurons = np.concatenate(steps), np.concatenate(neurons)
+            # the highest potential (the first neuron on ties) of every step is the last one to be written
+            order = np.lexsort((-neurons, np.concatenate(fired_v), steps))
+            winners[steps[order]] = neurons[order]
+        return winners
+
+    def reset_potential(self, v, spike, step):
+        """potential at the steps after the spike, the reset decays towards the rest"""
+        reset = self.v_reset - self.v_rest
+        return v[step] - (v[spike] - reset) * self.leak ** (step - spike)
+
+    def fire(self, v, neuron, block=64):
+        """spikes of a neuron given its potential without any reset, and its potential at the spikes"""
+        threshold = self.threshold[neuron] - self.v_rest
+        # with the reset the potential is below the potential without reset
+        candidates = np.flatnonzero(v >= threshold)
+        fired, potential = [], []
+        spike = None
+        start = 0
+        while start < len(candidates):
+            steps = candidates[start : start + block]
+            current = v[steps]
+            if spike is not None:
+                current = self.reset_potential(v, spike, steps)
+            over = np.flatnonzero(current >= threshold)
+            if len(over) == 0:
+                start += block
+                continue
+            spike = steps[over[0]]
+            fired.append(spike)
+            potential.append(current[over[0]])
+            start += over[0] + 1
+        return np.array(fired, dtype=int), np.array(potential)
+
+    def predict(self, stream):
+        """winners of a whole (chunked) `(T, letters)` stream, from the rest"""
+        self.reset()
+        return np.concatenate(
+            [self.winners(np.asarray(chunk)) for chunk in iter_chunks(stream)]
+        )
+
+    def evaluate(self, stream, labels, label_window=None, confusion=None):
+        """
+        Confusion matrix of a whole (chunked) stream, same classes as `Metrics`
+            - label_window: None scores every step, otherwise only the labeled steps
+              with the words winning up to `label_window` steps around the label
+        """
+        self.reset()
+        confusion = confusion or ConfusionMatrix(self.words_count)
+        k = label_window or 0
+        # winners and labels of the steps whose window is not over yet
+        carried = np.full(k, NO_WINNER), np.full(k, NO_LABEL)
+
+        for spikes, step_labels in zip(iter_chunks(stream), iter_chunks(labels)):
+            winners = self.winners(np.asarray(spikes))
+            if label_window is None:
+                confusion.add_winners(step_labels, winners)
+            else:
+                carried = self.score_labels(confusion, winners, step_labels, carried, k)
+
+        if label_window is not None:
+            # windows of the last labels are cut by the end of the stream
+            self.score_labels(confusion, np.full(k, NO_WINNER), [], carried, k)
+        return confusion
+
+    def score_labels(self, confusion, winners, labels, carried, k):
+        """labels whose `±k` window is over, the others (and their context) are carried"""
+        winners = np.concatenate((carried[0], winners))
+        labels = np.concatenate((carried[1], labels)).astype(int)
+        ready = len(winners) - k
+        steps = np.flatnonzero(labels[:ready] != NO_LABEL)
+        if len(steps):
+            windows = sliding_window_view(winners, 2 * k + 1)[steps - k]
+            confusion.add_classes(labels[steps], confusion.winner_classes(windows))
+
+        start = max(0, len(winners) - 2 * k)
+        labels = labels[start:].copy()
+        labels[: max(0, ready - start)] = NO_LABEL
+        return winners[start:], labels
+
+
+def make_kernel(W, delay, max_delay):
+    """`(max_delay + 1, dst, src)` weights of the src spikes at every lag"""
+    delay = np.clip(delay, 0, max_delay)
+    lower = delay.astype(int)
+    upper = np.minimum(lower + 1, max_delay)
+    mantis = np.remainder(delay, 1.0)
+    rows, cols = np.indices(W.shape)
+
+    kernel = np.zeros((max_delay + 1, *W.shape))
+    np.add.at(kernel, (lower, rows, cols), W * (1 - mantis))
+    np.add.at(kernel, (upper, rows, cols), W * mantis)
+    return kernel
+
+
+def find_behaviour(group, behaviour_class):
+    for behaviour in group.behaviour.values():
+        if isinstance(behaviour, behaviour_class):
+            return behaviour
+    raise AssertionError(f"{group.tags[0]} has no {behaviour_class.__name__}")
@@ -0,0 +1,196 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from src.configs import corpus_config
+
+
+class DenseConnectivity:
+    """
+    All to all synapses, every synapse variable (W, delay, fire_effect) is a dense `(dst, src)` matrix.
+    It is the reference layout for `SparseConnectivity`, both expose the same per-synapse (edge) operations.
+    """
+
+    is_sparse = False
+
+    def __init__(self, shape):
+        self.shape = shape
+        self.edge_shape = shape
+        self.sources = np.arange(shape[1], dtype=int) * np.ones(
+            (shape[0], 1), dtype=int
+        )
+
+    def matrix(self, values):
+        return values
+
+    def values(self, matrix):
+        return matrix
+
+    def dense(self, values):
+        return values
+
+    def dst(self, vector):
+        """broadcast a dst neuron vector over the synapses"""
+        return vector[:, np.newaxis]
+
+    def row_sum(self, values):
+        return np.sum(values, axis=1)
+
+    def row_min(self, values):
+        return np.min(values, axis=1)
+
+    def source_edges(self, fired):
+        """index of the synapses (of any depth) with a spiking src neuron"""
+        return slice(None), np.flatnonzero(fired)
+
+    def select(self, values, rows, cols):
+        return values[rows, cols]
+
+    def assign(self, values, rows, cols, value):
+        values[rows, cols] = value
+
+
+class SparseConnectivity:
+    """
+    CSR layout of the existing synapses, every synapse variable holds one value per existing synapse (edge)
+        - `indptr`, `indices`: the scipy CSR structure shared between W, delay and fire_effect
+        - `rows`: dst neuron of every edge, `sources`: src neuron of every edge
+        - per step cost of all the operations is proportional to the number of edges (nnz)
+    """
+
+    is_sparse = True
+
+    def __init__(self, indptr, indices, shape):
+        self.shape = shape
+        self.indptr = np.asarray(indptr, dtype=np.int32)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.edge_shape = (self.indices.size,)
+        self.sources = self.indices.astype(int)
+        self.rows = np.repeat(np.arange(shape[0]), np.diff(self.indptr))
+        self.non_empty_rows = np.flatnonzero(np.diff(self.indptr))
+        # edges are sorted by (row, col), the key is used to look up an edge
+        self.edge_keys = self.rows * shape[1] + self.sources
+
+    @property
+    def nnz(self):
+        return self.indices.size
+
+    @classmethod
+    def from_mask(cls, mask):
+        rows, cols = np.nonzero(mask)
+        indptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(rows, minlength=len(mask))))
+        )
+        return cls(indptr, cols, mask.shape)
+
+    @classmethod
+    def from_words(cls, dst_size, words=None, letters=None):
+        """every word neuron only connects to the letters of its own word"""
+        words = corpus_config.words if words is None else words
+        letters = corpus_config.letters if letters is None else letters
+        mask = np.zeros((dst_size, len(letters)), dtype=bool)
+        for i, word in enumerate(words[:dst_size]):
+            mask[i, [letters.index(char) for char in word]] = True
+        return cls.from_mask(mask)
+
+    @classmethod
+    def from_probability(cls, probability, shape):
+        return cls.from_mask(np.random.random(shape) < probability)
+
+    @classmethod
+    def from_dense(cls, connectivity):
+        return cls.from_mask(np.ones(connectivity.shape, dtype=bool))
+
+    def block_diagonal(self, copies):
+        """independent copies of the synapses, the copy `b` connects src block `b` to dst block `b`"""
+        blocks = np.arange(copies)
+        indptr = np.concatenate(
+            ([0], (self.indptr[1:] + self.nnz * blocks[:, np.newaxis]).reshape(-1))
+        )
+        indices = (self.indices + self.shape[1] * blocks[:, np.newaxis]).reshape(-1)
+        return SparseConnectivity(
+            indptr, indices, (self.shape[0] * copies, self.shape[1] * copies)
+        )
+
+    def matrix(self, values):
+        return csr_matrix((values, self.indices, self.indptr), shape=self.shape)
+
+    def values(self, matrix):
+        return matrix.data
+
+    def dense(self, values):
+        return self.matrix(values).toarray()
+
+    def dst(self, vector):
+        return vector[self.rows]
+
+    def row_sum(self, values):
+        sums = np.bincount(self.rows, weights=values, minlength=self.shape[0])
+        # bincount always sums into float64
+        return sums.astype(values.dtype, copy=False)
+
+    def row_min(self, values):
+        # dst neurons without any synapse have nothing to compare, so they won't block any update
+        result = np.full(self.shape[0], np.inf)
+        if self.non_empty_rows.size:
+            result[self.non_empty_rows] = np.minimum.reduceat(
+                values, self.indptr[self.non_empty_rows]
+            )
+        return result
+
+    def source_edges(self, fired):
+        return np.flatnonzero(fired[self.indices])
+
+    def positions(self, rows, cols):
+        """edge index of every (row, col) pair, -1 for the non existing synapses"""
+        keys = np.asarray(rows) * self.shape[1] + np.asarray(cols)
+        if not self.nnz:
+            return np.full(keys.shape, -1)
+
+        positions = np.minimum(np.searchsorted(self.edge_keys, keys), self.nnz - 1)
+        return np.where(self.edge_keys[positions] == keys, positions, -1)
+
+    def select(self, values, rows, cols):
+        positions = self.positions(rows, cols)
+        if not self.nnz:
+            return np.zeros(positions.shape)
+        return np.where(positions >= 0, values[positions], 0)
+
+    def assign(self, values, rows, cols, value):
+        rows, cols, value = np.broadcast_arrays(rows, cols, value)
+        positions = self.positions(rows, cols)
+        exists = positions >= 0
+        values[positions[exists]] = value[exists]
+
+
+def make_connectivity(mode, dst_size, src_size, words=None, letters=None):
+    """
+    - "dense": all to all synapses
+    - "words": sparse synapses from the letters of every word to its own neuron
+      (`corpus_config.words` and `corpus_config.letters` by default)
+    - float: sparse random synapses with the given connection probability
+    """
+    if mode == "dense":
+        return DenseConnectivity((dst_size, src_size))
+    if mode == "words":
+        return SparseConnectivity.from_words(dst_size, words, letters)
+    if isinstance(mode, float):
+        return SparseConnectivity.from_probability(mode, (dst_size, src_size))
+    raise AssertionError("connectivity must be one of dense|words|<probability>")
+
+
+def make_batch_connectivity(connectivity, batch_size):
+    """block diagonal synapses of `batch_size` independent networks, dense synapses of the batch become sparse"""
+    if batch_size == 1:
+        return connectivity
+    if not connectivity.is_sparse:
+        connectivity = SparseConnectivity.from_dense(connectivity)
+    return connectivity.block_diagonal(batch_size)
+
+
+def get_connectivity(synapse):
+    """synapses are dense unless a connectivity is assigned to the synapse group before initialization"""
+    connectivity = getattr(synapse, "connectivity", None)
+    if connectivity is None:
+        connectivity = DenseConnectivity((synapse.dst.size, synapse.src.size))
+        synapse.connectivity = connectivity
+    return connectivity
@@ -0,0 +1,96 @@
+import numpy as np
+
+from src.core.learning.connectivity import get_connectivity
+from src.helpers.precision import state_dtype
+
+
+class DelayInterpolationPlan:
+    """
+    Gather indices and interpolation shares of the fractional synapse delays.
+        - delay=2.3 => lower lag 2 with 0.7 share (complement), upper lag 3 with 0.3 share (mantis)
+        - the plan is rebuilt only when the delays are changed (`invalidate` or a brand new delay matrix)
+        - every behaviour reading a `RingHistory` through the delays (delay, stdp) shares the same plan
+        - `sources` is the src neuron of every synapse, either a dense `(dst, src)` grid or one per sparse edge
+
+    @note: in place updates of `synapse.delay` must be followed by `invalidate`
+    """
+
+    def __init__(self, sources, max_delay):
+        self.max_delay = max_delay
+        self.sources = sources
+        self.lower = np.zeros_like(self.sources)
+        self.upper = np.zeros_like(self.sources)
+        self.mantis = np.zeros(self.sources.shape, dtype=state_dtype())
+        self.complement = np.zeros_like(self.mantis)
+
+        self.is_dirty = True
+        self._delay = None
+        self._offsets = {}
+        self._buffers = {}
+
+    def invalidate(self):
+        self.is_dirty = True
+
+    def refresh(self, delay):
+        if not self.is_dirty and delay is self._delay:
+            return False
+
+        np.copyto(self.lower, delay, casting="unsafe")  # same as delay.astype(int)
+        np.add(self.lower, 1, out=self.upper)
+        np.minimum(self.upper, self.max_delay, out=self.upper)
+        np.remainder(delay, 1.0, out=self.mantis)
+        np.subtract(1, self.mantis, out=self.complement)
+
+        self._offsets.clear()
+        self._delay = delay
+        self.is_dirty = False
+        return True
+
+    def offsets(self, width):
+        """flat offsets of the lower and upper lags into a `(src, width)` history buffer"""
+        if width not in self._offsets:
+            rows = self.sources * width
+            self._offsets[width] = (rows + self.lower, rows + self.upper)
+        return self._offsets[width]
+
+    def buffers(self, dtype):
+        if dtype not in self._buffers:
+            self._buffers[dtype] = (
+                np.zeros(self.sources.shape, dtype=int),
+                np.zeros(self.sources.shape, dtype=dtype),
+                np.zeros_like(self.mantis),
+            )
+        return self._buffers[dtype]
+
+    def lerp(self, history, out=None):
+        """
+        Fused gather and linear interpolation over the history of the source neurons
+            history[lower] * complement + history[upper] * mantis
+        """
+        if out is None:
+            out = np.zeros_like(self.mantis)
+
+        lower_offsets, upper_offsets = self.offsets(history.buffer.shape[-1])
+        indices, gathered, share = self.buffers(history.buffer.dtype)
+        flat_history = history.buffer.reshape(-1)
+
+        np.add(lower_offsets, history.head, out=indices)
+        np.take(flat_history, indices, out=gathered)
+        np.multiply(gathered, self.complement, out=out)
+
+        np.add(upper_offsets, history.head, out=indices)
+        np.take(flat_history, indices, out=gathered)
+        np.multiply(gathered, self.mantis, out=share)
+        np.add(out, share, out=out)
+        return out
+
+
+def get_delay_plan(synapse, max_delay):
+    """plan shared by all the behaviours of the synapse, created by the first one asking for it"""
+    plan = getattr(synapse, "delay_plan", None)
+    if plan is None:
+        plan = DelayInterpolationPlan(get_connectivity(synapse).sources, max_delay)
+        synapse.delay_plan = plan
+    elif plan.max_delay != max_delay:
+        raise AssertionError("behaviours of a synapse must share the same max_delay")
+    return plan
@@ -1,7 +1,19 @@
 import numpy as np
 
 from PymoNNto import Behaviour
-from src.core.environement.dopamine import DopamineEnvironment
+from src.core.environement.dopamine import get_dopamine_environment
+from src.core.stabilizer.winner_take_all import NO_WINNER, fired_winners
+from src.data.spike_generator import NO_LABEL, whole_labels
+
+
+def active_labels(outputs):
+    """
+    `(T,)` label in effect at every step: the latest label so far (word index or UNK), NO_LABEL before the first one
+    """
+    labels = whole_labels(outputs).astype(int)
+    steps = np.where(labels != NO_LABEL, np.arange(labels.size), -1)
+    np.maximum.accumulate(steps, out=steps)
+    return np.where(steps >= 0, labels[steps], NO_LABEL)
 
 
 class Supervisor(Behaviour):
@@ -10,42 +22,40 @@ class Supervisor(Behaviour):
     - ab -> decay
     - abc -> decay
     - abc_ -> validation_mechanism (reward|punishment)
+
+    @note: the active label of every step is looked up from a table built once from the outputs (`active_labels`),
+        the prediction is the winner published by `WinnerTakeAll` (`n.winner`), or derived from `n.fired` without it
     """
 
     __slots__ = ["dopamine_decay", "outputs"]
 
     def set_variables(self, n):
         self.dopamine_decay = 1 - self.get_init_attr("dopamine_decay", 0.0, n)
+        # `(T,)` labels, word index or UNK (no word neuron must fire) or NO_LABEL
         self.outputs = self.get_init_attr("outputs", [], n)
-        self.current_pattern = self.outputs[0] * np.nan
+        self.active_labels = active_labels(self.outputs)
 
     def new_iteration(self, n):
         """
-        For post synaptic activity (output) we record the latest desired output in the `self.current_pattern`
-        Then check the pre-synaptic activity (prediction)
-            - In the first activity (perfect match) we want exact match (L36, L40)
-            - In the following activity if it is desirable release reward o.w. punish
-            - In the non-active time-step decay the existing dopamine
+        The prediction (winner) of every network is compared to the latest desired output (active label)
+            - a perfect match releases reward, any other prediction (e.g. UNK, or before any label) punishes
+            - in the non-active time-step decay the existing dopamine
         """
 
-        output = self.outputs[n.iteration - 1]
-        prediction = n.fired
+        label = self.active_labels[n.iteration - 1]
+        # one prediction per network of the batch
+        winner = n.winner if hasattr(n, "winner") else fired_winners(n)
+        environment = get_dopamine_environment(n)
 
         # abc  askfhklas kfhkh
         #     1,01nn
-        if not np.isnan(output).any():
-            self.current_pattern = output
-
-            # if np.sum(prediction) == 0:
-            #     DopamineEnvironment.set(-1)
-            #     print("dop", DopamineEnvironment.get())
-            #     return
-
-        if np.sum(prediction) > 0:
-            distance = [-1.0, 1.0][int((self.current_pattern == prediction).all())]
-            DopamineEnvironment.set(distance)
+        has_prediction = winner != NO_WINNER
+        if has_prediction.any():
+            distance = np.where(winner == label, 1.0, -1.0)
+            environment.set(distance, where=has_prediction)
+            environment.decay(self.dopamine_decay, where=np.logical_not(has_prediction))
         else:
-            DopamineEnvironment.decay(self.dopamine_decay)
+            environment.decay(self.dopamine_decay)
 
         # print("dop", DopamineEnvironment.get())
 
@@ -60,3 +70,7 @@ class Supervisor(Behaviour):
         # https://docs.scipy.org/doc/scipy/reference/generated/scipy.spatial.distance.jaccard.html
         # distance = jaccard(output, prediction)
         # DopamineEnvironment.set(-distance or 1.0)
+
+    def skip_iterations(self, n, steps):
+        """nothing is predicted over silent steps, so the dopamine only decays"""
+        get_dopamine_environment(n).decay(self.dopamine_decay, steps)
@@ -9,8 +9,12 @@ from src.configs.plotters import (
     selected_dw_plotter,
     selected_weights_plotter,
 )
-from src.core.environement.dopamine import DopamineEnvironment
+from src.core.environement.dopamine import get_dopamine_environment
+from src.core.learning.connectivity import get_connectivity
+from src.core.learning.delay_plan import get_delay_plan
 from src.helpers.base import selected_neurons_from_words
+from src.helpers.batch import batched
+from src.helpers.precision import as_state, state_dtype, weight_dtype
 
 
 def soft_bound(a_min, A, a_max):
@@ -27,8 +31,29 @@ def none_bound(a_min, A, a_max):
 
 bounds = {"soft-bound": soft_bound, "hard-bound": hard_bound, "none": none_bound}
 
+
+def drift(values, bound, step, steps):
+    """closed form of `steps` times `values[values (>|<) bound] += step`, moving the values toward the bound"""
+    moves = np.clip(np.ceil((bound - values) / step), 0, steps)
+    values += moves * step
+
+
 LET = np.array(list(letters))
 
+# per network hyperparameters (see `src.helpers.batch`) of the src neurons, dst neurons and synapses
+SRC_ATTRS = ["tau_plus"]
+DST_ATTRS = ["tau_minus", "min_delay_threshold"]
+EDGE_ATTRS = [
+    "a_minus",
+    "a_plus",
+    "delay_a_minus",
+    "delay_a_plus",
+    "delay_factor",
+    "stdp_factor",
+    "w_max",
+    "w_min",
+]
+
 
 class SynapsePairWiseSTDP(Behaviour):
     __slots__ = [
@@ -46,7 +71,12 @@ class SynapsePairWiseSTDP(Behaviour):
     ]
 
     def set_variables(self, synapse):
-        synapse.W = synapse.get_synapse_mat("uniform")
+        connectivity = get_connectivity(synapse)
+        W = (
+            np.random.random(connectivity.edge_shape)
+            if connectivity.is_sparse
+            else synapse.get_synapse_mat("uniform")
+        )
 
         configure = {
             "a_minus": -0.1,
@@ -70,22 +100,33 @@ class SynapsePairWiseSTDP(Behaviour):
         for attr, value in configure.items():
             setattr(self, attr, self.get_init_attr(attr, value, synapse))
 
+        self.connectivity = connectivity
+        for attrs, expand in (
+            (SRC_ATTRS, lambda value: batched(value, synapse.src)),
+            (DST_ATTRS, lambda value: batched(value, synapse.dst)),
+            (EDGE_ATTRS, lambda value: self.edge_values(synapse, value)),
+        ):
+            for attr in attrs:
+                setattr(self, attr, expand(getattr(self, attr)))
+
         # Scale W from [0,1) to [w_min, w_max)
-        synapse.W = synapse.W * (self.w_max - self.w_min) + self.w_min
-        synapse.W = np.clip(synapse.W, self.w_min, self.w_max)
+        W = W * (self.w_max - self.w_min) + self.w_min
+        W = np.clip(W, self.w_min, self.w_max)
 
         if feature_flags.enable_magic_weights:
+            all_rows = np.arange(synapse.dst.size)[:, np.newaxis]
             for i, word in enumerate(corpus_config.words):
                 indices = [corpus_config.letters.index(char) for char in word]
-                synapse.W[:, indices] = self.w_min
-                synapse.W[i, indices] = self.w_max
+                connectivity.assign(W, all_rows, indices, self.w_min)
+                connectivity.assign(W, i, indices, self.w_max)
 
-        if self.a_minus >= 0:
+        synapse.W = connectivity.matrix(W.astype(weight_dtype()))
+
+        if np.any(self.a_minus >= 0):
             raise AssertionError("a_minus should be negative")
 
-        self.delay_domains = np.arange(synapse.src.size, dtype=int) * np.ones(
-            (synapse.dst.size, 1), dtype=int
-        )
+        self.delay_plan = get_delay_plan(synapse, self.max_delay)
+        self.ltp = np.zeros(self.delay_plan.sources.shape, dtype=state_dtype())
 
         if self.weight_update_strategy not in (None, "soft-bound", "hard-bound"):
             raise AssertionError(
@@ -97,7 +138,14 @@ class SynapsePairWiseSTDP(Behaviour):
                 "delay_update_strategy must be one of soft-bound|hard-bound|None"
             )
 
-        selected_weights_plotter.configure_plot(ylim=[self.w_min, self.w_max + 0.2])
+        selected_weights_plotter.configure_plot(
+            ylim=[np.min(self.w_min), np.max(self.w_max) + 0.2]
+        )
+
+    def edge_values(self, synapse, value):
+        """per network values spread over the synapses of every network, scalars are kept as they are"""
+        value = as_state(batched(value, synapse.dst))
+        return value if np.ndim(value) == 0 else self.connectivity.dst(value)
 
     # TODO: add dw_neutral effect into dw_plus
     def new_iteration(self, synapse):
@@ -108,13 +156,16 @@ class SynapsePairWiseSTDP(Behaviour):
         # add new trace to existing src trace history
         # we don't have access to the latest src asar till here
         # should we accumulate it to the previous last layer trace or just replace that with the latest one
-        synapse.src.trace[:, 0] += (
-            -synapse.src.trace[:, 0] / self.tau_plus + synapse.src.fired  # dx
-        ) * self.dt
+        src_trace = synapse.src.trace.latest
+        synapse.src.trace.set_latest(
+            src_trace + (-src_trace / self.tau_plus + synapse.src.fired) * self.dt  # dx
+        )
 
-        synapse.dst.trace[:, 0] += (
-            -synapse.dst.trace[:, 0] / self.tau_minus + synapse.dst.fired  # dy
-        ) * self.dt
+        dst_trace = synapse.dst.trace.latest
+        synapse.dst.trace.set_latest(
+            dst_trace
+            + (-dst_trace / self.tau_minus + synapse.dst.fired) * self.dt  # dy
+        )
 
         #  TODO: coincidence logic detection re-check
         # ltd -> dw_minus (depression) w- d+
@@ -124,56 +175,56 @@ class SynapsePairWiseSTDP(Behaviour):
         # dw:= a_plus* ltp + a_min * ltd
         # W += dw
         # delay+=dd
-        coincidence = (
-            synapse.src.fire_effect.astype(bool) * synapse.dst.fired[:, np.newaxis]
-        )
-        non_coincidence = np.logical_not(coincidence)
-        ltd = synapse.src.fire_effect * synapse.dst.trace[:, 0][:, np.newaxis]
+        connectivity = self.connectivity
+        W = connectivity.values(synapse.W)
+        delay = connectivity.values(synapse.delay)
+        fire_effect = connectivity.values(synapse.src.fire_effect)
+        dst_fired = connectivity.dst(synapse.dst.fired)
 
-        delay_ranges = synapse.delay.astype(int)
-        mantis = synapse.delay % 1.0
-        complement = 1 - mantis
+        coincidence = fire_effect.astype(bool) * dst_fired
+        non_coincidence = np.logical_not(coincidence)
+        ltd = fire_effect * connectivity.dst(synapse.dst.trace.latest)
 
+        self.delay_plan.refresh(delay)
         ltp = (
-            (
-                synapse.src.trace[self.delay_domains, delay_ranges] * complement
-                + synapse.src.trace[
-                    self.delay_domains, np.clip(delay_ranges + 1, 0, self.max_delay)
-                ]
-                * mantis
-            )
+            self.delay_plan.lerp(synapse.src.trace, out=self.ltp)
             # * synapse.src.trace[self.delay_domains, self.delay_ranges+1]*cpomplete ?
-            * synapse.dst.fired[:, np.newaxis]
+            * dst_fired
         )
 
         # soft bound for both delay and stdp separate
+        dopamine = self.edge_values(synapse, get_dopamine_environment(synapse).get())
         dw = (
-            DopamineEnvironment.get()  # from global environment
+            dopamine  # from the network environment
             * (
                 # stdp mechanism
                 self.a_plus * ltp
                 + self.a_minus * ltd * non_coincidence
             )
-            * bounds[self.weight_update_strategy or "none"](
-                self.w_min, synapse.W, self.w_max
-            )
+            * bounds[self.weight_update_strategy or "none"](self.w_min, W, self.w_max)
             * self.stdp_factor  # stdp scale factor
             * synapse.enabled  # activation of synapse itself
             * self.dt
         )
 
-        dw_plotter.add_image(dw * 1e5)
-        rows, cols = selected_neurons_from_words()
-        selected_dw_plotter.add(dw[rows, cols])
+        if dw_plotter.enabled:
+            dw_plotter.add_image(connectivity.dense(dw) * 1e5)
+        if selected_dw_plotter.enabled:
+            rows, cols = selected_neurons_from_words()
+            selected_dw_plotter.add(connectivity.select(dw, rows, cols))
 
-        synapse.W[synapse.W > 0.01] -= 1e-5
-        synapse.delay[synapse.delay < self.max_delay - 0.01] += 1e-5
+        W[W > 0.01] -= 1e-5
+        delay[delay < self.max_delay - 0.01] += 1e-5
+        self.delay_plan.invalidate()
 
-        synapse.W = synapse.W + dw
-        synapse.W = np.clip(synapse.W, self.w_min, self.w_max)
+        np.add(W, dw, out=W)
+        np.clip(W, self.w_min, self.w_max, out=W)
 
-        selected_weights_plotter.add(synapse.W[rows, cols])
-        w_plotter.add_image(synapse.W, vmin=self.w_min, vmax=self.w_max)
+        if selected_weights_plotter.enabled:
+            rows, cols = selected_neurons_from_words()
+            selected_weights_plotter.add(connectivity.select(W, rows, cols))
+        if w_plotter.enabled:
+            w_plotter.add_image(connectivity.dense(W), vmin=self.w_min, vmax=self.w_max)
 
         # if (self.delay_a_minus * ltd < 0).any():
         #     abc_active = LET[synapse.src.fire_effect[0].astype(bool)]
@@ -196,11 +247,11 @@ class SynapsePairWiseSTDP(Behaviour):
         if not feature_flags.enable_delay_update_in_stdp:
             return
 
-        dd = DopamineEnvironment.get() * (
+        dd = dopamine * (
             self.delay_a_plus * ltp * non_coincidence + self.delay_a_minus * ltd
         )
 
-        use_shared_delay = dd.shape != synapse.delay.shape
+        use_shared_delay = dd.shape != delay.shape
         if use_shared_delay:
             dd = np.mean(dd, axis=0, keepdims=True)
 
@@ -208,9 +259,34 @@ class SynapsePairWiseSTDP(Behaviour):
         if not non_zero_dd.any():
             return
 
-        should_update = np.min(synapse.delay, axis=1)
+        should_update = connectivity.row_min(delay)
         should_update = should_update > self.min_delay_threshold
         # synapse.delay[np.logical_not(should_update)] += 1e-5
 
         if should_update.any():
-            synapse.delay += dd * should_update[:, np.newaxis] * self.delay_factor
+            delay += dd * connectivity.dst(should_update) * self.delay_factor
+
+    def skip_iterations(self, synapse, steps):
+        """
+        Closed form of `steps` silent steps, nothing is fired so dw and dd are zero
+            1. the traces decay, the lags carried by `TraceHistory` are scaled to their own decay
+            2. weights and delays drift toward their resting bound by 1e-5 per step
+        """
+        if not synapse.recording:
+            return
+
+        for trace, tau in (
+            (synapse.src.trace, self.tau_plus),
+            (synapse.dst.trace, self.tau_minus),
+        ):
+            lags = np.arange(min(steps, trace.depth))
+            decay = 1 - self.dt / np.asarray(tau)[..., np.newaxis]
+            trace.scale_lags(decay ** (steps - lags))
+
+        W = self.connectivity.values(synapse.W)
+        drift(W, 0.01, -1e-5, steps)
+        drift(
+            self.connectivity.values(synapse.delay), self.max_delay - 0.01, 1e-5, steps
+        )
+        self.delay_plan.invalidate()
+        np.clip(W, self.w_min, self.w_max, out=W)
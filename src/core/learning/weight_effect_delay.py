@@ -3,57 +3,78 @@ import numpy as np
 from PymoNNto import Behaviour
 from src.configs import feature_flags, corpus_config
 from src.configs.plotters import selected_delay_plotter
+from src.core.learning.connectivity import get_connectivity
+from src.core.learning.delay_plan import get_delay_plan
 from src.helpers.base import selected_neurons_from_words
+from src.helpers.precision import weight_dtype
 
 
 class SynapseDelay(Behaviour):
     # fmt: off
     __slots__ = ["max_delay", "delayed_spikes", "weight_effect", "delay_mask"]
+    checkpoint_attrs = ["weight_effect", "head"]
 
     # fmt: on
     def set_variables(self, synapse):
         self.max_delay = self.get_init_attr("max_delay", 0.0, synapse)
         use_shared_weights = self.get_init_attr("use_shared_weights", False, synapse)
         mode = self.get_init_attr("mode", "random", synapse)
-        depth_size = 1 if use_shared_weights else synapse.dst.size
+        connectivity = get_connectivity(synapse)
+        if connectivity.is_sparse and use_shared_weights:
+            raise AssertionError("sparse synapses can not share their delays")
+        delay_shape = (
+            (1, synapse.src.size) if use_shared_weights else connectivity.edge_shape
+        )
 
         if isinstance(mode, float):
             if mode == 0:
                 raise AssertionError("mode can not be zero")
-            synapse.delay = np.ones((depth_size, synapse.src.size)) * mode
+            delay = np.ones(delay_shape) * mode
         else:
             # Delay are initialized very high at our nervous system,
             # Hence we start with the N(max, max/2)
             deviation = self.max_delay / 2
-            synapse.delay = np.random.normal(
+            delay = np.random.normal(
                 loc=self.max_delay,
                 scale=deviation,
-                size=(depth_size, synapse.src.size),
+                size=delay_shape,
             )
-            synapse.delay = np.clip(synapse.delay, deviation, self.max_delay)
+            delay = np.clip(delay, deviation, self.max_delay)
 
         if feature_flags.enable_magic_delays:
             for i, word in enumerate(corpus_config.words):
-                synapse.delay[
-                    i, [corpus_config.letters.index(char) for char in word]
-                ] = np.arange(self.max_delay, 0, -self.max_delay / len(word))
+                connectivity.assign(
+                    delay,
+                    i,
+                    [corpus_config.letters.index(char) for char in word],
+                    np.arange(self.max_delay, 0, -self.max_delay / len(word)),
+                )
+
+        self.connectivity = connectivity
+        synapse.delay = connectivity.matrix(delay.astype(weight_dtype()))
 
         """ History or neuron memory for storing the spiked activity over times """
         self.weight_effect = np.zeros(
-            (depth_size, synapse.src.size, self.max_delay + 1), dtype=np.float32
+            (*delay.shape, self.max_delay + 1), dtype=np.float32
+        )
+        """ Circular write pointer, time slot `k` lives at `(head + k) % (max_delay + 1)` """
+        self.head = 0
+        self.cell_offsets = np.arange(delay.size).reshape(delay.shape) * (
+            self.max_delay + 1
         )
+        # the delays are changed in place every step, so stdp must rebuild its interpolation plan
+        self.delay_plan = get_delay_plan(synapse, self.max_delay)
 
     # NOTE: delay behaviour only update internal vars corresponding to delta delay update.
     def new_iteration(self, synapse):
         """
             1. clip the synapse delay between its boundary
-            2. for every dst layer connection as `dst_index` do
-                2.1. for every spiked src 🚀 layer connection as `src_index` do
-                    2.1.1. update weight share and by_pass connection (in zero delay) directly on the existing variables
+            2. for every synapse of a spiked src 🚀 layer neuron (of all dst layer connections at once) do
+                2.1. scatter weight share and by_pass connection (in zero delay) directly on the existing variables
             3. calculate the synapse.src.fired based on the existing weight-share (@note weight_share_2_firing_pattern)
             4. convert floating nonzero effect to boolean spike pattern for synapse.src.fired
             5. get copy of the active weight share
-            6. make the forward step in the time (zero last + roll)
+            6. make the forward step in the time (zero last + move the circular write pointer)
 
         https://docs.google.com/spreadsheets/d/11Z07E7FCriw9YbbzBBVYK3270W9jz182chuYbtB6Lcw/edit#gid=0
         @note:
@@ -63,44 +84,77 @@ class SynapseDelay(Behaviour):
             activate next layer input. So keeping the `t` layer of all output neurons will give us `weight_scale`
             and the maximum of weight scale in the output axis will give us the firing pattern
         """
-        synapse.delay += 1e-5
-        synapse.delay = np.clip(synapse.delay, 0, self.max_delay)
-
-        rows, cols = selected_neurons_from_words()
-        selected_delay_plotter.add(synapse.delay[rows, cols])
-
-        new_spikes = synapse.src.fired
-        activated_src_neurons = np.argwhere(new_spikes != 0)
-
-        # NOTE: consider swap for loop and benchmarking performance 🐝
-        for dst_index in range(self.weight_effect.shape[0]):
-            for (src_index,) in activated_src_neurons:
-                delay = synapse.delay[dst_index, src_index]
-                delay_index = np.floor(delay).astype(dtype=int)
-                """
-                Intelligence switch for delay share (t=3, t=2) (complement, mantis)
-                delay=2.3 => (0.7, 0.3) => should be **switched** it is closed to 2 most share are for 2 (base_t=2)
-                delay=2.7 => (0.3, 0.7) => should be **switched** it is closed to 3 most share are for 3 (base_t=2)
-                delay=3 => (1, 0) (base_t=3)
-                delay=2 => (1, 0) (base_t=2)
-                """
-                mantis = delay % 1.0 or 1.0
-                complement = 1 - mantis
-                # Delay is going to bypass major section of itself to the current spikes output
-                if delay_index == 0:
-                    self.weight_effect[dst_index, src_index, -2:] += [
-                        mantis,
-                        complement,
-                    ]
-                # Do not do the complement update in case it will be zero
-                elif complement == 0:
-                    self.weight_effect[dst_index, src_index, -delay_index - 1] += mantis
-                else:
-                    self.weight_effect[
-                        dst_index, src_index, -delay_index - 2 : -delay_index
-                    ] += [mantis, complement]
-
-        synapse.src.fire_effect = self.weight_effect[:, :, -1].copy()
-
-        self.weight_effect[:, :, -1] = 0
-        self.weight_effect = np.roll(self.weight_effect, 1, axis=2)
+        delay = self.connectivity.values(synapse.delay)
+        delay += 1e-5
+        np.clip(delay, 0, self.max_delay, out=delay)
+        self.delay_plan.invalidate()
+
+        if selected_delay_plotter.enabled:
+            rows, cols = selected_neurons_from_words()
+            selected_delay_plotter.add(self.connectivity.select(delay, rows, cols))
+
+        time_slots = self.max_delay + 1
+        activated_synapses = self.connectivity.source_edges(synapse.src.fired)
+        delay = delay[activated_synapses]
+
+        if delay.size:
+            delay_indices = delay.astype(int)
+            """
+            Intelligence switch for delay share (t=3, t=2) (complement, mantis)
+            delay=2.3 => (0.7, 0.3) => should be **switched** it is closed to 2 most share are for 2 (base_t=2)
+            delay=2.7 => (0.3, 0.7) => should be **switched** it is closed to 3 most share are for 3 (base_t=2)
+            delay=3 => (1, 0) (base_t=3)
+            delay=2 => (1, 0) (base_t=2)
+            """
+            mantis = delay % 1.0
+            mantis[mantis == 0] = 1.0
+            complement = 1 - mantis
+
+            # Delay is going to bypass major section of itself to the current spikes output (delay_index == 0),
+            # otherwise an integer delay puts its whole share in a single slot (complement == 0)
+            single_slot = (complement == 0) & (delay_indices != 0)
+            mantis_slots = time_slots - 2 - delay_indices + single_slot
+            complement_slots = time_slots - 1 - delay_indices
+
+            # every (dst, src, slot) cell is hit at most once per step, zero shares are harmless
+            cells = self.cell_offsets[activated_synapses]
+            weight_effect = self.weight_effect.reshape(-1)
+            np.add.at(
+                weight_effect, cells + (self.head + mantis_slots) % time_slots, mantis
+            )
+            np.add.at(
+                weight_effect,
+                cells + (self.head + complement_slots) % time_slots,
+                complement,
+            )
+
+        current_slot = (self.head + time_slots - 1) % time_slots
+        synapse.src.fire_effect = self.connectivity.matrix(
+            self.weight_effect[..., current_slot].copy()
+        )
+
+        self.weight_effect[..., current_slot] = 0
+        self.head = (self.head - 1) % time_slots
+
+    def skip_iterations(self, synapse, steps):
+        """
+        Silent steps don't scatter any new share, so only
+            1. the per step delay increase is applied at once
+            2. the pending shares are consumed, all of them are gone after `max_delay + 1` steps
+        """
+        delay = self.connectivity.values(synapse.delay)
+        delay += 1e-5 * steps
+        np.clip(delay, 0, self.max_delay, out=delay)
+        self.delay_plan.invalidate()
+
+        time_slots = self.max_delay + 1
+        consumed = min(steps, time_slots)
+        current_slot = (self.head + time_slots - consumed) % time_slots
+        fire_effect = self.weight_effect[..., current_slot].copy()
+        if steps > time_slots:
+            fire_effect[:] = 0
+        synapse.src.fire_effect = self.connectivity.matrix(fire_effect)
+
+        for slot in range(time_slots - consumed, time_slots):
+            self.weight_effect[..., (self.head + slot) % time_slots] = 0
+        self.head = (self.head - steps) % time_slots
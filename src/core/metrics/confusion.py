@@ -0,0 +1,157 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.core.stabilizer.winner_take_all import NO_WINNER
+from src.data.spike_generator import NO_LABEL
+
+# counted cells above which only the diagonal and the sums of the matrix are kept
+MAX_MATRIX_CELLS = 1 << 24
+# rows of a compact matrix
+HITS, OUTPUTS, PREDICTIONS = range(3)
+
+
+class ConfusionMatrix:
+    """
+    Streaming `(network, output, prediction)` confusion matrix of the word classes, updated in place
+        - classes: the words, UNK (or no word fired), NONE (unlabeled step) and SEVERAL (more than a word fired)
+        - the scores are derived from the counts at any time, nothing is kept per step
+        - compact: a large vocabulary (e.g. 50k words) keeps only the `(network, [hits, outputs, predictions], class)`
+          counts, enough for every score but the matrix itself
+    @note: same scores as sklearn with `average="micro"` over the per-step bit codes of the predictions
+    """
+
+    def __init__(self, words_count, batch_size=1):
+        self.words_count = words_count
+        self.unk = words_count
+        self.none = words_count + 1
+        self.several = words_count + 2
+        classes = words_count + 3
+        self.is_compact = batch_size * classes**2 > MAX_MATRIX_CELLS
+        self.counts = np.zeros(
+            (batch_size, 3 if self.is_compact else classes, classes), dtype=np.int64
+        )
+
+    @property
+    def classes_count(self):
+        return self.counts.shape[-1]
+
+    def reset(self):
+        self.counts[:] = 0
+
+    def output_classes(self, labels):
+        labels = np.asarray(labels)
+        return np.where(labels == NO_LABEL, self.none, labels)
+
+    def prediction_classes(self, fired):
+        """`(..., words)` fired words => the fired word, UNK when silent and SEVERAL otherwise"""
+        fired = np.asarray(fired, dtype=bool)
+        count = fired.sum(axis=-1)
+        return np.where(
+            count == 1,
+            fired.argmax(axis=-1),
+            np.where(count == 0, self.unk, self.several),
+        )
+
+    def add(self, label, fired):
+        """one step: the label and the `(network, words)` fired words of every network"""
+        networks = np.arange(self.counts.shape[0])
+        outputs, predictions = self.output_classes(label), self.prediction_classes(
+            fired
+        )
+        if not self.is_compact:
+            self.counts[networks, outputs, predictions] += 1
+            return
+        outputs = np.broadcast_to(outputs, networks.shape)
+        self.counts[networks, HITS, outputs] += outputs == predictions
+        self.counts[networks, OUTPUTS, outputs] += 1
+        self.counts[networks, PREDICTIONS, predictions] += 1
+
+    def add_classes(self, labels, predictions, network=0):
+        """many steps at once: the labels and the prediction classes of one network"""
+        outputs, predictions = self.output_classes(labels), np.asarray(predictions)
+        if not self.is_compact:
+            np.add.at(self.counts[network], (outputs, predictions), 1)
+            return
+        counts = self.counts[network]
+        counts[HITS] += np.bincount(
+            outputs[outputs == predictions], minlength=self.classes_count
+        )
+        counts[OUTPUTS] += np.bincount(outputs, minlength=self.classes_count)
+        counts[PREDICTIONS] += np.bincount(predictions, minlength=self.classes_count)
+
+    def winner_classes(self, windows):
+        """`(steps, window)` winners => the only winning word, UNK when silent and SEVERAL otherwise"""
+        has_winner = windows != NO_WINNER
+        first = np.where(has_winner, windows, self.words_count).min(axis=1)
+        last = windows.max(axis=1)
+        return np.where(
+            ~has_winner.any(axis=1),
+            self.unk,
+            np.where(first == last, last, self.several),
+        )
+
+    def add_winners(self, labels, winners, label_window=None, network=0):
+        """
+        the winner of every step of one network (e.g. `WinnerTakeAll`), scored as `Metrics`
+            - label_window: None scores every step, otherwise only the labeled steps
+              with the words winning up to `label_window` steps around the label
+        """
+        labels, winners = np.asarray(labels), np.asarray(winners)
+        if label_window is None:
+            self.add_classes(
+                labels, self.winner_classes(winners[:, np.newaxis]), network
+            )
+            return
+        steps = np.flatnonzero(labels != NO_LABEL)
+        padded = np.pad(winners, label_window, constant_values=NO_WINNER)
+        windows = sliding_window_view(padded, 2 * label_window + 1)[steps]
+        self.add_classes(labels[steps], self.winner_classes(windows), network)
+
+    def add_silent(self, labels):
+        """steps of the given labels where no word fired (e.g. skipped steps)"""
+        outputs = np.bincount(self.output_classes(labels), minlength=self.classes_count)
+        if not self.is_compact:
+            self.counts[:, :, self.unk] += outputs
+            return
+        self.counts[:, HITS, self.unk] += outputs[self.unk]
+        self.counts[:, OUTPUTS] += outputs
+        self.counts[:, PREDICTIONS, self.unk] += outputs.sum()
+
+    def matrix(self, network=0):
+        if self.is_compact:
+            raise AssertionError(
+                f"the matrix of {self.words_count} words is not kept, see `is_compact`"
+            )
+        return self.counts[network]
+
+    def hits(self, network=0):
+        if self.is_compact:
+            return self.counts[network, HITS]
+        return self.counts[network].diagonal()
+
+    def output_counts(self, network=0):
+        if self.is_compact:
+            return self.counts[network, OUTPUTS]
+        return self.counts[network].sum(axis=1)
+
+    def prediction_counts(self, network=0):
+        if self.is_compact:
+            return self.counts[network, PREDICTIONS]
+        return self.counts[network].sum(axis=0)
+
+    def accuracy(self, network=0):
+        return self.hits(network).sum() / max(self.output_counts(network).sum(), 1)
+
+    def precision(self, network=0):
+        # every step has exactly one output and one prediction, micro averages are the accuracy
+        return self.accuracy(network)
+
+    def recall(self, network=0):
+        return self.accuracy(network)
+
+    def f1(self, network=0):
+        return self.accuracy(network)
+
+    def class_recall(self, network=0):
+        outputs = self.output_counts(network)
+        return self.hits(network) / np.where(outputs > 0, outputs, 1)
@@ -1,16 +1,9 @@
 import numpy as np
 from matplotlib import pyplot as plt
-from sklearn.metrics import (
-    accuracy_score,
-    precision_score,
-    f1_score,
-    recall_score,
-    confusion_matrix,
-    ConfusionMatrixDisplay,
-)
+from sklearn.metrics import ConfusionMatrixDisplay
 
 from PymoNNto import Behaviour
-from src.configs import feature_flags, corpus_config
+from src.configs import feature_flags
 from src.configs.corpus_config import UNK
 from src.configs.plotters import (
     dw_plotter,
@@ -25,13 +18,24 @@ from src.configs.plotters import (
     selected_weights_plotter,
     dst_firing_plotter,
 )
-from src.core.environement.dopamine import DopamineEnvironment
+from src.core.environement.dopamine import get_dopamine_environment
+from src.core.metrics.confusion import ConfusionMatrix
+from src.core.visualizer.plot_worker import confusion_matrix_job, get_plot_worker
+from src.data.spike_generator import NO_LABEL, whole_labels
+from src.helpers.batch import batch_size
 from src.helpers.network import EpisodeTracker
 
 
 class Metrics(Behaviour):
+    """
+    Word predictions scores of every episode
+        - label_window: None scores every step,
+          otherwise only the labeled steps are scored with the words fired up to `label_window` steps around the label
+    """
+
     # fmt: off
-    __slots__ = ["recording_phase", "outputs", "_old_recording", "_predictions", "words"]
+    __slots__ = ["recording_phase", "outputs", "_old_recording", "confusion", "words", "label_window"]
+    checkpoint_attrs = ["scores"]
 
     # fmt: on
     def set_variables(self, n):
@@ -39,105 +43,160 @@ class Metrics(Behaviour):
             "recording_phase": None,
             "outputs": [],
             "words": [],
+            "label_window": None,
         }
         for attr, value in configure.items():
             setattr(self, attr, self.get_init_attr(attr, value, n))
 
         self._old_recording = n.recording
-        self._predictions = []
+        self.confusion = ConfusionMatrix(n.size // batch_size(n), batch_size(n))
+        # scores of every episode (and network of the batch), kept over the resets
+        self.scores = []
+
+        if self.label_window is not None:
+            labels = whole_labels(self.outputs)
+            self._label_steps = np.flatnonzero(labels != NO_LABEL)
+            self._labels = labels[self._label_steps]
+            # last step every neuron has fired, enough to know if it fired in the window of a label
+            self._last_fired = np.empty(n.size, dtype=np.int64)
+            self.reset()
 
     def reset(self):
-        self._predictions = []
+        self.confusion.reset()
+        if self.label_window is not None:
+            self._last_fired[:] = -self.label_window - 1
+            self._next_label = 0
+
+    def score_labels(self, n, step):
+        """labels whose window ends by the step, `step=None` for the end of the episode"""
+        end = len(self._label_steps)
+        if step is not None:
+            end = np.searchsorted(self._label_steps, step - self.label_window, "right")
+        for index in range(self._next_label, end):
+            window_start = self._label_steps[index] - self.label_window
+            fired = self._last_fired >= window_start
+            self.confusion.add(self._labels[index], fired.reshape(batch_size(n), -1))
+        self._next_label = max(self._next_label, end)
 
     # recording is different from input
     def new_iteration(self, n):
         if self.recording_phase is not None and self.recording_phase != n.recording:
             return
 
-        # if not np.isnan(self.outputs[n.iteration - 1]).any():
-        #     # NOTE: 🚀 can append the int here also
-        self._predictions.append(n.fired.copy())
-        dopamine_plotter.add(DopamineEnvironment.get())
+        if self.label_window is None:
+            self.confusion.add(
+                self.outputs[n.iteration - 1], n.fired.reshape(batch_size(n), -1)
+            )
+        else:
+            self._last_fired[n.fired] = n.iteration - 1
+            self.score_labels(n, n.iteration - 1)
+        dopamine_plotter.add(get_dopamine_environment(n).get())
 
         if n.iteration == len(self.outputs):
-            dw_plotter.plot()
-            w_plotter.plot()
-            legend = list("".join(corpus_config.words))
-            selected_delay_plotter.plot(legend=legend, should_reset=False)
-            selected_weights_plotter.plot(legend=legend, should_reset=False)
-            selected_dw_plotter.plot(legend=legend, should_reset=False)
-            dopamine_plotter.plot(should_reset=False)
-            threshold_plotter.plot(legend=corpus_config.words, should_reset=False)
-            delay_plotter.plot()
-            activity_plotter.plot(should_reset=False)
-            words_stimulus_plotter.plot()
-            dst_firing_plotter.plot(should_reset=False)
-
-            bit_range = 1 << np.arange(self.outputs[0].size)
-
-            presentation_words = self.words + [UNK]
-            # outputs = [o.dot(bit_range) for o in self.outputs if not np.isnan(o).any()]
-            # predictions = [
-            #     p.dot(bit_range)
-            #     for o, p in zip(self.outputs, self._predictions)
-            #     if not np.isnan(o).any()
-            # ]
-
-            # Full confusion matrix plot
-            outputs = [
-                o.dot(bit_range) if not np.isnan(o).any() else -1 for o in self.outputs
-            ]
-            predictions = [p.dot(bit_range) for p in self._predictions]
-            # print("prediction [metrics] =>", Counter(predictions))
-
-            network_phase = "Testing" if "test" in self.tags[0] else "Training"
-            accuracy = accuracy_score(outputs, predictions)
-
-            precision = precision_score(outputs, predictions, average="micro")
-            f1 = f1_score(outputs, predictions, average="micro")
-            recall = recall_score(outputs, predictions, average="micro")
-
-            cm = confusion_matrix(outputs, predictions)
-            cm_sum = cm.sum(axis=1)
-            frequencies = np.asarray(np.unique(outputs, return_counts=True)).T
-            frequencies_p = np.asarray(np.unique(predictions, return_counts=True)).T
-
-            if feature_flags.enable_metric_logs:
-                print(
-                    "---" * 15,
-                    f"{network_phase}",
-                    f"accuracy: {accuracy}",
-                    f"precision: {precision}",
-                    f"f1: {f1}",
-                    f"recall: {recall}",
-                    f"{','.join(presentation_words)} = {cm.diagonal() / np.where(cm_sum > 0, cm_sum, 1)}",
-                    "---" * 15,
-                    f"[Output] frequencies::\n{frequencies}",
-                    f"[Prediction] frequencies::\n{frequencies_p}",
-                    sep="\n",
-                    end="\n\n",
-                )
-                predictions = np.array(predictions)
-                outputs = np.array(outputs)
-                print(
-                    "prediction",
-                    np.sum(predictions == 0),
-                    np.sum(predictions == 1),
-                    np.sum(predictions == 2),
-                )
-                print(
-                    "output",
-                    np.sum(outputs == 0),
-                    np.sum(outputs == 1),
-                    np.sum(outputs == 2),
-                )
-                print("==========")
-
-            if feature_flags.enable_cm_plot:
-                cm_display = ConfusionMatrixDisplay(confusion_matrix=cm)
-                cm_display.plot()
-                plt.title(
-                    f"{network_phase} Confusion Matrix "
-                    f"(episode={EpisodeTracker.episode()})"
+            self.report(n)
+
+    def skip_iterations(self, n, steps):
+        """nothing is predicted over silent steps"""
+        if self.recording_phase is not None and self.recording_phase != n.recording:
+            return
+
+        if self.label_window is None:
+            self.confusion.add_silent(self.outputs[n.iteration - steps : n.iteration])
+        else:
+            self.score_labels(n, n.iteration - 1)
+        dopamine_plotter.add(get_dopamine_environment(n).get())
+
+        if n.iteration == len(self.outputs):
+            self.report(n)
+
+    def report(self, n):
+        if self.label_window is not None:
+            self.score_labels(n, None)
+
+        dw_plotter.plot()
+        w_plotter.plot()
+        legend = list("".join(self.words))
+        selected_delay_plotter.plot(legend=legend, should_reset=False)
+        selected_weights_plotter.plot(legend=legend, should_reset=False)
+        selected_dw_plotter.plot(legend=legend, should_reset=False)
+        dopamine_plotter.plot(should_reset=False)
+        threshold_plotter.plot(legend=self.words, should_reset=False)
+        delay_plotter.plot()
+        activity_plotter.plot(should_reset=False)
+        words_stimulus_plotter.plot()
+        dst_firing_plotter.plot(should_reset=False)
+
+        network_phase = "Testing" if "test" in self.tags[0] else "Training"
+        for network_index in range(batch_size(n)):
+            phase = network_phase
+            if batch_size(n) > 1:
+                phase = f"{network_phase} [network {network_index}]"
+            self.score(phase, network_index)
+
+    def score(self, network_phase, network_index=0):
+        presentation_words = self.words + [UNK, "-", "*"]
+        accuracy = self.confusion.accuracy(network_index)
+
+        precision = self.confusion.precision(network_index)
+        f1 = self.confusion.f1(network_index)
+        recall = self.confusion.recall(network_index)
+        self.scores.append(
+            {
+                "episode": EpisodeTracker.episode(),
+                "network": network_index,
+                "accuracy": accuracy,
+                "precision": precision,
+                "f1": f1,
+                "recall": recall,
+            }
+        )
+
+        frequencies = dict(
+            zip(presentation_words, self.confusion.output_counts(network_index))
+        )
+        frequencies_p = dict(
+            zip(presentation_words, self.confusion.prediction_counts(network_index))
+        )
+
+        if feature_flags.enable_metric_logs:
+            print(
+                "---" * 15,
+                f"{network_phase}",
+                f"accuracy: {accuracy}",
+                f"precision: {precision}",
+                f"f1: {f1}",
+                f"recall: {recall}",
+                f"{','.join(presentation_words)} = {self.confusion.class_recall(network_index)}",
+                "---" * 15,
+                f"[Output] frequencies::\n{frequencies}",
+                f"[Prediction] frequencies::\n{frequencies_p}",
+                sep="\n",
+                end="\n\n",
+            )
+            print("==========")
+
+        # NOTE: a large vocabulary doesn't keep its matrix (see `ConfusionMatrix.is_compact`)
+        if not feature_flags.enable_cm_plot or self.confusion.is_compact:
+            return
+        cm = self.confusion.matrix(network_index)
+        worker = get_plot_worker()
+        if worker is not None and worker.headless:
+            episode = EpisodeTracker.episode()
+            worker.submit(
+                confusion_matrix_job(
+                    worker.figure_path(f"confusion-matrix-{network_phase}-{episode}"),
+                    cm.copy(),
+                    presentation_words,
+                    f"{network_phase} Confusion Matrix (episode={episode})",
                 )
-                plt.show()
+            )
+        else:
+            cm_display = ConfusionMatrixDisplay(
+                confusion_matrix=cm, display_labels=presentation_words
+            )
+            cm_display.plot()
+            plt.title(
+                f"{network_phase} Confusion Matrix "
+                f"(episode={EpisodeTracker.episode()})"
+            )
+            plt.show()
@@ -2,6 +2,8 @@ import numpy as np
 
 from PymoNNto import Behaviour
 from src.configs.plotters import words_stimulus_plotter
+from src.core.learning.connectivity import get_connectivity
+from src.helpers.precision import as_state
 
 
 class CurrentStimulus(Behaviour):
@@ -13,6 +15,7 @@ class CurrentStimulus(Behaviour):
     """
 
     __slots__ = ["dopamine_decay", "outputs"]
+    checkpoint_attrs = ["noise_scale_factor"]
 
     def set_variables(self, neurons):
         configure = {
@@ -31,15 +34,25 @@ class CurrentStimulus(Behaviour):
         for lens in self.synapse_lens_selector:
             synapse = synapse[lens]
 
-        next_layer_stimulus = np.sum(synapse.W * synapse.src.fire_effect, axis=1)
+        connectivity = get_connectivity(synapse)
+        next_layer_stimulus = connectivity.row_sum(
+            connectivity.values(synapse.W)
+            * connectivity.values(synapse.src.fire_effect)
+        )
         # shrink the noise scale factor at the beginning of each episode
         if synapse.iteration == 1:
             self.noise_scale_factor *= self.adaptive_noise_scale
 
         noise = (
             self.noise_scale_factor
-            * (np.random.random(next_layer_stimulus.shape) - 0.5)
+            * (as_state(np.random.random(next_layer_stimulus.shape)) - 0.5)
             * 2
         )
         synapse.dst.I = next_layer_stimulus * self.stimulus_scale_factor + noise
         words_stimulus_plotter.add(synapse.dst.I)
+
+    def skip_iterations(self, neurons, steps):
+        """no stimulus arrives over silent steps, the noise is not simulated"""
+        if neurons.iteration - steps < 1:
+            self.noise_scale_factor *= self.adaptive_noise_scale
+        neurons.I = neurons.I * 0
@@ -0,0 +1,94 @@
+import numpy as np
+
+from src.configs.plotters import activity_plotter, dst_firing_plotter
+from src.core.neurons.neurons import StreamableLIFNeurons
+from src.core.stabilizer.activity_base_homeostasis import ActivityBaseHomeostasis
+from src.core.stabilizer.winner_take_all import NO_WINNER
+from src.helpers.batch import batch_size, per_network
+
+
+class FusedOutputNeurons(StreamableLIFNeurons, ActivityBaseHomeostasis):
+    """
+    `StreamableLIFNeurons` + `ActivityBaseHomeostasis` + `WinnerTakeAll` of the output (words) layer in one behaviour
+        - same init attributes as the LIF neurons and the homeostasis
+        - every step is computed in place over preallocated buffers (`out=`/`where=`), no temporary vector per step
+        - same spikes, thresholds and activities as the separate behaviours (in this order),
+          the homeostasis counts the spikes before the winner is selected
+        - n.winner: fired word of every network, as published by `WinnerTakeAll`
+
+    @note: `n.fired`, `n.v` and `n.old_v` are updated in place, a reference to them must be copied to be kept;
+        the separate behaviours are still used by default (see `feature_flags.enable_fused_output_neurons`)
+    """
+
+    def set_variables(self, n):
+        StreamableLIFNeurons.set_variables(self, n)
+        ActivityBaseHomeostasis.set_variables(self, n)
+        if self.stream is not None:
+            raise AssertionError("output neurons are driven by their stimulus only")
+
+        # per neuron thresholds of the homeostasis
+        n.threshold = np.ones_like(n.v) * n.threshold
+        n.fired = np.zeros(n.size, dtype=bool)
+        n.old_v = n.v.copy()
+        self._dv = np.empty_like(n.v)
+        self._stimulus = np.empty_like(n.v)
+        self._silent = np.empty(n.size, dtype=bool)
+        self._spikes = np.empty(batch_size(n), dtype=int)
+        self._winners = np.empty_like(self._spikes)
+        n.winner = np.full(batch_size(n), NO_WINNER)
+
+    def new_iteration(self, n):
+        # integration: v += (v_rest - v) * dt / tau + R * I
+        np.subtract(n.v_rest, n.v, out=self._dv)
+        np.multiply(self._dv, self.dt, out=self._dv)
+        np.divide(self._dv, n.tau, out=self._dv)
+        np.multiply(n.R, n.I, out=self._stimulus)
+        np.add(self._dv, self._stimulus, out=self._dv)
+        np.add(n.v, self._dv, out=n.v)
+        np.copyto(n.old_v, n.v)
+
+        # threshold crossing and reset
+        np.greater_equal(n.v, n.threshold, out=n.fired)
+        spikes = np.count_nonzero(n.fired)
+
+        # activities, before the winner is selected
+        if spikes:
+            np.copyto(n.v, n.v_reset, where=n.fired)
+            np.logical_not(n.fired, out=self._silent)
+            np.add(
+                self.activities,
+                self.firing_reward,
+                out=self.activities,
+                where=n.fired,
+            )
+            np.add(
+                self.activities,
+                self.non_firing_penalty,
+                out=self.activities,
+                where=self._silent,
+            )
+        else:
+            np.add(self.activities, self.non_firing_penalty, out=self.activities)
+        activity_plotter.add(self.activities)
+        dst_firing_plotter.add(n.fired)
+        if (n.iteration % self.window_size) == 0:
+            self.update_threshold(n, n.iteration)
+
+        # winner: the highest potential among the fired neurons of every network
+        if not spikes:
+            n.winner.fill(NO_WINNER)
+            return
+        fired = per_network(n.fired, n)
+        np.sum(fired, axis=1, out=self._spikes)
+        if spikes > 1 and self._spikes.max() > 1:
+            np.copyto(n.old_v, np.NINF, where=self._silent)
+            np.argmax(per_network(n.old_v, n), axis=1, out=self._winners)
+            for network in np.flatnonzero(self._spikes > 1):
+                fired[network] = False
+                fired[network, self._winners[network]] = True
+        np.argmax(fired, axis=1, out=n.winner)
+        np.copyto(n.winner, NO_WINNER, where=self._spikes == 0)
+
+    def skip_iterations(self, n, steps):
+        StreamableLIFNeurons.skip_iterations(self, n, steps)
+        ActivityBaseHomeostasis.skip_iterations(self, n, steps)
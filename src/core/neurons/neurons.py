@@ -2,6 +2,7 @@ import numpy as np
 
 from PymoNNto import Behaviour
 from src.configs import corpus_config, network_config
+from src.helpers.precision import neuron_vec
 
 
 class StreamableLIFNeurons(Behaviour):
@@ -21,7 +22,7 @@ class StreamableLIFNeurons(Behaviour):
         has_long_term_effect = self.get_init_attr("has_long_term_effect", False, n)
 
         configure = {
-            "I": n.get_neuron_vec(mode="zeros"),
+            "I": neuron_vec(n),
             "R": 1,
             "fired": n.get_neuron_vec(mode="zeros") > 0,
             "tau": 3,
@@ -33,7 +34,7 @@ class StreamableLIFNeurons(Behaviour):
         for attr, value in configure.items():
             setattr(n, attr, self.get_init_attr(attr, value, n))
         # n.v = n.get_neuron_vec(mode="ones") * n.v_rest
-        n.v = n.v_rest * n.get_neuron_vec(mode="ones")
+        n.v = n.v_rest * neuron_vec(n, mode="ones")
         # NOTE: 🧬 For long term support, will be used in e.g. Homeostasis
         if has_long_term_effect:
             n.threshold = np.ones_like(n.v) * n.threshold
@@ -62,3 +63,23 @@ class StreamableLIFNeurons(Behaviour):
 
         if np.sum(n.fired) > 0:
             n.v[n.fired] = n.v_reset
+
+    def skip_iterations(self, n, steps):
+        """closed form of `steps` silent steps (I=0): exponential decay of v toward v_rest"""
+        if network_config.is_debug_mode and self.joined_corpus is not None:
+            n.seen_char += self.joined_corpus[n.iteration - steps : n.iteration]
+            n.seen_char = n.seen_char[-corpus_config.words_capture_window_size :]
+
+        is_forced_spike = self.stream is not None
+        n.I = self.stream[n.iteration - 1] if is_forced_spike else n.I * 0
+
+        n.v = n.v_rest + (n.v - n.v_rest) * (1 - self.dt / n.tau) ** steps
+        if self.capture_old_v:
+            n.old_v = n.v.copy()
+
+        if is_forced_spike:
+            n.fired[:] = False
+        else:
+            n.fired = n.v >= n.threshold
+        if np.sum(n.fired) > 0:
+            n.v[n.fired] = n.v_reset
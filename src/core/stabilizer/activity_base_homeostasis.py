@@ -4,16 +4,25 @@ from PymoNNto import Behaviour
 
 # should be after or be
 from src.configs.plotters import activity_plotter, threshold_plotter, dst_firing_plotter
+from src.helpers.batch import batched, batch_size
+from src.helpers.precision import neuron_vec
 
 
 class ActivityBaseHomeostasis(Behaviour):
+    checkpoint_attrs = ["activities", "exhaustion"]
+
     def set_variables(self, n):
         self.window_size = self.get_init_attr("window_size", 100, n)
-        self.updating_rate = self.get_init_attr("updating_rate", 0.001, n)
+        self.updating_rate = batched(self.get_init_attr("updating_rate", 0.001, n), n)
 
-        activity_rate = np.ceil(self.get_init_attr("activity_rate", 5, n) / n.size)
+        # the desired activity is shared between the neurons of each network in the batch
+        # (network_size: all the neurons of a network split into shards, see `src.helpers.sharding`)
+        network_size = self.get_init_attr("network_size", n.size // batch_size(n), n)
+        activity_rate = np.ceil(
+            self.get_init_attr("activity_rate", 5, n) / network_size
+        )
         # NOTE: it might cause an error in the long them
-        if activity_rate * n.size > self.window_size:
+        if activity_rate * network_size > self.window_size:
             raise Exception(
                 "Ceiling the activity in this window size cause problem in homeostasis"
             )
@@ -24,11 +33,13 @@ class ActivityBaseHomeostasis(Behaviour):
                 + " and must be int or float"
             )
 
+        # desired spikes of every neuron per window
+        self.activity_target = activity_rate
         self.firing_reward = 1
         self.non_firing_penalty = -activity_rate / (self.window_size - activity_rate)
 
-        self.activities = n.get_neuron_vec(mode="zeros")
-        self.exhaustion = n.get_neuron_vec(mode="zeros")
+        self.activities = neuron_vec(n)
+        self.exhaustion = neuron_vec(n)
         # self.history = []
         # self.counter = Counter()
 
@@ -42,20 +53,34 @@ class ActivityBaseHomeostasis(Behaviour):
         dst_firing_plotter.add(n.fired)
         # self.history.append(n.fired.copy())
         if (n.iteration % self.window_size) == 0:
-            self.activities[np.isclose(self.activities, 0)] = 0
-            # b = 1 << np.arange(self.history[0].size)
-            # count = Counter([c.dot(b) for c in self.history])
-            # self.counter.update(count)
-            # print("[counter]", self.counter)
-            change = (
-                -self.activities
-                * self.updating_rate
-                * 0.99 ** (n.iteration // self.window_size)
-            )
-            # self.history.clear()
+            self.update_threshold(n, n.iteration)
+
+    def update_threshold(self, n, iteration):
+        self.activities[np.isclose(self.activities, 0)] = 0
+        # b = 1 << np.arange(self.history[0].size)
+        # count = Counter([c.dot(b) for c in self.history])
+        # self.counter.update(count)
+        # print("[counter]", self.counter)
+        change = (
+            -self.activities
+            * self.updating_rate
+            * 0.99 ** (iteration // self.window_size)
+        )
+        # self.history.clear()
+
+        # For: Logic for adaptive updating rate (see old trunks)
+        n.threshold -= change
+        threshold_plotter.add(n.threshold)
+        # TODO: normalize the activity
+        self.activities *= 0
 
-            # For: Logic for adaptive updating rate (see old trunks)
-            n.threshold -= change
-            threshold_plotter.add(n.threshold)
-            # TODO: normalize the activity
-            self.activities *= 0
+    def skip_iterations(self, n, steps):
+        """nothing fires over silent steps, the penalty is accumulated up to every window boundary on the way"""
+        iteration = n.iteration - steps
+        while iteration < n.iteration:
+            boundary = (iteration // self.window_size + 1) * self.window_size
+            chunk = min(boundary, n.iteration) - iteration
+            self.activities += self.non_firing_penalty * chunk
+            iteration += chunk
+            if iteration % self.window_size == 0:
+                self.update_threshold(n, iteration)
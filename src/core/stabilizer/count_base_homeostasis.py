@@ -0,0 +1,97 @@
+import numpy as np
+
+from src.configs.plotters import activity_plotter, dst_firing_plotter, threshold_plotter
+from src.core.stabilizer.activity_base_homeostasis import ActivityBaseHomeostasis
+from src.helpers.batch import batched
+
+
+class CountBaseHomeostasis(ActivityBaseHomeostasis):
+    """
+    `ActivityBaseHomeostasis` over an integer spike count per neuron, the activity is only derived when a window ends
+        - same init attributes, the activity of a neuron over its window is `count * reward + (steps - count) * penalty`
+        - neuron_windows: window size of every neuron (scalar, per network or per neuron), `window_size` by default;
+          the desired activity of a neuron is scaled to its own window
+        - target_ema: the desired spikes of a neuron follow the exponential moving average of its own spikes
+          (`target += target_ema * (spikes - target)` at the end of each of its windows), 0 keeps them fixed
+        - a step only adds the spikes to the counts, skipped steps only close the windows crossed on the way
+        - activities: the activities of the last window of every neuron
+
+    @note: same thresholds as `ActivityBaseHomeostasis` up to the float rounding of its step by step accumulation
+    """
+
+    checkpoint_attrs = ["counts", "last_update", "clock", "targets", "penalties"]
+
+    def set_variables(self, n):
+        super().set_variables(n)
+        windows = batched(self.get_init_attr("neuron_windows", self.window_size, n), n)
+        self.windows = np.full(n.size, windows, dtype=np.int64)
+        self.window_sizes = np.unique(self.windows)
+        self.target_ema = self.get_init_attr("target_ema", 0.0, n)
+
+        self.targets = self.activity_target * self.windows / self.window_size
+        if np.any(self.targets >= self.windows):
+            raise AssertionError("the desired activity must be lower than the window")
+        self.penalties = self.penalty(self.targets, self.windows)
+
+        self.counts = np.zeros(n.size, dtype=np.int64)
+        # clock: steps since the beginning, last_update: clock of the last window end of every neuron
+        self.clock = 0
+        self.last_update = np.zeros(n.size, dtype=np.int64)
+
+    @staticmethod
+    def penalty(targets, windows):
+        return -targets / (windows - targets)
+
+    def window_activities(self, clock=None):
+        """activities of the current window of every neuron"""
+        steps = (self.clock if clock is None else clock) - self.last_update
+        return self.counts * self.firing_reward + (steps - self.counts) * self.penalties
+
+    def new_iteration(self, n):
+        np.add(self.counts, n.fired, out=self.counts)
+        self.clock += 1
+        if activity_plotter.enabled:
+            activity_plotter.add(self.window_activities())
+        dst_firing_plotter.add(n.fired)
+        for window in self.window_sizes:
+            if n.iteration % window == 0:
+                self.update_threshold(n, n.iteration)
+                break
+
+    def update_threshold(self, n, iteration, clock=None):
+        """close the windows ending at `iteration` (at `clock`, the current clock by default)"""
+        clock = self.clock if clock is None else clock
+        due = iteration % self.windows == 0
+        activities = self.window_activities(clock)
+        activities[np.isclose(activities, 0)] = 0
+        change = -activities * self.updating_rate * 0.99 ** (iteration // self.windows)
+        n.threshold -= np.where(due, change, 0)
+        threshold_plotter.add(n.threshold)
+        self.activities = np.where(due, activities, self.activities)
+
+        if self.target_ema:
+            spikes = (
+                self.counts * self.windows / np.maximum(clock - self.last_update, 1)
+            )
+            targets = self.targets + self.target_ema * (spikes - self.targets)
+            # a target of a whole window would never be penalized
+            targets = np.clip(targets, 0, self.windows - 1)
+            self.targets = np.where(due, targets, self.targets)
+            self.penalties = self.penalty(self.targets, self.windows)
+        self.counts[due] = 0
+        self.last_update[due] = clock
+
+    def skip_iterations(self, n, steps):
+        """nothing fires over silent steps, the windows ending on the way are closed in order"""
+        start = n.iteration - steps
+        boundaries = np.unique(
+            np.concatenate(
+                [
+                    np.arange((start // window + 1) * window, n.iteration + 1, window)
+                    for window in self.window_sizes
+                ]
+            )
+        )
+        for iteration in boundaries:
+            self.update_threshold(n, iteration, self.clock + iteration - start)
+        self.clock += steps
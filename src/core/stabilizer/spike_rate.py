@@ -3,6 +3,7 @@ from collections import Counter
 import numpy as np
 
 from PymoNNto import Behaviour
+from src.data.spike_generator import label_codes
 
 
 class SpikeRate(Behaviour):
@@ -16,12 +17,11 @@ class SpikeRate(Behaviour):
     def new_iteration(self, n):
         self.prediction_history.append(n.fired)
         if len(self.prediction_history) == self.interval_size:
-            output_history = self.outputs[-self.interval_size :]  # [True, False],
-            bit_range = 1 << np.arange(self.outputs[0].size)
+            output_history = self.outputs[-self.interval_size :]  # [0, -1, ...]
+            bit_range = 1 << np.arange(n.size)
 
-            outputs = Counter(
-                [o.dot(bit_range) for o in output_history if not np.isnan(o).any()]
-            )
+            outputs = label_codes(output_history, n.size)
+            outputs = Counter(outputs[outputs != -1])
             predictions = Counter([p.dot(bit_range) for p in self.prediction_history])
 
             for neuron_index in outputs:
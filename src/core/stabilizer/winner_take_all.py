@@ -1,19 +1,44 @@
 import numpy as np
 
 from PymoNNto import Behaviour
+from src.helpers.batch import batch_size, per_network
+
+NO_WINNER = -1
+SEVERAL_WINNERS = -2
+
+
+def fired_winners(n):
+    """`(batch,)` fired word of every network, NO_WINNER when none fired and SEVERAL_WINNERS when more than one"""
+    fired = per_network(n.fired, n)
+    spikes = np.count_nonzero(fired, axis=1)
+    return np.where(
+        spikes == 1,
+        np.argmax(fired, axis=1),
+        np.where(spikes == 0, NO_WINNER, SEVERAL_WINNERS),
+    )
 
 
 class WinnerTakeAll(Behaviour):
+    """n.winner: `(batch,)` fired word of every network after the selection, NO_WINNER when none fired"""
+
+    def set_variables(self, n):
+        n.winner = np.full(batch_size(n), NO_WINNER)
+
     def new_iteration(self, n):
-        fired = n.fired
-        if np.sum(fired) > 1:
-            temp_fired = n.get_neuron_vec(mode="zeros") > 0
+        # one winner in every network of the batch
+        fired = per_network(n.fired, n)
+        has_multiple_winners = np.sum(fired, axis=1) > 1
+        if has_multiple_winners.any():
+            temp_fired = fired.copy()
             """ NOTE: old_v can be negative, positive, or zero
                 the true action is to select among the fired neurons only
                 so we set the non fired neurons to negative-infinity
                 and select the maximum index, the index would definitely be beside the fired ones. 
                 NOTE: old_v will be reset to a brand new copy of v in the next iteration
             """
-            n.old_v[np.logical_not(fired)] = np.NINF
-            temp_fired[np.argmax(n.old_v)] = True
-            n.fired = temp_fired
+            n.old_v[np.logical_not(n.fired)] = np.NINF
+            winners = np.argmax(per_network(n.old_v, n), axis=1)[has_multiple_winners]
+            temp_fired[has_multiple_winners] = False
+            temp_fired[has_multiple_winners, winners] = True
+            n.fired = temp_fired.reshape(-1)
+        n.winner = fired_winners(n)
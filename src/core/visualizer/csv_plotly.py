@@ -1,12 +1,14 @@
-import pandas as pd
 import plotly.express as px
 
+from src.core.visualizer.telemetry import load_series
+
 if __name__ == "__main__":
-    df = pd.read_csv("../../out/csv/dst firing-1.csv")
-    df = df.astype(int)
-    # fig = px.line(df[["id", "abc"]], x="id", y="abc", title="abc")
-    # fig = px.line(df[["id", "omn"]], x="id", y="omn", title="omn")
+    # python -m src.core.visualizer.csv_plotly (with `feature_flags.enable_telemetry` on in the training)
+    df = load_series("out/telemetry", "dst firing", episodes=(1, 1))
+    df = df.astype(int).rename(columns={0: "abc", 1: "omn"})
+    # fig = px.line(df[["step", "abc"]], x="step", y="abc", title="abc")
+    # fig = px.line(df[["step", "omn"]], x="step", y="omn", title="omn")
     fig = px.scatter(df[["abc", "omn"]])
-    # fig = px.scatter(df[["id", "abc"]], x="id", y="abc", title="abc", color=1)
+    # fig = px.scatter(df[["step", "abc"]], x="step", y="abc", title="abc", color=1)
     # fig.show()
     fig.show()
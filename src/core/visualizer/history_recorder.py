@@ -1,7 +1,32 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
+from src.core.visualizer.telemetry import get_telemetry_sink
+from src.helpers.network import EpisodeTracker
+
+REDUCTIONS = {
+    "min": np.minimum,
+    "max": np.maximum,
+    "mean": np.add,
+}
+
 
 class HistoryRecorder(ABC):
+    """
+    Bounded history of a series (scalar, vector or matrix per step) for the plots
+        - the values are written into a preallocated ring buffer of `capacity` rows, the oldest rows are overwritten,
+          the telemetry sink of the run (when enabled) receives them before (see `export`)
+        - grow: the buffer doubles when it is full instead, e.g. for the rows kept over the episodes
+          (plotted with `should_reset=False`)
+        - window_size: one row every `window_size` added values (decimation)
+        - reduction: None keeps the first value of every window, min|max|mean reduce the whole window instead
+        - `history` is the ordered `(rows, *value shape)` array of the recorded rows, `steps` their add counters
+        - `recorded` counts the rows since the last reset, including the overwritten ones
+
+    @note: the values are copied into the buffer, `should_copy_on_add` is kept for the old configs
+    """
+
     def __init__(
         self,
         title,
@@ -12,9 +37,14 @@ class HistoryRecorder(ABC):
         ylim=None,
         save_as_csv=None,
         every_n_episode=None,
+        capacity=10_000,
+        reduction=None,
+        grow=False,
     ):
+        if reduction not in (None, *REDUCTIONS):
+            raise AssertionError(f"reduction must be one of {list(REDUCTIONS)}|None")
+
         self.ylim = ylim
-        self.history = []
         self.title = title
         self.window_size = window_size
         self.counter = 0
@@ -23,22 +53,134 @@ class HistoryRecorder(ABC):
         self.should_copy = should_copy_on_add
         self.save_as_csv = save_as_csv
         self.every_n_episode = every_n_episode
+        self.capacity = capacity
+        self.reduction = reduction
+        self.grow = grow
+
+        self._buffer = None
+        self._steps = None
+        self._window = None
+        self._start = 0
+        self._size = 0
+        self.recorded = 0
+        self._exported = 0
+
+    def _allocate(self, value):
+        value = np.asarray(value)
+        dtype = value.dtype if self.reduction is None else np.float64
+        self._buffer = np.empty((self.capacity, *value.shape), dtype=dtype)
+        self._steps = np.empty(self.capacity, dtype=np.int64)
+        if self.reduction is not None:
+            self._window = np.empty(value.shape)
+
+    def _grow(self):
+        """double the capacity, the rows are kept in order"""
+        self._buffer = np.concatenate((self.history, np.empty_like(self._buffer)))
+        self._steps = np.concatenate((self.steps, np.empty_like(self._steps)))
+        self._start = 0
+        self.capacity *= 2
+
+    def _append(self, value):
+        if self._size == self.capacity:
+            if self.grow:
+                self._grow()
+            elif self.recorded - self._exported >= self.capacity:
+                # the oldest row is not exported yet
+                self.flush()
+        slot = (self._start + self._size) % self.capacity
+        self._buffer[slot] = value
+        self._steps[slot] = self.counter
+        self.recorded += 1
+        if self._size < self.capacity:
+            self._size += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
 
     def add(self, value):
         if not self.enabled:
             return
-        if self.counter % self.window_size == 0:
-            self.history.append(value if not self.should_copy else value.copy())
+        if self._buffer is None or np.shape(value) != self._buffer.shape[1:]:
+            # e.g. the same plotter recording another network
+            if self._buffer is not None:
+                self.flush()
+            self._allocate(value)
+            self.reset()
+
+        position = self.counter % self.window_size
+        if self.reduction is None:
+            if position == 0:
+                self._append(value)
+        else:
+            if position == 0:
+                self._window[...] = value
+            else:
+                reduce = REDUCTIONS[self.reduction]
+                reduce(self._window, value, out=self._window)
+            if position == self.window_size - 1:
+                if self.reduction == "mean":
+                    self._window /= self.window_size
+                self._append(self._window)
         self.counter += 1
 
+    def _ordered(self, buffer):
+        end = self._start + self._size
+        if end <= self.capacity:
+            return buffer[self._start : end]
+        return np.concatenate((buffer[self._start :], buffer[: end - self.capacity]))
+
+    @property
+    def history(self):
+        if self._buffer is None:
+            return np.empty(0)
+        return self._ordered(self._buffer)
+
+    @property
+    def steps(self):
+        if self._steps is None:
+            return np.empty(0, dtype=np.int64)
+        return self._ordered(self._steps)
+
     def get(self):
         return self.history
 
+    @property
+    def overwritten(self):
+        """rows recorded since the last reset but not in the history anymore"""
+        return self.recorded - self._size
+
+    def latest(self):
+        return self._buffer[(self._start + self._size - 1) % self.capacity]
+
     def configure_plot(self, ylim=None):
         self.ylim = ylim
 
+    def flush(self):
+        """rows recorded since the last export into the telemetry sink of the run, if any"""
+        sink = get_telemetry_sink()
+        if sink is None:
+            # nothing to export to, a full buffer is not flushed again before `capacity` rows
+            self._exported = self.recorded
+            return
+        self.export(sink, EpisodeTracker.episode())
+
+    def export(self, sink, episode):
+        """rows recorded since the last export into the telemetry sink"""
+        rows = min(self.recorded - self._exported, self._size)
+        if rows > 0:
+            # copies, the sink keeps the rows until its chunk is written and the buffer is reused
+            sink.append(
+                self.title,
+                episode,
+                self.steps[-rows:].copy(),
+                self.history[-rows:].copy(),
+            )
+        self._exported = self.recorded
+
     def reset(self):
-        self.history = []
+        self._start = 0
+        self._size = 0
+        self.recorded = 0
+        self._exported = 0
 
     @abstractmethod
     def plot(self):
@@ -3,6 +3,8 @@ import numpy as np
 import pandas as pd
 
 from src.core.visualizer.history_recorder import HistoryRecorder
+from src.core.visualizer.plot_worker import csv_job, get_plot_worker, lines_job
+from src.core.visualizer.telemetry import get_telemetry_sink
 from src.helpers.network import EpisodeTracker
 
 
@@ -10,10 +12,27 @@ class HistoryRecorder1D(HistoryRecorder):
     def plot(self, scale=None, should_reset=True, legend=None):
         if not self.enabled:
             return
+        if not should_reset and self.overwritten:
+            raise AssertionError(
+                f"{self.title}: {self.overwritten} rows kept over the episodes were overwritten, "
+                + "the recorder must grow"
+            )
+
+        # NOTE: the telemetry store replaces the csv files
+        sink = get_telemetry_sink()
+        self.flush()
+
+        worker = get_plot_worker()
+        if worker is not None:
+            self.submit_plot(worker, scale, should_reset, legend)
+            if worker.headless:
+                if should_reset:
+                    self.reset()
+                return
 
         plt.title(self.title + f" (eps={EpisodeTracker.episode()})")
 
-        if self.save_as_csv is not None:
+        if self.save_as_csv is not None and worker is None and sink is None:
             pd.DataFrame(
                 np.array(self.history) * scale
                 if scale is not None
@@ -46,3 +65,30 @@ class HistoryRecorder1D(HistoryRecorder):
 
         if should_reset:
             self.reset()
+
+    def submit_plot(self, worker, scale, should_reset, legend):
+        """csv export (and the figure when headless) rendered by the plot worker"""
+        episode = EpisodeTracker.episode()
+        history = np.array(self.history)
+        if scale is not None:
+            history = history * scale
+        if self.save_as_csv is not None and get_telemetry_sink() is None:
+            worker.submit(csv_job(f"out/csv/{self.title}-{episode}.csv", history))
+        if not worker.headless:
+            return
+
+        separators = []
+        if not should_reset and self.history_steps is not None:
+            self.history_steps.append(len(history))
+            separators = list(self.history_steps)
+        if self.every_n_episode is None or episode % self.every_n_episode == 0:
+            worker.submit(
+                lines_job(
+                    worker.figure_path(f"{self.title}-{episode}"),
+                    history,
+                    f"{self.title} (eps={episode})",
+                    legend=legend,
+                    separators=separators,
+                    ylim=self.ylim,
+                )
+            )
@@ -7,6 +7,7 @@ import matplotlib.pyplot as plt
 from tqdm import tqdm
 
 from src.core.visualizer.history_recorder import HistoryRecorder
+from src.core.visualizer.plot_worker import get_plot_worker, gif_job, image_job
 
 
 class HistoryRecorder2D(HistoryRecorder):
@@ -17,11 +18,25 @@ class HistoryRecorder2D(HistoryRecorder):
         self.add(value)
         # side effect in window size
         if self.counter % self.window_size == 0:
+            worker = get_plot_worker()
+            if worker is not None:
+                # the frame is dropped when the worker is behind
+                worker.submit(
+                    image_job(
+                        f"./out/{self.title}-{self.counter}.png",
+                        self.latest().copy(),
+                        f"{self.title}-{self.counter}",
+                        **kwargs,
+                    ),
+                    droppable=True,
+                )
+                self.reset()
+                return
             plt.title(f"{self.title}-{self.counter}")
             # NOTE: clear the memory after figuring
-            plt.imshow(self.history.pop(), **kwargs)
+            plt.imshow(self.latest(), **kwargs)
             plt.savefig(f"./out/{self.title}-{self.counter}.png")
-            self.history.clear()
+            self.reset()
             plt.clf()
 
     @staticmethod
@@ -33,6 +48,18 @@ class HistoryRecorder2D(HistoryRecorder):
             return
 
         time = localtime()
+        worker = get_plot_worker()
+        if worker is not None:
+            worker.submit(
+                gif_job(
+                    f"./out/{self.title} {time.tm_hour}-{time.tm_min}-{time.tm_sec}.gif",
+                    f"./out/{self.title}-*.png",
+                    HistoryRecorder2D.sort_key,
+                )
+            )
+            self.reset()
+            return
+
         with imageio.get_writer(
             f"./out/{self.title} {time.tm_hour}-{time.tm_min}-{time.tm_sec}.gif",
             mode="I",
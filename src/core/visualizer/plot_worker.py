@@ -0,0 +1,149 @@
+"""
+Background worker rendering the plots and exports off the simulation loop
+    - the recorders submit snapshots (copies) of their buffers, the worker thread renders them in order
+    - the queue is bounded: frames (e.g. the `HistoryRecorder2D` images) are dropped when it is full,
+      the other jobs (csv, gif, episode plots) wait for a free slot
+    - headless: the figures are saved as png into `out/plots` instead of being shown (e.g. on servers)
+    - the figures are rendered with the object oriented matplotlib API (`Figure` + Agg canvas), not with pyplot,
+      so the worker thread never touches the pyplot state of the main thread
+
+@note: enabled by `feature_flags.enable_async_plotter`, `flush` waits for all the submitted jobs
+"""
+
+import atexit
+import os
+import queue
+import threading
+from glob import glob
+
+import imageio
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from sklearn.metrics import ConfusionMatrixDisplay
+
+from src.configs import feature_flags
+
+_worker = None
+
+
+def render_figure(path, draw):
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    draw(figure.add_subplot())
+    figure.savefig(path)
+
+
+def image_job(path, image, title, **kwargs):
+    def draw(axes):
+        axes.set_title(title)
+        axes.imshow(image, **kwargs)
+
+    return lambda: render_figure(path, draw)
+
+
+def lines_job(path, history, title, legend=None, separators=(), ylim=None):
+    def draw(axes):
+        axes.set_title(title)
+        axes.plot(history)
+        if legend is not None:
+            axes.legend(legend)
+        for x in separators:
+            axes.axvline(x, color="b", linestyle="--", alpha=0.3)
+        if ylim is not None:
+            axes.set_ylim(ylim)
+
+    return lambda: render_figure(path, draw)
+
+
+def confusion_matrix_job(path, cm, labels, title):
+    def draw(axes):
+        ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=labels).plot(ax=axes)
+        axes.set_title(title)
+
+    return lambda: render_figure(path, draw)
+
+
+def csv_job(path, values):
+    return lambda: pd.DataFrame(values).to_csv(path)
+
+
+def gif_job(path, frames_pattern, sort_key):
+    def job():
+        frames = sorted(glob(frames_pattern), key=sort_key)
+        with imageio.get_writer(path, mode="I") as writer:
+            for filename in frames:
+                writer.append_data(imageio.imread(filename))
+        for filename in frames:
+            os.remove(filename)
+
+    return job
+
+
+class PlotWorker:
+    """
+    One thread rendering the submitted jobs (no argument callables) in order
+        - max_pending: size of the queue
+        - headless: save the figures instead of showing them
+    """
+
+    def __init__(self, max_pending=64, headless=True, directory="out/plots"):
+        self.headless = headless
+        self.directory = directory
+        self.dropped = 0
+        self.failed = 0
+        self._queue = queue.Queue(max_pending)
+        self._thread = threading.Thread(target=self._run, name="plot-worker")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                job()
+            except Exception as error:
+                # a broken plot must not stop the other exports
+                self.failed += 1
+                print(f"[plot-worker] {error!r}")
+            finally:
+                self._queue.task_done()
+
+    def submit(self, job, droppable=False):
+        """returns False when a droppable job is dropped because of the backpressure"""
+        if not droppable:
+            self._queue.put(job)
+            return True
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def figure_path(self, name):
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{name}.png")
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+def get_plot_worker():
+    """the shared worker, None when the plots are rendered synchronously"""
+    global _worker
+    if not feature_flags.enable_async_plotter:
+        return None
+    if _worker is None:
+        _worker = PlotWorker(
+            feature_flags.async_plotter_queue_size,
+            headless=feature_flags.headless_plotter,
+        )
+        atexit.register(_worker.close)
+    return _worker
@@ -0,0 +1,140 @@
+"""
+Columnar telemetry of the recorders, one store for all the series of a run instead of a csv per series and episode
+    - every row is keyed by `(run, episode, step)`, `step` being the add counter of the recorder at that row
+      and `run` the sink that wrote it, the runs sharing a directory are never mixed
+    - the rows of every series are buffered and written in chunks: `<series>-<chunk>.npz` with
+      `episode`, `step` and `values` columns
+    - `index.json` lists the chunks with their run and episode range, so a loader only reads the chunks it needs
+
+usage: `load_series("out/telemetry", "threshold", episodes=(10, 20))` (the latest run)
+"""
+
+import atexit
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from src.configs import feature_flags
+from src.helpers.base import write_atomically
+
+INDEX = "index.json"
+FILE_NAME_UNSAFE = r"[^\w.-]+"
+
+_sink = None
+
+
+def read_index(directory):
+    path = os.path.join(directory, INDEX)
+    if not os.path.exists(path):
+        return []
+    with open(path) as file:
+        return json.load(file)["chunks"]
+
+
+class TelemetrySink:
+    """
+    Append only store of the recorder series in a directory
+        - chunk_rows: rows of a series buffered in memory before they are written as one chunk
+        - run: id of the rows of this sink, the one after the latest run of the directory
+    """
+
+    def __init__(self, directory="out/telemetry", chunk_rows=10_000):
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self._chunks = read_index(directory)
+        self._pending = {}
+        self.run = latest_run(self._chunks) + 1
+
+    def append(self, series, episode, steps, values):
+        """rows of one episode of a series, `values` is `(rows, ...)`"""
+        if len(steps) == 0:
+            return
+        values = np.asarray(values).reshape(len(steps), -1)
+        pending = self._pending.setdefault(series, [])
+        pending.append((np.full(len(steps), episode), np.asarray(steps), values))
+        if sum(len(rows[1]) for rows in pending) >= self.chunk_rows:
+            self.flush(series)
+
+    def flush(self, series=None):
+        """write the buffered rows of a series (all of them by default)"""
+        for name in [series] if series is not None else list(self._pending):
+            pending = self._pending.pop(name, [])
+            if not pending:
+                continue
+            episodes, steps, values = (np.concatenate(c) for c in zip(*pending))
+            self.write_chunk(name, episodes, steps, values)
+
+    def write_chunk(self, series, episodes, steps, values):
+        os.makedirs(self.directory, exist_ok=True)
+        number = sum(chunk["series"] == series for chunk in self._chunks)
+        file_name = f"{re.sub(FILE_NAME_UNSAFE, '_', series)}-{number:05d}.npz"
+        write_atomically(
+            os.path.join(self.directory, file_name),
+            lambda file: np.savez(file, episode=episodes, step=steps, values=values),
+        )
+        self._chunks.append(
+            {
+                "series": series,
+                "run": self.run,
+                "file": file_name,
+                "first_episode": int(episodes.min()),
+                "last_episode": int(episodes.max()),
+                "rows": len(steps),
+            }
+        )
+        index = json.dumps({"chunks": self._chunks}, indent=2).encode()
+        write_atomically(
+            os.path.join(self.directory, INDEX), lambda file: file.write(index)
+        )
+
+
+def latest_run(chunks):
+    """-1 when there is no run yet, the chunks of the older stores are the run 0"""
+    return max((chunk.get("run", 0) for chunk in chunks), default=-1)
+
+
+def series_names(directory="out/telemetry"):
+    return sorted({chunk["series"] for chunk in read_index(directory)})
+
+
+def load_series(directory, series, episodes=None, run=None):
+    """
+    `run`, `episode`, `step` and one column per value of a series as a DataFrame
+        - episodes: inclusive `(first, last)` range, None for all the episodes
+        - run: id of the run (see `TelemetrySink.run`), None for the latest run of the directory
+    """
+    first, last = episodes if episodes is not None else (-np.inf, np.inf)
+    chunks = read_index(directory)
+    run = latest_run(chunks) if run is None else run
+    frames = []
+    for chunk in chunks:
+        if chunk["series"] != series or chunk.get("run", 0) != run:
+            continue
+        if chunk["last_episode"] < first or chunk["first_episode"] > last:
+            continue
+        with np.load(os.path.join(directory, chunk["file"])) as data:
+            selected = (data["episode"] >= first) & (data["episode"] <= last)
+            frame = pd.DataFrame(data["values"][selected])
+            frame.insert(0, "step", data["step"][selected])
+            frame.insert(0, "episode", data["episode"][selected])
+            frame.insert(0, "run", run)
+            frames.append(frame)
+    if not frames:
+        raise AssertionError(
+            f"no {series} telemetry in {directory} for {episodes} (run {run})"
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def get_telemetry_sink():
+    """the shared sink of the run, None when the recorders export csv files"""
+    global _sink
+    if not feature_flags.enable_telemetry:
+        return None
+    if _sink is None:
+        _sink = TelemetrySink(feature_flags.telemetry_directory)
+        atexit.register(_sink.flush)
+    return _sink
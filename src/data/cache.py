@@ -0,0 +1,94 @@
+"""
+On-disk cache of the encoded corpus streams, memory mapped by the later runs (and shared between the processes)
+    - every generation setting (size, seed, vocabulary, spacing gap, ...) has its own versioned directory:
+      `spikes.npy`, `labels.npy`, `joined_corpus.txt` and `meta.json`
+    - the corpus is generated with its own seed and the global random state is restored afterwards,
+      so the rest of the run is the same on a cache hit and on a cache miss
+"""
+
+import hashlib
+import json
+import os
+import random
+import shutil
+import tempfile
+
+import numpy as np
+
+from src.configs import corpus_config
+from src.data.spike_generator import get_data
+
+CACHE_VERSION = 1
+
+
+def cache_meta(size, prob, words_size, seed):
+    return {
+        "version": CACHE_VERSION,
+        "size": size,
+        "prob": prob,
+        "words_size": words_size,
+        "seed": seed,
+        "letters": corpus_config.letters,
+        "words": list(corpus_config.words),
+        "words_spacing_gap": corpus_config.words_spacing_gap,
+    }
+
+
+def cache_path(meta, directory):
+    key = hashlib.sha1(json.dumps(meta, sort_keys=True).encode()).hexdigest()[:12]
+    return os.path.join(directory, f"corpus-v{CACHE_VERSION}-{key}")
+
+
+def load_cache(path):
+    with open(os.path.join(path, "joined_corpus.txt")) as file:
+        joined_corpus = file.read()
+    return (
+        np.load(os.path.join(path, "spikes.npy"), mmap_mode="r"),
+        np.load(os.path.join(path, "labels.npy"), mmap_mode="r"),
+        joined_corpus,
+    )
+
+
+def generate(size, prob, words_size, seed):
+    random_state, np_random_state = random.getstate(), np.random.get_state()
+    random.seed(seed)
+    np.random.seed(seed)
+    try:
+        return get_data(size, prob=prob, words_size=words_size)
+    finally:
+        random.setstate(random_state)
+        np.random.set_state(np_random_state)
+
+
+def cached_data(size, prob=0.7, words_size=3, seed=42, directory="out/cache"):
+    """same as `get_data` (seeded), generated once and memory mapped afterwards"""
+    meta = cache_meta(size, prob, words_size, seed)
+    path = cache_path(meta, directory)
+    if os.path.exists(os.path.join(path, "meta.json")):
+        return load_cache(path)
+
+    spikes, labels, joined_corpus = generate(size, prob, words_size, seed)
+
+    # written aside and renamed, so a crashed or concurrent run never sees a partial cache
+    os.makedirs(directory, exist_ok=True)
+    temp_path = tempfile.mkdtemp(dir=directory)
+    np.save(os.path.join(temp_path, "spikes.npy"), spikes)
+    np.save(os.path.join(temp_path, "labels.npy"), labels)
+    with open(os.path.join(temp_path, "joined_corpus.txt"), "w") as file:
+        file.write(joined_corpus)
+    with open(os.path.join(temp_path, "meta.json"), "w") as file:
+        json.dump(meta, file, indent=2)
+
+    try:
+        os.rename(temp_path, path)
+    except OSError:
+        # another process has just cached the same corpus
+        shutil.rmtree(temp_path)
+    return load_cache(path)
+
+
+def load_data(size, prob=0.7, words_size=3, seed=None):
+    """a brand new corpus when there is no seed, the cached corpus of the seed otherwise"""
+    if seed is None:
+        return get_data(size, prob=prob, words_size=words_size)
+    return cached_data(size, prob=prob, words_size=words_size, seed=seed)
@@ -12,9 +12,11 @@ def gen_corpus(
     no_common_chars: bool = False,
     letters_to_use: str = corpus_config.letters,
     words_to_use: List[str] = corpus_config.words,
+    rng=random,
 ) -> List[str]:
     """
     Generate a corpus of random words. contains learnable words within
+        - rng: `random` module or a seeded `random.Random`
     """
     corpus: List[str] = []
     valid_letters = letters_to_use
@@ -24,10 +26,10 @@ def gen_corpus(
         valid_letters = "".join(valid_letters)
 
     for _ in range(size):
-        if random.random() < prob:
-            word = random.choice(words_to_use)
+        if rng.random() < prob:
+            word = rng.choice(words_to_use)
         else:
-            word_length = random.randint(min_length, max_length)
-            word = "".join(random.choices(valid_letters, k=word_length))
+            word_length = rng.randint(min_length, max_length)
+            word = "".join(rng.choices(valid_letters, k=word_length))
         corpus.append(word)
     return corpus
@@ -6,15 +6,17 @@ import numpy as np
 from src.configs.corpus_config import letters, words, words_spacing_gap
 from src.data.corpus_generator import gen_corpus
 
+LETTER_INDICES = {char: index for index, char in enumerate(letters)}
+
 
 def spike_stream_i(char):
     spikes = np.zeros(len(letters), dtype=int)
-    if char in letters:
-        spikes[letters.index(char)] = 1
+    if char in LETTER_INDICES:
+        spikes[LETTER_INDICES[char]] = 1
     return spikes
 
 
-def joined_corpus_generator(corpus: List[str], has_noise=False) -> str:
+def joined_corpus_generator(corpus: List[str], has_noise=False, rng=np.random) -> str:
     if words_spacing_gap < 2 or not has_noise:
         sparse_gap = " " * words_spacing_gap
         return sparse_gap.join(corpus) + sparse_gap
@@ -29,14 +31,61 @@ def joined_corpus_generator(corpus: List[str], has_noise=False) -> str:
         [
             word
             + " "
-            + "".join(np.random.choice(possible_noise, words_spacing_gap - 2, p=p))
+            + "".join(rng.choice(possible_noise, words_spacing_gap - 2, p=p))
             + " "
             for word in corpus
         ]
     )
 
 
+NO_LABEL = -1
+
+
+def letter_indices(text, letters=letters):
+    """vectorized index of every character of the text in the letters, -1 for the others (e.g. space)"""
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    alphabet = np.frombuffer(letters.encode("utf-32-le"), dtype=np.uint32)
+    order = np.argsort(alphabet)
+    positions = np.minimum(np.searchsorted(alphabet[order], codes), len(letters) - 1)
+    return np.where(alphabet[order][positions] == codes, order[positions], -1)
+
+
+def encode_spikes(text, letters=letters):
+    """`(T, letters)` spike matrix of the text, one spike per time-step of a known letter"""
+    indices = letter_indices(text, letters)
+    spikes = np.zeros((len(text), len(letters)), dtype=np.uint8)
+    is_letter = indices >= 0
+    spikes[np.flatnonzero(is_letter), indices[is_letter]] = 1
+    return spikes
+
+
+def encode_labels(corpus, words=words, gap=words_spacing_gap, vocabulary=None):
+    """
+    `(T,)` label of every time-step of the joined corpus
+        - word index at the first space character after the whole word
+        - `len(words)` for the words out of the vocabulary (UNK)
+        - vocabulary: prebuilt word -> index of the words, e.g. for the large vocabularies
+        - NO_LABEL for the other time-steps
+    """
+    lengths = np.fromiter(map(len, corpus), dtype=int, count=len(corpus))
+    positions = np.cumsum(lengths + gap) - gap
+    labels = np.full(lengths.sum() + gap * len(corpus), NO_LABEL, dtype=np.int32)
+
+    if vocabulary is None:
+        vocabulary = {word: index for index, word in enumerate(words)}
+    labels[positions] = [vocabulary.get(word, len(vocabulary)) for word in corpus]
+    return labels
+
+
+def label_codes(labels, words_count):
+    """labels as the bit codes of the firing patterns (word `i` => 1 << i, UNK => 0), -1 for NO_LABEL"""
+    labels = np.asarray(labels)
+    codes = np.append(1 << np.arange(words_count), 0)
+    return np.where(labels == NO_LABEL, -1, codes[labels])
+
+
 def get_data(size, prob=0.7, words_size=3):
+    """spikes `(T, letters)` uint8 matrix, labels `(T,)` int vector and the joined corpus"""
     corpus = gen_corpus(
         size,
         prob,
@@ -50,25 +99,144 @@ def get_data(size, prob=0.7, words_size=3):
     random.shuffle(corpus)
 
     joined_corpus = joined_corpus_generator(corpus, has_noise=True)
-    stream_i = [spike_stream_i(char) for char in joined_corpus]
-    stream_j = []
-
-    empty_spike = np.empty(len(words))
-    empty_spike[:] = np.NaN
+    spikes = encode_spikes(joined_corpus)
+    labels = encode_labels(corpus)
 
-    # NOTE: 🚀 it seems that shifting all spikes won't chane the flow, but has more neuro-scientific effects
-    for word in corpus:
-        stream_j.extend((empty_spike for _ in word))
-
-        # First space character after hole word
-        word_spike = np.zeros(len(words), dtype=bool)
-        if word in words:
-            word_spike[words.index(word)] = 1
-        stream_j.append(word_spike)
+    if len(spikes) != len(labels):
+        raise AssertionError("stream length mismatch")
 
-        stream_j.extend((empty_spike for _ in range(words_spacing_gap - 1)))
+    return spikes, labels, joined_corpus
+
+
+class ChunkedSpikeStream:
+    """
+    Spikes and labels produced chunk by chunk, e.g. for the corpora larger than the memory
+        - `chunks`: callable returning a fresh iterator of `(spikes, labels)` chunks
+        - `spikes[t]` and `labels[t]` only keep the chunk of `t` in memory, the time-steps must be visited in order,
+          going back in time (e.g. a new episode) restarts the chunks from the beginning
+        - length: number of time-steps when known, otherwise counted by the first `summary()`
+        - `summary()`: the whole `(T,)` labels and spiking steps, from a single pass over the chunks shared by all
+          the consumers (e.g. the Supervisor, the metrics and the event-driven simulator)
+    """
+
+    def __init__(self, chunks, length=None):
+        self.chunks = chunks
+        self.length = length
+        self._summary = None
+        self.spikes = StreamView(self, 0)
+        self.labels = StreamView(self, 1)
+        self.restart()
+
+    def __len__(self):
+        if self.length is None:
+            self.summary()
+        return self.length
+
+    def summary(self):
+        """`(labels, spiking)` of every time-step, `spiking[t]` is True when any letter spikes at `t`"""
+        if self._summary is None:
+            labels, spiking = [], []
+            for chunk_spikes, chunk_labels in self.chunks():
+                labels.append(np.asarray(chunk_labels))
+                spiking.append(chunk_spikes.reshape(len(chunk_spikes), -1).any(axis=1))
+            self._summary = np.concatenate(labels), np.concatenate(spiking)
+            self.length = len(self._summary[0])
+        return self._summary
+
+    def restart(self):
+        self._iterator = iter(self.chunks())
+        self._chunk = None
+        self._start = self._end = 0
+
+    def locate(self, t):
+        """chunk of the time-step `t` and the offset of `t` in it"""
+        if t < self._start:
+            self.restart()
+        while t >= self._end:
+            self._chunk = next(self._iterator)
+            self._start, self._end = self._end, self._end + len(self._chunk[1])
+        return self._chunk, t - self._start
+
+
+class StreamView:
+    """spikes or labels of a `ChunkedSpikeStream`, indexed by the time-step like an array"""
+
+    def __init__(self, stream, field, transform=None):
+        self.stream = stream
+        self.field = field
+        self.transform = transform
+
+    def __len__(self):
+        return len(self.stream)
+
+    def __getitem__(self, t):
+        if isinstance(t, slice):
+            return np.array([self[i] for i in range(*t.indices(len(self)))])
+        chunk, offset = self.stream.locate(t)
+        value = chunk[self.field][offset]
+        return value if self.transform is None else self.transform(value)
+
+    def chunks(self):
+        for chunk in self.stream.chunks():
+            values = chunk[self.field]
+            yield values if self.transform is None else self.transform(values)
+
+    def tile(self, copies):
+        return StreamView(
+            self.stream, self.field, lambda values: np.tile(values, copies)
+        )
+
+
+def iter_chunks(stream):
+    """chunks of a chunked stream view, or the whole in memory stream as a single chunk"""
+    if hasattr(stream, "chunks"):
+        return stream.chunks()
+    return [np.asarray(stream)]
+
+
+def whole_labels(labels):
+    """`(T,)` labels of an in memory or chunked stream, the chunked one is only generated once for all the calls"""
+    if (
+        isinstance(labels, StreamView)
+        and labels.field == 1
+        and labels.transform is None
+    ):
+        return labels.stream.summary()[0]
+    return np.concatenate(list(iter_chunks(labels)))
+
+
+def spiking_steps(stream):
+    """`(T,)` True at the steps any input spikes, see `whole_labels`"""
+    if isinstance(stream, StreamView) and stream.field == 0:
+        # the copies of a tiled stream spike at the same steps
+        return stream.stream.summary()[1]
+    return np.concatenate(
+        [chunk.reshape(len(chunk), -1).any(axis=1) for chunk in iter_chunks(stream)]
+    )
 
-    if len(stream_i) != len(stream_j):
-        raise AssertionError("stream length mismatch")
 
-    return stream_i, stream_j, joined_corpus
+def stream_data(size, prob=0.7, words_size=3, chunk_size=10_000, seed=None):
+    """
+    Same data as `get_data` generated and encoded `chunk_size` words at a time
+        - the words are drawn independently, so they are not shuffled over the whole corpus
+        - every restart regenerates the same chunks from the `seed`
+    """
+    seed = np.random.randint(2**31) if seed is None else seed
+
+    def chunks():
+        rng = random.Random(seed)
+        np_rng = np.random.RandomState(seed)
+        for start in range(0, size, chunk_size):
+            corpus = gen_corpus(
+                min(chunk_size, size - start),
+                prob,
+                min_length=words_size,
+                max_length=words_size,
+                letters_to_use=letters,
+                words_to_use=words,
+                rng=rng,
+            )
+            joined_corpus = joined_corpus_generator(corpus, has_noise=True, rng=np_rng)
+            yield encode_spikes(joined_corpus), encode_labels(corpus)
+
+    return ChunkedSpikeStream(chunks)
@@ -0,0 +1,103 @@
+"""
+Real text corpus ingestion, the text file is streamed and never loaded as a whole
+    1. normalize: lower case, every character out of `corpus_config.language` is a word separator
+    2. vocabulary: word -> index (hash) of the frequent words, the others are UNK
+    3. encode: input spikes and target labels of `chunk_words` words at a time (see `ChunkedSpikeStream`)
+"""
+
+import json
+import re
+from collections import Counter
+
+from src.configs import corpus_config
+from src.data.spike_generator import (
+    ChunkedSpikeStream,
+    encode_labels,
+    encode_spikes,
+)
+
+
+def normalizer(language=corpus_config.language):
+    out_of_language = re.compile(f"[^{re.escape(language.replace(' ', ''))}]+")
+    return lambda text: out_of_language.sub(" ", text.lower())
+
+
+def iter_words(path, chunk_size=1 << 20, language=corpus_config.language):
+    """normalized words of the text file, read `chunk_size` characters at a time"""
+    normalize = normalizer(language)
+    rest = ""
+    with open(path, encoding="utf-8", errors="ignore") as file:
+        while chunk := file.read(chunk_size):
+            words = normalize(rest + chunk).split(" ")
+            # the last word might continue in the next chunk
+            rest = words.pop()
+            yield from filter(None, words)
+    if rest:
+        yield rest
+
+
+class Vocabulary:
+    """word -> index of the words seen at least `min_count` times, the most frequent first"""
+
+    def __init__(self, words):
+        self.words = list(words)
+        self.indices = {word: index for index, word in enumerate(self.words)}
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return word in self.indices
+
+    @property
+    def unk(self):
+        return len(self.words)
+
+    def index(self, word):
+        return self.indices.get(word, self.unk)
+
+    @classmethod
+    def from_words(cls, words, min_count=1, max_size=None):
+        counts = Counter(words)
+        frequent = [
+            word for word, count in counts.most_common(max_size) if count >= min_count
+        ]
+        return cls(frequent)
+
+    @classmethod
+    def from_text(cls, path, min_count=1, max_size=None, **kwargs):
+        return cls.from_words(iter_words(path, **kwargs), min_count, max_size)
+
+    def save(self, path):
+        with open(path, "w") as file:
+            json.dump(self.words, file)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            return cls(json.load(file))
+
+
+def encode_chunks(words, vocabulary, chunk_words=10_000):
+    """`(spikes, labels)` of every `chunk_words` words, joined by `words_spacing_gap` spaces"""
+    gap = " " * corpus_config.words_spacing_gap
+
+    def encode(corpus):
+        spikes = encode_spikes(gap.join(corpus) + gap)
+        return spikes, encode_labels(corpus, vocabulary=vocabulary.indices)
+
+    corpus = []
+    for word in words:
+        corpus.append(word)
+        if len(corpus) == chunk_words:
+            yield encode(corpus)
+            corpus = []
+    if corpus:
+        yield encode(corpus)
+
+
+def text_stream(path, vocabulary, chunk_words=10_000, **kwargs):
+    """input spikes and target labels of the text file, restartable for every episode"""
+    return ChunkedSpikeStream(
+        lambda: encode_chunks(iter_words(path, **kwargs), vocabulary, chunk_words)
+    )
@@ -1,8 +1,10 @@
 import cProfile
 import functools
 import io
+import os
 import pstats
 import random
+import tempfile
 
 import numpy as np
 
@@ -15,6 +17,21 @@ def reset_random_seed(seed=42):
     np.random.seed(seed)
 
 
+def write_atomically(path, write):
+    """write into a temporary file next to `path` and rename it, so `path` is never partially written"""
+    directory = os.path.dirname(path) or "."
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            write(file)
+        # mkstemp files are private
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
 def behaviour_generator(behaviours):
     return {index + 1: behaviour for index, behaviour in enumerate(behaviours)}
 
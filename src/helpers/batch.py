@@ -0,0 +1,38 @@
+"""
+A batch of N independent networks is simulated as a single network, every group holds its N copies one after another
+    - e.g. the words group of 2 networks with 3 words is [w0, w1, w2, w0', w1', w2']
+    - `group.batch_size` is the number of copies (1 when not set)
+    - per network hyperparameters are given as a sequence of N values, scalars are shared by all the networks
+"""
+
+import numpy as np
+
+
+def batch_size(group):
+    return getattr(group, "batch_size", 1)
+
+
+def batched(value, group):
+    """spread per network values over the neurons of the group, scalars are kept as they are"""
+    if np.ndim(value) == 0:
+        return value
+    value = np.asarray(value, dtype=float)
+    if group.size % value.size:
+        raise AssertionError(
+            "per network values must match the batch size of the group"
+        )
+    return np.repeat(value, group.size // value.size)
+
+
+def per_network(values, group):
+    """`(batch_size, group.size / batch_size)` view of a neuron vector"""
+    return values.reshape(batch_size(group), -1)
+
+
+def tile_stream(stream, copies):
+    """same `(T, letters)` input stream for every network of the batch"""
+    if copies == 1:
+        return stream
+    if hasattr(stream, "tile"):
+        return stream.tile(copies)
+    return np.tile(stream, (1, copies))
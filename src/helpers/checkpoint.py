@@ -0,0 +1,233 @@
+"""
+Checkpoints of the whole training state, to resume an interrupted training
+    - one compressed `.npz` per checkpoint and a `manifest.json` of all the checkpoints, both written atomically
+    - saved: the neuron variables (v, threshold, traces, ...), the synapse W and delay (int8 quantized with
+      `network_config.weight_storage="int8"`), the `checkpoint_attrs`
+      of every behaviour (e.g. `ActivityBaseHomeostasis.activities`), the dopamine, the episode and the random state
+    - a frozen `InferenceEngine` of every network of the batch is saved too,
+      so the inference loads a checkpoint without building the training network (see `InferenceEngine.from_checkpoint`)
+
+@note: the network must be built the same way (tags and behaviours) to be restored
+"""
+
+import json
+import os
+
+import numpy as np
+
+from src.core.environement.dopamine import get_dopamine_environment
+from src.core.inference.engine import InferenceEngine
+from src.core.learning.connectivity import get_connectivity
+from src.helpers.base import write_atomically
+from src.helpers.batch import batch_size
+from src.helpers.history import RingHistory
+from src.helpers.network import EpisodeTracker
+from src.helpers.precision import dequantize, is_quantized, quantize
+
+NEURON_VARIABLES = ["v", "threshold", "I", "fired", "old_v", "trace"]
+SYNAPSE_VARIABLES = ["W", "delay"]
+MANIFEST = "manifest.json"
+
+
+def object_key(obj):
+    return obj.tags[0]
+
+
+def behaviour_key(obj, timestep):
+    return f"{object_key(obj)}/{timestep}"
+
+
+def pack(key, value, state):
+    if isinstance(value, RingHistory):
+        state[f"{key}.buffer"] = value.buffer
+        state[f"{key}.head"] = np.array(value.head)
+    elif isinstance(value, list):
+        # e.g. the scores of `Metrics`
+        state[f"{key}.json"] = np.array(json.dumps(value))
+    else:
+        state[key] = np.asarray(value)
+
+
+def unpack(key, value, state):
+    if isinstance(value, RingHistory):
+        value.buffer[...] = state[f"{key}.buffer"]
+        value.head = int(state[f"{key}.head"])
+        return value
+    if isinstance(value, list):
+        return json.loads(state[f"{key}.json"].item())
+    saved = state[key]
+    if isinstance(value, np.ndarray) and value.shape == saved.shape:
+        value[...] = saved
+        return value
+    return saved.item() if saved.ndim == 0 else saved
+
+
+def network_state(network):
+    """flat `{key: array}` state of the network"""
+    state = {}
+    for group in network.NeuronGroups:
+        for name in NEURON_VARIABLES:
+            if hasattr(group, name):
+                pack(f"{object_key(group)}/{name}", getattr(group, name), state)
+
+    for synapse in network.SynapseGroups:
+        connectivity = get_connectivity(synapse)
+        for name in SYNAPSE_VARIABLES:
+            if hasattr(synapse, name):
+                values = connectivity.values(getattr(synapse, name))
+                key = f"{object_key(synapse)}/{name}"
+                if is_quantized():
+                    codes, offset, scale = quantize(values)
+                    state[f"{key}.int8"] = codes
+                    state[f"{key}.range"] = np.array([offset, scale])
+                else:
+                    pack(key, values, state)
+
+    for obj in network.all_objects():
+        for timestep, behaviour in obj.behaviour.items():
+            for name in getattr(behaviour, "checkpoint_attrs", []):
+                key = f"{behaviour_key(obj, timestep)}/{name}"
+                pack(key, getattr(behaviour, name), state)
+
+    group = network.NeuronGroups[0]
+    pack("dopamine", get_dopamine_environment(group).get(), state)
+    pack("episode", EpisodeTracker.episode(), state)
+    algorithm, keys, position, has_gauss, cached_gaussian = np.random.get_state()
+    state.update(
+        {
+            "random/keys": keys,
+            "random/position": np.array(position),
+            "random/gauss": np.array([has_gauss, cached_gaussian]),
+        }
+    )
+    return state
+
+
+def restore_network_state(network, state):
+    """the synapse variables and the random state are kept when they are not in the state (see `src.helpers.sharding`)"""
+    for group in network.NeuronGroups:
+        for name in NEURON_VARIABLES:
+            if hasattr(group, name):
+                key = f"{object_key(group)}/{name}"
+                setattr(group, name, unpack(key, getattr(group, name), state))
+
+    for synapse in network.SynapseGroups:
+        connectivity = get_connectivity(synapse)
+        for name in SYNAPSE_VARIABLES:
+            if hasattr(synapse, name):
+                values = connectivity.values(getattr(synapse, name))
+                key = f"{object_key(synapse)}/{name}"
+                if key not in state and f"{key}.int8" not in state:
+                    continue
+                if f"{key}.int8" in state:
+                    values[...] = dequantize(
+                        state[f"{key}.int8"], *state[f"{key}.range"]
+                    )
+                else:
+                    values[...] = state[key]
+        # the delays are changed in place
+        if hasattr(synapse, "delay_plan"):
+            synapse.delay_plan.invalidate()
+
+    for obj in network.all_objects():
+        for timestep, behaviour in obj.behaviour.items():
+            for name in getattr(behaviour, "checkpoint_attrs", []):
+                key = f"{behaviour_key(obj, timestep)}/{name}"
+                setattr(behaviour, name, unpack(key, getattr(behaviour, name), state))
+
+    get_dopamine_environment(network.NeuronGroups[0]).set(state["dopamine"])
+    EpisodeTracker._episode = int(state["episode"])
+    if "random/keys" not in state:
+        return
+    has_gauss, cached_gaussian = state["random/gauss"]
+    np.random.set_state(
+        (
+            "MT19937",
+            state["random/keys"],
+            int(state["random/position"]),
+            int(has_gauss),
+            float(cached_gaussian),
+        )
+    )
+
+
+def inference_state(network, synapse_tag):
+    state = {}
+    for index in range(batch_size(network[synapse_tag, 0].dst)):
+        engine = InferenceEngine.from_network(network, index, synapse_tag)
+        for name, value in engine.state().items():
+            state[f"inference/{index}/{name}"] = np.asarray(value)
+    return state
+
+
+class Checkpoints:
+    """
+    Checkpoints of a training in a directory
+        - every: save every `every` episodes (see `maybe_save`)
+        - keep: number of the most recent checkpoints kept on disk, None keeps all of them
+        - inference_synapse: tag of the letters -> words synapse of the saved `InferenceEngine`, None to skip it
+    """
+
+    def __init__(self, directory, every=1, keep=None, inference_synapse="GLUTAMATE"):
+        self.directory = directory
+        self.every = every
+        self.keep = keep
+        self.inference_synapse = inference_synapse
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, MANIFEST)
+
+    def manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path) as file:
+            return json.load(file)["checkpoints"]
+
+    def latest(self):
+        """path of the latest checkpoint, None when there is no checkpoint yet"""
+        checkpoints = self.manifest()
+        if not checkpoints:
+            return None
+        return os.path.join(self.directory, checkpoints[-1]["file"])
+
+    def save(self, network):
+        os.makedirs(self.directory, exist_ok=True)
+        episode = EpisodeTracker.episode()
+        state = network_state(network)
+        if self.inference_synapse is not None:
+            state.update(inference_state(network, self.inference_synapse))
+
+        file_name = f"checkpoint-{episode:05d}.npz"
+        write_atomically(
+            os.path.join(self.directory, file_name),
+            lambda file: np.savez_compressed(file, **state),
+        )
+
+        checkpoints = [c for c in self.manifest() if c["episode"] != episode]
+        checkpoints.append({"episode": episode, "file": file_name})
+        removed = []
+        if self.keep is not None and len(checkpoints) > self.keep:
+            removed = checkpoints[: -self.keep]
+            checkpoints = checkpoints[-self.keep :]
+
+        manifest = json.dumps({"checkpoints": checkpoints}, indent=2).encode()
+        write_atomically(self.manifest_path, lambda file: file.write(manifest))
+        # removed only when the manifest doesn't point to them anymore
+        for checkpoint in removed:
+            os.remove(os.path.join(self.directory, checkpoint["file"]))
+        return os.path.join(self.directory, file_name)
+
+    def maybe_save(self, network):
+        if EpisodeTracker.episode() % self.every == 0:
+            return self.save(network)
+        return None
+
+    def restore(self, network, path=None):
+        """restore the latest (or the given) checkpoint, returns its episode or 0 when there is nothing to restore"""
+        path = path or self.latest()
+        if path is None:
+            return 0
+        with np.load(path) as state:
+            restore_network_state(network, state)
+        return EpisodeTracker.episode()
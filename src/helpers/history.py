@@ -0,0 +1,51 @@
+import numpy as np
+
+
+class RingHistory:
+    """
+    Fixed depth history of a neuron (or synapse) vector over time, addressed by lag.
+        - lag 0 is the latest time-step and lag `depth - 1` is the oldest one
+        - moving forward in time only moves the `head`, no matter how deep the history is
+        - every time-step is stored twice (mirrored) so all the lags are always a contiguous view
+
+    @note: the latest column must be written via `set_latest` (not the `latest` view), which keeps the mirror in sync
+    """
+
+    def __init__(self, shape, depth, dtype=np.float64):
+        self.depth = depth
+        self.head = 0
+        self.buffer = np.zeros((*np.atleast_1d(shape), 2 * depth), dtype=dtype)
+
+    @property
+    def latest(self):
+        return self.buffer[..., self.head]
+
+    def lag(self, lag):
+        return self.buffer[..., self.head + lag]
+
+    def window(self):
+        """lag ordered view of the whole history, same layout as a rolled `(size, depth)` matrix"""
+        return self.buffer[..., self.head : self.head + self.depth]
+
+    def gather(self, indices, lags):
+        return self.buffer[indices, self.head + lags]
+
+    def set_latest(self, values):
+        self.buffer[..., self.head] = values
+        self.buffer[..., self.head + self.depth] = values
+
+    def push(self, values, steps=1):
+        """move `steps` forward in time with the same `values` at every step"""
+        for _ in range(min(steps, self.depth)):
+            self.head = (self.head - 1) % self.depth
+            self.set_latest(values)
+
+    def carry(self, steps=1):
+        """move forward in time and keep the latest values as the new latest"""
+        self.push(self.latest, steps)
+
+    def scale_lags(self, factors):
+        """scale the `len(factors)` most recent lags, e.g. the analytic decay of skipped steps"""
+        columns = (self.head + np.arange(len(factors))) % self.depth
+        self.buffer[..., columns] *= factors
+        self.buffer[..., columns + self.depth] *= factors
@@ -1,3 +1,8 @@
+import numpy as np
+
+from src.data.spike_generator import spiking_steps
+
+
 class FeatureSwitch:
     def __init__(self, network, features):
         self.features = features
@@ -20,6 +25,13 @@ class FeatureSwitch:
         )
 
 
+def override_hyperparameters(network, hyperparameters):
+    """update the init attributes of the behaviours (before initialization) by their tag"""
+    for obj in network.all_objects():
+        for behaviour in obj.behaviour.values():
+            behaviour.init_kwargs.update(hyperparameters.get(behaviour.tags[0], {}))
+
+
 class EpisodeTracker:
     _episode = 0
 
@@ -30,3 +42,55 @@ class EpisodeTracker:
     @classmethod
     def update(cls):
         cls._episode += 1
+
+
+class EventDrivenSimulator:
+    """
+    Simulate the network step by step only while spikes are in flight, and jump over the silent spans of the input.
+        - a step is active when an input spike (or an event, e.g. a label) happened within the last `window` steps
+        - `stream` is the `(T, letters)` input, either in memory or chunked (see `ChunkedSpikeStream`)
+        - `window` must cover the spikes in flight, i.e. `max_delay + 1` for the delayed synapses
+        - behaviours update their state analytically over a silent span with `skip_iterations(obj, steps)`,
+          it's called with `obj.iteration` set to the last skipped step, in the same order as `new_iteration`
+        - behaviours without `skip_iterations` (e.g. Recorder, WinnerTakeAll) are not run over the silent spans
+
+    @note: the stochastic input noise is not simulated over the silent spans
+    """
+
+    def __init__(self, network, stream, window, events=None):
+        self.network = network
+        spikes = spiking_steps(stream).copy()
+        if events is not None:
+            spikes |= np.asarray(events, dtype=bool)
+
+        # active[t] := any spike in [t - window, t]
+        active = np.convolve(spikes, np.ones(window + 1, dtype=int))[: len(stream)] > 0
+        boundaries = np.flatnonzero(np.diff(active)) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(stream)]))
+        self.spans = [
+            (int(end - start), bool(active[start])) for start, end in zip(starts, ends)
+        ]
+        self.active_steps = int(active.sum())
+
+    def simulate(self):
+        for steps, is_active in self.spans:
+            if is_active:
+                for _ in range(steps):
+                    self.network.simulate_iteration()
+            else:
+                self.skip_iterations(steps)
+
+    def skip_iterations(self, steps):
+        network = self.network
+        network.iteration += steps
+        for timestep in network.behaviour_timesteps:
+            for obj in network.all_objects():
+                obj.iteration = network.iteration
+                behaviour = obj.behaviour.get(timestep)
+                if (
+                    behaviour is not None
+                    and behaviour.behaviour_enabled
+                    and hasattr(behaviour, "skip_iterations")
+                ):
+                    behaviour.skip_iterations(obj, steps)
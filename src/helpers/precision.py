@@ -0,0 +1,78 @@
+"""
+Precision policy of the network state (see `network_config.precision` and `network_config.weight_storage`)
+    - precision: dtype of the neuron and synapse state (v, threshold, trace, W, delay, fire_effect, ...)
+      and so of the per step temporaries, float32 | float64 (the reference)
+    - weight_storage: dtype W and delay are stored in
+        - None: same as the precision
+        - float16: numpy computes every float16 operation in float32 and only stores the result as float16,
+          it halves the memory of W and delay but numpy converts the float16 values in software (slower steps)
+        - int8: W and delay are quantized into the checkpoints only, the training updates (e.g. 1e-5 per step)
+          are far below the int8 step, so the network itself keeps them in the precision
+    - `drift` compares the state of a network to the state of a float64 reference network
+
+@note: the policy is read when the behaviours are initialized, the network must be built after it is changed
+"""
+
+import numpy as np
+
+from src.configs import network_config
+
+PRECISIONS = {"float32": np.float32, "float64": np.float64}
+WEIGHT_STORAGES = {None: None, "float16": np.float16, "int8": None}
+INT8_LEVELS = 255
+
+
+def state_dtype():
+    if network_config.precision not in PRECISIONS:
+        raise AssertionError(f"precision must be one of {'|'.join(PRECISIONS)}")
+    return PRECISIONS[network_config.precision]
+
+
+def weight_dtype():
+    """dtype of W and delay in the network"""
+    if network_config.weight_storage not in WEIGHT_STORAGES:
+        raise AssertionError("weight_storage must be one of float16|int8|None")
+    return WEIGHT_STORAGES[network_config.weight_storage] or state_dtype()
+
+
+def is_quantized():
+    return network_config.weight_storage == "int8"
+
+
+def neuron_vec(n, mode="zeros"):
+    return n.get_neuron_vec(mode=mode).astype(state_dtype(), copy=False)
+
+
+def as_state(values):
+    """arrays in the state precision, the scalars are kept as they are"""
+    if np.ndim(values) == 0:
+        return values
+    return np.asarray(values, dtype=state_dtype())
+
+
+def quantize(values):
+    """`(codes, offset, scale)` of the values linearly quantized into int8 over their own range"""
+    offset = float(np.min(values)) if np.size(values) else 0.0
+    scale = (float(np.max(values)) - offset) / INT8_LEVELS if np.size(values) else 0.0
+    if scale == 0:
+        return np.full(np.shape(values), -128, dtype=np.int8), offset, 1.0
+    codes = np.rint((np.asarray(values) - offset) / scale) - 128
+    return codes.astype(np.int8), offset, scale
+
+
+def dequantize(codes, offset, scale):
+    return (codes.astype(np.float64) + 128) * scale + offset
+
+
+def drift(reference, state):
+    """
+    `{key: max absolute difference}` of the state of a network to its reference (both `network_state`)
+        - e.g. the state of a float32 network after the same training as a float64 one
+    """
+    return {
+        key: float(np.max(np.abs(state[key] - reference[key]), initial=0))
+        for key in reference
+        if key in state
+        and np.asarray(reference[key]).dtype.kind == "f"
+        and np.shape(state[key]) == np.shape(reference[key])
+    }
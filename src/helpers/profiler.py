@@ -0,0 +1,131 @@
+"""
+Per behaviour profile of the simulation steps, to find the behaviours worth optimizing
+    - the `new_iteration` of every behaviour is wrapped and timed with the monotonic clock (`perf_counter_ns`)
+    - track_allocations: the peak of the bytes allocated by every call too (`tracemalloc`, slow)
+    - `report()` has one row per behaviour: calls, mean, median and p99 time of a step, its share of the total time
+      and the mean allocated bytes
+    - `export(directory)` writes the report of the episode as `behaviours-<episode>.csv` and starts a new one
+
+@note: enabled by `feature_flags.enable_behaviour_profiler`, the steps skipped by `EventDrivenSimulator` are not timed;
+    `c_profiler` still profiles the whole `main()` function by function
+"""
+
+import os
+import time
+import tracemalloc
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from src.helpers.network import EpisodeTracker
+
+
+def behaviour_name(obj, timestep, behaviour):
+    return f"{obj.tags[0]}/{timestep}:{behaviour.__class__.__name__}"
+
+
+class BehaviourProfiler:
+    """
+    Profile of the behaviours of a network, `attach` before the simulation
+        - track_allocations: the allocations of the behaviours too (`tracemalloc`)
+    """
+
+    def __init__(self, network, track_allocations=False):
+        self.network = network
+        self.track_allocations = track_allocations
+        self._times = {}
+        self._allocations = {}
+        self._wrapped = []
+
+    def attach(self):
+        if self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        for obj in self.network.all_objects():
+            for timestep, behaviour in obj.behaviour.items():
+                name = behaviour_name(obj, timestep, behaviour)
+                self._times.setdefault(name, array("q"))
+                self._allocations.setdefault(name, array("q"))
+                behaviour.new_iteration = self._timed(name, behaviour.new_iteration)
+                self._wrapped.append(behaviour)
+        return self
+
+    def detach(self):
+        for behaviour in self._wrapped:
+            # back to the method of the class
+            del behaviour.new_iteration
+        self._wrapped = []
+        if self.track_allocations:
+            tracemalloc.stop()
+
+    def _timed(self, name, new_iteration):
+        times = self._times[name]
+        allocations = self._allocations[name]
+
+        if not self.track_allocations:
+
+            def timed(obj):
+                start = time.perf_counter_ns()
+                new_iteration(obj)
+                times.append(time.perf_counter_ns() - start)
+
+            return timed
+
+        def tracked(obj):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            start = time.perf_counter_ns()
+            new_iteration(obj)
+            times.append(time.perf_counter_ns() - start)
+            allocations.append(tracemalloc.get_traced_memory()[1] - current)
+
+        return tracked
+
+    def report(self):
+        rows = []
+        for name, times in self._times.items():
+            if not times:
+                continue
+            times = np.frombuffer(times, dtype=np.int64) / 1000
+            allocations = self._allocations[name]
+            rows.append(
+                {
+                    "behaviour": name,
+                    "calls": len(times),
+                    "mean_us": times.mean(),
+                    "median_us": np.median(times),
+                    "p99_us": np.percentile(times, 99),
+                    "total_ms": times.sum() / 1000,
+                    "mean_bytes": (
+                        np.frombuffer(allocations, dtype=np.int64).mean()
+                        if allocations
+                        else np.nan
+                    ),
+                }
+            )
+        report = pd.DataFrame(
+            rows,
+            columns=[
+                "behaviour",
+                "calls",
+                "mean_us",
+                "median_us",
+                "p99_us",
+                "total_ms",
+                "mean_bytes",
+            ],
+        )
+        report.insert(6, "share", report["total_ms"] / report["total_ms"].sum())
+        return report.sort_values("total_ms", ascending=False, ignore_index=True)
+
+    def reset(self):
+        for values in [*self._times.values(), *self._allocations.values()]:
+            del values[:]
+
+    def export(self, directory="out/profile"):
+        """report of the steps since the last export, returns its path"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"behaviours-{EpisodeTracker.episode()}.csv")
+        self.report().to_csv(path, index=False)
+        self.reset()
+        return path
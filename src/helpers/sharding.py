@@ -0,0 +1,381 @@
+"""
+The words layer split by rows into shards, every shard simulated by its own worker process
+    - a shard holds the words `[start, stop)`: their neurons and their rows of W and delay, every worker simulates
+      the whole (small) letters layer and its shard of the words with the same behaviours as `make_network`
+    - W, delay and the thresholds of all the shards are backed by `multiprocessing.shared_memory`, the main process
+      reads them at any time (see `ShardedWords.gather`)
+    - the rest of the state (e.g. the potentials, the homeostasis activities and the dopamine) is sent to the shards
+      when they start, split by words, and gathered back by `ShardedWords.gather`, so a restored network resumes
+    - the only coupling between the words is the winner take all: every step the shards publish their winner
+      candidate (fired count and the highest potential) and wait for each other, then all of them select the same
+      global winner and the dopamine of the Supervisor is computed from it in every worker (no other exchange
+      during an episode)
+    - the main process scores the winner of every step (written by the first shard) after each episode,
+      with the label window of the `Metrics` of the network
+
+@note: worth it for large vocabularies only (e.g. 50k words), a step waits for the slowest shard and the barrier;
+    one network per run (no batch), the connectivity must be dense or words, the steps are not skipped
+    and the noise of every shard is drawn from its own random stream, restarted on resume (`noise_scale_factor=0`
+    matches the unsharded network exactly)
+"""
+
+import multiprocessing
+import traceback
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from PymoNNto import Behaviour
+from src.configs import corpus_config, feature_flags, network_config
+from src.core.metrics.confusion import ConfusionMatrix
+from src.core.stabilizer.winner_take_all import NO_WINNER
+from src.data.spike_generator import whole_labels
+from src.helpers.base import reset_random_seed
+from src.helpers.checkpoint import network_state, restore_network_state
+from src.helpers.batch import batch_size
+from src.helpers.network import EpisodeTracker
+
+SYNAPSE_ARRAYS = ["W", "delay"]
+
+
+class Shard:
+    """
+    Words `[start, stop)` of the layer, simulated by the worker `index`
+        - barrier: shared by the workers of all the shards, waited once per step
+        - memories: the shared memory blocks of `layout` (`{name: (shape, dtype)}`)
+        - edges: `[start, stop)` of the shard in the synapse arrays (rows of a dense W, edges of a sparse one)
+    """
+
+    def __init__(self, index, bounds, edges, barrier, memories, layout):
+        self.index = index
+        self.count = len(bounds) - 1
+        self.start, self.stop = bounds[index], bounds[index + 1]
+        self.edges = edges[index], edges[index + 1]
+        self.barrier = barrier
+        self.memories = memories
+        self.layout = layout
+
+    def array(self, name):
+        shape, dtype = self.layout[name]
+        return np.ndarray(shape, dtype=dtype, buffer=self.memories[name].buf)
+
+
+class ShardedWinnerTakeAll(Behaviour):
+    """
+    `WinnerTakeAll` over the words of all the shards
+        - the shard publishes its candidate: fired count, highest potential among the fired words and its index
+        - once all the shards published theirs, each one selects the same winner (the first highest potential)
+        - n.winner: global index of the fired word (`(1,)` as for `WinnerTakeAll`), the `Supervisor` of every shard
+          rewards the same winner
+    """
+
+    def set_variables(self, n):
+        self.shard = self.get_init_attr("shard", None, n)
+        # double buffered by the step parity, a shard never overwrites a candidate still being read
+        self.candidates = self.shard.array("candidates")
+        self.winners = self.shard.array("winners")
+        n.winner = np.full(1, NO_WINNER)
+
+    def new_iteration(self, n):
+        shard = self.shard
+        candidates = self.candidates[n.iteration % 2]
+        spikes = np.count_nonzero(n.fired)
+        if spikes:
+            old_v = np.where(n.fired, n.old_v, np.NINF)
+            best = np.argmax(old_v)
+            candidates[shard.index] = (spikes, old_v[best], shard.start + best)
+        else:
+            candidates[shard.index] = (0, np.NINF, -1)
+        shard.barrier.wait()
+
+        total = candidates[:, 0].sum()
+        winner = NO_WINNER
+        if total:
+            # first highest potential, the shards are ordered by their words
+            winner = int(candidates[np.argmax(candidates[:, 1]), 2])
+        if total > 1 and spikes:
+            fired = np.zeros_like(n.fired)
+            if shard.start <= winner < shard.stop:
+                fired[winner - shard.start] = True
+            n.fired = fired
+        n.winner[0] = winner
+        if shard.index == 0:
+            self.winners[n.iteration - 1] = winner
+
+
+def shard_bounds(size, shards):
+    """`[start, stop)` of every shard as `shards + 1` bounds, as even as possible"""
+    if not 0 < shards <= size:
+        raise AssertionError("shards must be between 1 and the number of words")
+    return np.linspace(0, size, shards + 1).astype(int)
+
+
+def edge_bounds(connectivity, bounds):
+    if connectivity.is_sparse:
+        return connectivity.indptr[bounds].astype(int)
+    return bounds * connectivity.shape[1]
+
+
+def adopt_shared_state(network, shard):
+    """back W, delay and the thresholds of the shard network by its part of the shared memory"""
+    synapse = network["GLUTAMATE", 0]
+    words = network["words", 0]
+    connectivity = synapse.connectivity
+    for name in SYNAPSE_ARRAYS:
+        values = connectivity.values(getattr(synapse, name))
+        shared = shard.array(name)[slice(*shard.edges)]
+        if shared.size != values.size:
+            raise AssertionError("sharding needs a dense or words connectivity")
+        if connectivity.is_sparse:
+            getattr(synapse, name).data = shared
+        else:
+            setattr(synapse, name, shared.reshape(values.shape))
+    words.threshold = shard.array("threshold")[shard.start : shard.stop]
+
+
+def exchanged_state(network):
+    """state of the network but W and delay (shared memory) and the random state (own stream of every shard)"""
+    state = network_state(network)
+    synapse = network["GLUTAMATE", 0].tags[0]
+    shared = {f"{synapse}/{name}" for name in SYNAPSE_ARRAYS}
+    return {
+        key: value
+        for key, value in state.items()
+        if key.split(".")[0] not in shared and not key.startswith("random/")
+    }
+
+
+def words_axis(whole, part):
+    """axis of the words in a state array, the only axis shorter in a shard, None when it has the same shape"""
+    if np.shape(whole) == np.shape(part):
+        return None
+    axes = [
+        axis
+        for axis, (size, shard_size) in enumerate(zip(np.shape(whole), np.shape(part)))
+        if size != shard_size
+    ]
+    if np.ndim(whole) != np.ndim(part) or len(axes) != 1:
+        raise AssertionError("a shard state must only differ by its words")
+    return axes[0]
+
+
+def split_state(state, own, shard):
+    """the part of the shard in the state of the whole network, `own` is the current state of the shard network"""
+    part = {}
+    for key, value in own.items():
+        whole = state.get(key, value)
+        axis = words_axis(whole, value)
+        part[key] = (
+            whole
+            if axis is None
+            else np.take(whole, np.arange(shard.start, shard.stop), axis=axis)
+        )
+    return part
+
+
+def merge_states(state, parts):
+    """the state of the whole network from the parts of the shards (in order), the others are kept"""
+    merged = dict(state)
+    for key, value in state.items():
+        if key not in parts[0]:
+            continue
+        axis = words_axis(value, parts[0][key])
+        merged[key] = (
+            parts[0][key]
+            if axis is None
+            else np.concatenate([part[key] for part in parts], axis=axis)
+        )
+    return merged
+
+
+def run_shard(shard, stream_i, stream_j, network_kwargs, connection):
+    """worker of a shard: runs the received commands (episode, state or restore) until None"""
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    from src.configs.plotters import disable_plotters
+    from src.main import make_network
+
+    try:
+        disable_plotters()
+        words = network_kwargs.pop("words", None) or corpus_config.words
+        network_kwargs.setdefault("joined_corpus", None)
+        # the selected words of the plotters are rows of the shard
+        corpus_config.words = words[shard.start : shard.stop]
+        network = make_network(
+            stream_i, stream_j, words=words, shard=shard, **network_kwargs
+        )
+        adopt_shared_state(network, shard)
+        reset_random_seed(shard.index)
+
+        while (command := connection.recv()) is not None:
+            name, value = command
+            if name == "episode":
+                EpisodeTracker._episode = value
+                network.iteration = 0
+                network.simulate_iterations(len(stream_i), measure_block_time=False)
+                connection.send(None)
+            elif name == "state":
+                connection.send(exchanged_state(network))
+            elif name == "restore":
+                own = exchanged_state(network)
+                restore_network_state(network, split_state(value, own, shard))
+                connection.send(None)
+    except Exception:
+        # the other shards must not wait for this one
+        shard.barrier.abort()
+        connection.send(traceback.format_exc())
+
+
+class ShardedWords:
+    """
+    Training of a network with its words layer split into `shards` worker processes
+        - network: built by `make_network` (batch of one), its initial W, delay and thresholds are shared
+          with the shards, the shards build their own part of it with the same `network_kwargs`
+        - `train_episode()` simulates an episode in all the shards and returns its scores (as `Metrics`)
+        - the shards start from the state of the network (e.g. restored from a checkpoint)
+        - `gather()` copies the shared W, delay, thresholds and the state of the shards back into the network,
+          e.g. for a checkpoint or the inference engine
+        - `close()` stops the workers and releases the shared memory (or use it as a context manager)
+    """
+
+    def __init__(self, network, shards, stream_i, stream_j, **network_kwargs):
+        self.network = network
+        self.synapse = network["GLUTAMATE", 0]
+        self.words = network["words", 0]
+        if batch_size(self.words) > 1:
+            raise AssertionError("a batch of networks can not be sharded")
+        if isinstance(network_config.connectivity, float):
+            raise AssertionError("sharding needs a dense or words connectivity")
+
+        connectivity = self.synapse.connectivity
+        self.bounds = shard_bounds(self.words.size, shards)
+        self.labels = whole_labels(stream_j)
+        # scored as the `Metrics` of the network
+        self.label_window = network["metrics:train", 0].label_window
+        self.scores = []
+
+        initial = {
+            name: connectivity.values(getattr(self.synapse, name)).reshape(-1)
+            for name in SYNAPSE_ARRAYS
+        }
+        initial["threshold"] = np.asarray(self.words.threshold)
+        layout = {
+            name: (values.shape, values.dtype) for name, values in initial.items()
+        }
+        layout["candidates"] = ((2, shards, 3), np.float64)
+        layout["winners"] = ((len(self.labels),), np.int64)
+        self.memories = {
+            name: SharedMemory(
+                create=True,
+                size=max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1),
+            )
+            for name, (shape, dtype) in layout.items()
+        }
+
+        context = multiprocessing.get_context()
+        barrier = context.Barrier(shards)
+        edges = edge_bounds(connectivity, self.bounds)
+        self.shards = [
+            Shard(index, self.bounds, edges, barrier, self.memories, layout)
+            for index in range(shards)
+        ]
+        for name, values in initial.items():
+            self.shards[0].array(name)[:] = values
+        self.winners = self.shards[0].array("winners")
+
+        self.connections = []
+        self.workers = []
+        for shard in self.shards:
+            connection, worker_connection = context.Pipe()
+            worker = context.Process(
+                target=run_shard,
+                args=(
+                    shard,
+                    stream_i,
+                    stream_j,
+                    dict(network_kwargs),
+                    worker_connection,
+                ),
+                daemon=True,
+            )
+            worker.start()
+            self.connections.append(connection)
+            self.workers.append(worker)
+        self.broadcast(("restore", exchanged_state(network)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def broadcast(self, command):
+        """send the command to every shard and return their replies"""
+        for connection in self.connections:
+            connection.send(command)
+        replies = [connection.recv() for connection in self.connections]
+        # the shards aborted by the failed one come last
+        errors = sorted(
+            (reply for reply in replies if isinstance(reply, str)),
+            key=lambda error: "BrokenBarrierError" in error,
+        )
+        if errors:
+            raise AssertionError(f"a shard failed:\n{errors[0]}")
+        return replies
+
+    def train_episode(self):
+        EpisodeTracker.update()
+        self.broadcast(("episode", EpisodeTracker.episode()))
+        return self.score()
+
+    def train(self, epochs, checkpoints=None):
+        for _ in range(epochs):
+            scores = self.train_episode()
+            if feature_flags.enable_metric_logs:
+                print(f"[sharded] episode {scores['episode']}: {scores}")
+            if checkpoints is not None:
+                checkpoints.maybe_save(self.gather())
+        return self.scores
+
+    def score(self):
+        confusion = ConfusionMatrix(self.words.size)
+        confusion.add_winners(self.labels, self.winners, self.label_window)
+        accuracy = confusion.accuracy()
+        scores = {
+            "episode": EpisodeTracker.episode(),
+            "network": 0,
+            "accuracy": accuracy,
+            "precision": confusion.precision(),
+            "f1": confusion.f1(),
+            "recall": confusion.recall(),
+        }
+        self.scores.append(scores)
+        return scores
+
+    def gather(self):
+        connectivity = self.synapse.connectivity
+        shard = self.shards[0]
+        for name in SYNAPSE_ARRAYS:
+            values = connectivity.values(getattr(self.synapse, name))
+            values[...] = shard.array(name).reshape(values.shape)
+        self.words.threshold[...] = shard.array("threshold")
+        parts = self.broadcast(("state", None))
+        restore_network_state(
+            self.network, merge_states(exchanged_state(self.network), parts)
+        )
+        return self.network
+
+    def close(self):
+        for connection, worker in zip(self.connections, self.workers):
+            if worker.is_alive():
+                connection.send(None)
+            worker.join()
+        self.connections, self.workers = [], []
+        # no view of the shared memory must be left to close it
+        self.winners = None
+        for memory in self.memories.values():
+            memory.close()
+            memory.unlink()
+        self.memories = {}
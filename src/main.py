@@ -2,12 +2,9 @@ import numpy as np
 from tqdm import tqdm
 
 from PymoNNto import SynapseGroup, Recorder, NeuronGroup, Network
-from src.configs import corpus_config, feature_flags
-from src.configs.network_config import (
-    epochs,
-    calculate_fire_effect_via_fire_history,
-    max_delay,
-)
+from src.configs import corpus_config, feature_flags, network_config
+from src.core.environement.dopamine import DopamineEnvironmentProvider
+from src.core.learning.connectivity import make_connectivity, make_batch_connectivity
 from src.core.learning.delay import SynapseDelay as FireHistorySynapseDelay
 from src.core.learning.reinforcement import Supervisor
 from src.core.learning.stdp import SynapsePairWiseSTDP
@@ -16,35 +13,129 @@ from src.core.learning.weight_effect_delay import (
 )
 from src.core.metrics.metrics import Metrics
 from src.core.neurons.current import CurrentStimulus
+from src.core.neurons.fused import FusedOutputNeurons
 from src.core.neurons.neurons import StreamableLIFNeurons
 from src.core.neurons.trace import TraceHistory
 from src.core.stabilizer.activity_base_homeostasis import ActivityBaseHomeostasis
+from src.core.stabilizer.count_base_homeostasis import CountBaseHomeostasis
 from src.core.stabilizer.winner_take_all import WinnerTakeAll
-from src.data.spike_generator import get_data
+from src.data.cache import load_data
+from src.data.spike_generator import NO_LABEL, whole_labels
+from src.data.text_corpus import Vocabulary, text_stream
+from src.helpers.checkpoint import Checkpoints
 from src.helpers.base import c_profiler
-from src.helpers.network import FeatureSwitch, EpisodeTracker
+from src.helpers.batch import tile_stream
+from src.helpers.profiler import BehaviourProfiler
+from src.helpers.sharding import ShardedWinnerTakeAll, ShardedWords
+from src.helpers.network import (
+    FeatureSwitch,
+    EpisodeTracker,
+    EventDrivenSimulator,
+    override_hyperparameters,
+)
 
 # reset_random_seed(2294)
 
-SynapseDelay = (
-    FireHistorySynapseDelay
-    if calculate_fire_effect_via_fire_history
-    else WeightEffectSynapseDelay
-)
+
+def synapse_delay():
+    return (
+        FireHistorySynapseDelay
+        if network_config.calculate_fire_effect_via_fire_history
+        else WeightEffectSynapseDelay
+    )
 
 
 #  DERIVED VERBALISES
 # W_MAX (stdp)
 # DOPAMINE_DECAY (reinforcement learning Supervisor)
 
+
 # ================= NETWORK  =================
-@c_profiler
-def main():
+def output_neurons(lif_base, homeostasis):
+    """LIF (3), trace (4), homeostasis (5) and winner take all (6) behaviours of the words"""
+    if feature_flags.enable_fused_output_neurons:
+        # NOTE: 🚀 one in place pass over the neurons (see FusedOutputNeurons)
+        return {
+            3: FusedOutputNeurons(**lif_base, **homeostasis),
+            4: TraceHistory(max_delay=network_config.max_delay),
+        }
+    return {
+        3: StreamableLIFNeurons(
+            **lif_base, has_long_term_effect=True, capture_old_v=True
+        ),
+        4: TraceHistory(max_delay=network_config.max_delay),
+        5: (
+            CountBaseHomeostasis(**homeostasis)
+            if feature_flags.enable_count_homeostasis
+            else ActivityBaseHomeostasis(**homeostasis)
+        ),
+        # Hamming-distance
+        # distance 0 => dopamine release
+        # Fire() => dopamine_decay should reset a word 1  by at last 3(max delay) time_steps
+        # differences must become 0 after some time => similar
+        6: WinnerTakeAll(),
+    }
+
+
+def supervision(stream_j_train, words, shard=None):
+    """Supervisor (7), metrics (9) and recorder (11) of the words, or the reduction of a shard"""
+    supervisor = dict(
+        tag="supervisor:train",
+        dopamine_decay=1 / (network_config.max_delay + 1),
+        outputs=stream_j_train,
+    )
+    if shard is not None:
+        # NOTE: 🚀 the shards only exchange their winner candidates, the main process scores the winners
+        return {
+            6: ShardedWinnerTakeAll(shard=shard),
+            7: Supervisor(**supervisor),
+        }
+    return {
+        7: Supervisor(**supervisor),
+        9: Metrics(
+            tag="metrics:train",
+            words=words,
+            outputs=stream_j_train,
+            label_window=network_config.label_window,
+        ),
+        11: Recorder(tag="words-recorder", variables=["n.v", "n.fired"]),
+    }
+
+
+def make_network(
+    stream_i_train,
+    stream_j_train,
+    joined_corpus,
+    corpus_word_seen_probability=1,
+    batch_size=1,
+    hyperparameters=None,
+    words=None,
+    shard=None,
+):
+    """
+    Letters to words network, trained over the given stream
+        - words: vocabulary of the word neurons (`corpus_config.words` by default)
+        - batch_size: number of independent copies of the network simulated together (see `src.helpers.batch`)
+        - hyperparameters: overrides of the behaviours init attributes by their tag,
+          e.g. `{"stdp": {"a_plus": [0.2, 0.1]}}` for a different a_plus in each of 2 networks
+        - shard: only the words of the shard, simulated by a worker of `ShardedWords` (see `src.helpers.sharding`)
+    """
     network = Network()
-    homeostasis_window_size = 1000
-    corpus_word_seen_probability = 1
-    stream_i_train, stream_j_train, joined_corpus = get_data(
-        1000, prob=corpus_word_seen_probability
+    words = corpus_config.words if words is None else words
+    shard_words = words if shard is None else words[shard.start : shard.stop]
+    words_average_size_occupation = corpus_config.words_spacing_gap + sum(
+        map(len, words)
+    ) / len(words)
+    # NOTE: every word must be expected at least once in a window, a neuron desires at least one spike per window
+    homeostasis_window_size = max(
+        1000,
+        int(
+            np.ceil(
+                len(words)
+                * words_average_size_occupation
+                / corpus_word_seen_probability
+            )
+        ),
     )
 
     lif_base = {
@@ -55,92 +146,81 @@ def main():
         "R": 1,
         "tau": max(
             corpus_config.words_spacing_gap,
-            max(map(len, corpus_config.words)),
+            max(map(len, words)),
         ),
     }
 
     letters_ng = NeuronGroup(
         net=network,
         tag="letters",
-        size=len(corpus_config.letters),
+        size=len(corpus_config.letters) * batch_size,
         behaviour={
             1: StreamableLIFNeurons(
                 tag="lif:train",
-                stream=stream_i_train,
+                stream=tile_stream(stream_i_train, batch_size),
                 joined_corpus=joined_corpus,
                 **lif_base,
             ),
-            2: TraceHistory(max_delay=max_delay),
-            3: Recorder(tag="letters-recorder", variables=["n.v", "n.fired"]),
+            2: TraceHistory(max_delay=network_config.max_delay),
+            **(
+                {3: Recorder(tag="letters-recorder", variables=["n.v", "n.fired"])}
+                if shard is None
+                else {}
+            ),
         },
     )
 
     words_ng = NeuronGroup(
         net=network,
         tag="words",
-        size=len(corpus_config.words),
+        size=len(shard_words) * batch_size,
         behaviour={
             2: CurrentStimulus(
+                tag="stimulus",
                 adaptive_noise_scale=0.9,
                 noise_scale_factor=0.1,
                 stimulus_scale_factor=1,
                 synapse_lens_selector=["GLUTAMATE", 0],
             ),
-            3: StreamableLIFNeurons(
-                **(
+            **output_neurons(
+                lif_base=(
                     lif_base
                     if feature_flags.enable_neuron_reset_factory
                     else {
                         **lif_base,
-                        "v_reset": -65 - (lif_base["R"] / lif_base["tau"]) * max_delay,
+                        "v_reset": -65
+                        - (lif_base["R"] / lif_base["tau"]) * network_config.max_delay,
                     }
                 ),
-                has_long_term_effect=True,
-                capture_old_v=True,
-            ),
-            4: TraceHistory(max_delay=max_delay),
-            5: ActivityBaseHomeostasis(
-                tag="homeostasis",
-                window_size=homeostasis_window_size,
-                # NOTE: making updating_rate adaptive is not useful, because we are training model multiple time
-                # so long term threshold must be set within one of these passes. It is useful for faster convergence
-                updating_rate=0.01,
-                activity_rate=homeostasis_window_size
-                / corpus_config.words_average_size_occupation
-                * corpus_word_seen_probability,
-                # window_size = 100 character every word has 3 character + space, so we roughly got 25
-                # spaced words per window; 0.6 of words are desired so 25*0.6 = 15 are expected to spike
-                # in each window (15 can be calculated from the corpus)
-            ),
-            # Hamming-distance
-            # distance 0 => dopamine release
-            # Fire() => dopamine_decay should reset a word 1  by at last 3(max delay) time_steps
-            # differences must become 0 after some time => similar
-            6: WinnerTakeAll(),
-            7: Supervisor(
-                tag="supervisor:train",
-                dopamine_decay=1 / (max_delay + 1),
-                outputs=stream_j_train,
-            ),
-            9: Metrics(
-                tag="metrics:train",
-                words=corpus_config.words,
-                outputs=stream_j_train,
+                homeostasis=dict(
+                    tag="homeostasis",
+                    window_size=homeostasis_window_size,
+                    # NOTE: making updating_rate adaptive is not useful, because we are training model multiple time
+                    # so long term threshold must be set within one of these passes. It is useful for faster convergence
+                    updating_rate=0.01,
+                    network_size=len(words),
+                    activity_rate=homeostasis_window_size
+                    / words_average_size_occupation
+                    * corpus_word_seen_probability,
+                    # window_size = 100 character every word has 3 character + space, so we roughly got 25
+                    # spaced words per window; 0.6 of words are desired so 25*0.6 = 15 are expected to spike
+                    # in each window (15 can be calculated from the corpus)
+                ),
             ),
-            11: Recorder(tag="words-recorder", variables=["n.v", "n.fired"]),
+            **supervision(stream_j_train, words, shard),
         },
     )
 
-    SynapseGroup(
+    glutamate = SynapseGroup(
         net=network,
         src=letters_ng,
         dst=words_ng,
         tag="GLUTAMATE",
         behaviour={
             # NOTE: 🚀 use max_delay to 4 and use_shared_weights=True
-            1: SynapseDelay(
+            1: synapse_delay()(
                 tag="delay",
-                max_delay=max_delay,
+                max_delay=network_config.max_delay,
                 mode="random",
                 use_shared_weights=False,
             ),
@@ -158,7 +238,7 @@ def main():
                 # w_max=4,
                 w_max=np.round(
                     (lif_base["threshold"] - lif_base["v_rest"])
-                    / (np.average(list(map(len, corpus_config.words))))
+                    / (np.average(list(map(len, words))))
                     + 0.7,  # epsilon: delay epsilon increase update, reduce full stimulus by tiny amount
                     decimals=1,
                 ),
@@ -166,25 +246,142 @@ def main():
                 weight_decay=0.999,
                 weight_update_strategy=None,
                 stdp_factor=0.02,
-                max_delay=max_delay,
+                max_delay=network_config.max_delay,
                 delay_factor=0.02,  # episode increase
             ),
         },
     )
+    glutamate.connectivity = make_batch_connectivity(
+        make_connectivity(
+            network_config.connectivity,
+            len(shard_words),
+            len(corpus_config.letters),
+            words=shard_words,
+        ),
+        batch_size,
+    )
+    for group in [letters_ng, words_ng]:
+        group.batch_size = batch_size
+    # NOTE: every network has its own reward, many networks can run in the same process
+    network.dopamine_environment = DopamineEnvironmentProvider(
+        batch_size if batch_size > 1 else None
+    )
+    override_hyperparameters(network, hyperparameters or {})
     network.initialize(info=False)
+    return network
+
 
+def train(
+    network,
+    stream_i_train,
+    stream_j_train,
+    epochs,
+    progress=True,
+    checkpoints=None,
+    profiler=None,
+):
+    """
+    - checkpoints: `Checkpoints` saved after the episodes (see `src.helpers.checkpoint`)
+    - profiler: attached `BehaviourProfiler` exported after the episodes (see `src.helpers.profiler`)
+    """
     features = FeatureSwitch(network, ["lif", "supervisor", "metrics", "spike-rate"])
     features.switch_train()
 
+    simulator = None
+    if feature_flags.enable_event_driven_simulation:
+        # NOTE: 🚀 silent spans of the stream (no letter spike in flight) are skipped analytically
+        simulator = EventDrivenSimulator(
+            network,
+            stream_i_train,
+            window=network_config.max_delay + 1,
+            events=whole_labels(stream_j_train) != NO_LABEL,
+        )
+
     """ TRAINING """
-    for _ in tqdm(range(epochs), "Learning"):
+    for _ in tqdm(range(epochs), "Learning", disable=not progress):
         if _ == 50:
             print("50")
         EpisodeTracker.update()
         network.iteration = 0
-        network.simulate_iterations(len(stream_i_train))
+        if simulator is not None:
+            simulator.simulate()
+        else:
+            network.simulate_iterations(
+                len(stream_i_train), measure_block_time=progress
+            )
         for tag in ["letters-recorder", "words-recorder", "metrics:train"]:
             network[tag, 0].reset()
+        if checkpoints is not None:
+            checkpoints.maybe_save(network)
+        if profiler is not None:
+            profiler.export()
+    return network
+
+
+@c_profiler
+def main():
+    corpus_word_seen_probability = 1
+    words = None
+    if corpus_config.text_corpus_path is None:
+        stream_i_train, stream_j_train, joined_corpus = load_data(
+            1000, prob=corpus_word_seen_probability, seed=corpus_config.corpus_seed
+        )
+    else:
+        vocabulary = Vocabulary.from_text(
+            corpus_config.text_corpus_path,
+            min_count=corpus_config.text_min_count,
+            max_size=corpus_config.text_vocabulary_size,
+        )
+        stream = text_stream(corpus_config.text_corpus_path, vocabulary)
+        stream_i_train, stream_j_train, joined_corpus = (
+            stream.spikes,
+            stream.labels,
+            None,
+        )
+        words = vocabulary.words
+
+    network = make_network(
+        stream_i_train,
+        stream_j_train,
+        joined_corpus,
+        corpus_word_seen_probability,
+        network_config.batch_size,
+        words=words,
+    )
+
+    checkpoints = None
+    done_epochs = 0
+    if network_config.checkpoint_every is not None:
+        checkpoints = Checkpoints(
+            network_config.checkpoint_directory, every=network_config.checkpoint_every
+        )
+        done_epochs = checkpoints.restore(network)
+    if network_config.word_shards is not None:
+        with ShardedWords(
+            network,
+            network_config.word_shards,
+            stream_i_train,
+            stream_j_train,
+            joined_corpus=joined_corpus,
+            corpus_word_seen_probability=corpus_word_seen_probability,
+            words=words,
+        ) as sharded:
+            sharded.train(network_config.epochs - done_epochs, checkpoints=checkpoints)
+        return
+
+    profiler = None
+    if feature_flags.enable_behaviour_profiler:
+        profiler = BehaviourProfiler(
+            network, track_allocations=feature_flags.track_behaviour_allocations
+        ).attach()
+    train(
+        network,
+        stream_i_train,
+        stream_j_train,
+        network_config.epochs - done_epochs,
+        checkpoints=checkpoints,
+        profiler=profiler,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+import unittest
+
+import numpy as np
+
+from PymoNNto import Network, NeuronGroup, SynapseGroup
+from src.configs import corpus_config
+from src.core.environement.dopamine import DopamineEnvironmentProvider
+from src.core.learning.connectivity import (
+    DenseConnectivity,
+    SparseConnectivity,
+    make_batch_connectivity,
+)
+from src.core.learning.delay import SynapseDelay
+from src.core.learning.reinforcement import Supervisor
+from src.core.learning.stdp import SynapsePairWiseSTDP
+from src.core.neurons.current import CurrentStimulus
+from src.core.neurons.fused import FusedOutputNeurons
+from src.core.neurons.neurons import StreamableLIFNeurons
+from src.core.neurons.trace import TraceHistory
+from src.core.stabilizer.activity_base_homeostasis import ActivityBaseHomeostasis
+from src.core.stabilizer.winner_take_all import WinnerTakeAll
+from src.data.spike_generator import encode_spikes
+from src.helpers.base import behaviour_generator, reset_random_seed
+from src.helpers.batch import tile_stream
+from src.safeguards.simulator import make_labels
+
+MAX_DELAY = 3
+LIF_BASE = {"v_rest": -65, "v_reset": -65, "threshold": -60, "dt": 1.0, "tau": 3}
+CORPUS = "arc   car  rca arc    car  acr   arc  "
+
+
+def make_custom_network(corpus, batch_size, fused=False, **stdp):
+    reset_random_seed()
+    output_neurons = {
+        4: StreamableLIFNeurons(
+            **LIF_BASE, has_long_term_effect=True, capture_old_v=True
+        ),
+        5: TraceHistory(max_delay=MAX_DELAY),
+        6: ActivityBaseHomeostasis(window_size=10, activity_rate=2),
+        7: WinnerTakeAll(),
+    }
+    if fused:
+        output_neurons = {
+            4: FusedOutputNeurons(**LIF_BASE, window_size=10, activity_rate=2),
+            5: TraceHistory(max_delay=MAX_DELAY),
+        }
+    network = Network()
+    letters = NeuronGroup(
+        net=network,
+        tag="letters",
+        size=len(corpus_config.letters) * batch_size,
+        behaviour=behaviour_generator(
+            [
+                StreamableLIFNeurons(
+                    stream=tile_stream(encode_spikes(corpus), batch_size),
+                    **LIF_BASE,
+                ),
+                TraceHistory(max_delay=MAX_DELAY),
+            ]
+        ),
+    )
+    words = NeuronGroup(
+        net=network,
+        tag="words",
+        size=len(corpus_config.words) * batch_size,
+        behaviour={
+            3: CurrentStimulus(
+                noise_scale_factor=0,
+                stimulus_scale_factor=3,
+                synapse_lens_selector=["GLUTAMATE", 0],
+            ),
+            **output_neurons,
+            9: Supervisor(dopamine_decay=0.25, outputs=make_labels(corpus)),
+        },
+    )
+    synapse = SynapseGroup(
+        net=network,
+        src=letters,
+        dst=words,
+        tag="GLUTAMATE",
+        behaviour={
+            1: SynapseDelay(max_delay=MAX_DELAY),
+            8: SynapsePairWiseSTDP(max_delay=MAX_DELAY, w_max=4.0, **stdp),
+        },
+    )
+    synapse.connectivity = make_batch_connectivity(
+        SparseConnectivity.from_dense(
+            DenseConnectivity((len(corpus_config.words), len(corpus_config.letters)))
+        ),
+        batch_size,
+    )
+    for group in [letters, words]:
+        group.batch_size = batch_size
+    network.dopamine_environment = DopamineEnvironmentProvider(batch_size)
+    network.dopamine_environment.set(1)
+    network.initialize(info=False)
+    return network, synapse
+
+
+class BatchTestCase(unittest.TestCase):
+    def test_block_diagonal_connectivity_must_only_connect_own_network(self):
+        connectivity = make_batch_connectivity(DenseConnectivity((2, 3)), 3)
+        expected = np.kron(np.eye(3), np.ones((2, 3)))
+        np.testing.assert_array_equal(
+            connectivity.dense(np.ones(connectivity.nnz)), expected
+        )
+
+    def test_batch_must_match_independent_networks(self):
+        hyperparameters = {"a_plus": [0.2, 0.4], "tau_plus": [3.0, 5.0]}
+        batch, batch_synapse = make_custom_network(CORPUS, 2, **hyperparameters)
+        nnz = batch_synapse.connectivity.nnz // 2
+
+        networks = []
+        for i in range(2):
+            network, synapse = make_custom_network(
+                CORPUS, 1, **{k: v[i] for k, v in hyperparameters.items()}
+            )
+            # same initial state as the network copy in the batch
+            for attr in ["W", "delay"]:
+                getattr(synapse, attr).data[:] = getattr(batch_synapse, attr).data[
+                    i * nnz : (i + 1) * nnz
+                ]
+            network.simulate_iterations(len(CORPUS), measure_block_time=False)
+            networks.append((network, synapse))
+        batch.simulate_iterations(len(CORPUS), measure_block_time=False)
+
+        words = batch["words", 0]
+        size = len(corpus_config.words)
+        for i, (network, synapse) in enumerate(networks):
+            for attr in ["W", "delay"]:
+                np.testing.assert_allclose(
+                    getattr(batch_synapse, attr).data[i * nnz : (i + 1) * nnz],
+                    getattr(synapse, attr).data,
+                )
+            np.testing.assert_allclose(
+                words.threshold[i * size : (i + 1) * size],
+                network["words", 0].threshold,
+            )
+            self.assertAlmostEqual(
+                batch.dopamine_environment.get()[i],
+                network.dopamine_environment.get()[0],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
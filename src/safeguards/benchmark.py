@@ -0,0 +1,65 @@
+import unittest
+from unittest import mock
+
+from src.benchmark import (
+    AXES,
+    BASE_CASE,
+    benchmark_case,
+    benchmark_cases,
+    case_key,
+    compare,
+)
+from src.configs import feature_flags
+from src.configs.plotters import disable_plotters, restore_plotters
+
+
+def make_results(step_us, behaviours):
+    return {"results": {"case": {"step_us": step_us, "behaviours": behaviours}}}
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    def setUp(self):
+        flags = mock.patch.multiple(
+            feature_flags, enable_cm_plot=False, enable_metric_logs=False
+        )
+        flags.start()
+        self.addCleanup(flags.stop)
+        self.addCleanup(restore_plotters, disable_plotters())
+
+    def test_every_case_of_the_axes_must_run(self):
+        cases = list(benchmark_cases())
+        for axis, values in AXES.items():
+            self.assertEqual({case[axis] for case in cases}, set(values))
+
+        for case in cases:
+            with self.subTest(case_key(case)):
+                result = benchmark_case(case, steps=2, repeats=1, warmup=5)
+                self.assertGreater(result["step_us"], 0)
+                self.assertIn("stdp", " ".join(result["behaviours"]).lower())
+
+    def test_the_shortest_corpus_must_run_with_the_default_steps(self):
+        # the stream of the words is shorter than `corpus_length`
+        case = {**BASE_CASE, "corpus_length": min(AXES["corpus_length"])}
+        result = benchmark_case({**case, "delay": "history", "connectivity": "dense"})
+        self.assertGreater(result["step_us"], 0)
+
+    def test_only_the_slowdowns_over_the_tolerance_must_regress(self):
+        baseline = make_results(100.0, {"stdp": 50.0, "trace": 0.5, "lif": 0.0})
+        current = make_results(130.0, {"stdp": 55.0, "trace": 1.2, "lif": 2.0})
+        current["results"]["new case"] = current["results"]["case"]
+
+        regressions = compare(baseline, current, tolerance=0.2)
+        # stdp is within the tolerance, trace under the noise of the clock, the new case has no baseline
+        self.assertEqual(
+            [(key, timing) for key, timing, *_ in regressions],
+            [("case", "step"), ("case", "lif")],
+        )
+        self.assertAlmostEqual(regressions[0][-1], 1.3)
+        self.assertEqual(
+            [timing for _, timing, *_ in compare(baseline, current, tolerance=0.5)],
+            ["lif"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
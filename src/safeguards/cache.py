@@ -0,0 +1,38 @@
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.data.cache import cached_data, generate
+from src.helpers.base import reset_random_seed
+
+
+class CorpusCacheTestCase(unittest.TestCase):
+    def test_cache_must_be_memory_mapped_after_the_first_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            spikes, labels, joined_corpus = cached_data(50, seed=3, directory=directory)
+            cached_spikes, cached_labels, cached_joined_corpus = cached_data(
+                50, seed=3, directory=directory
+            )
+
+            self.assertIsInstance(cached_spikes, np.memmap)
+            self.assertIsInstance(cached_labels, np.memmap)
+            np.testing.assert_array_equal(cached_spikes, spikes)
+            np.testing.assert_array_equal(cached_labels, labels)
+            self.assertEqual(cached_joined_corpus, joined_corpus)
+
+            other_spikes = cached_data(50, seed=4, directory=directory)[0]
+            self.assertFalse(np.array_equal(other_spikes, spikes))
+
+    def test_generation_must_not_change_the_global_random_state(self):
+        reset_random_seed(7)
+        expected = random.random(), np.random.random()
+
+        reset_random_seed(7)
+        generate(20, 0.7, 3, seed=1)
+        self.assertEqual((random.random(), np.random.random()), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.core.inference.engine import InferenceEngine
+from src.data.spike_generator import encode_spikes
+from src.helpers.checkpoint import Checkpoints
+from src.helpers.network import EpisodeTracker
+from src.safeguards.batch import CORPUS, make_custom_network
+
+
+def simulate_episode(network):
+    EpisodeTracker.update()
+    network.iteration = 0
+    network.simulate_iterations(len(CORPUS), measure_block_time=False)
+
+
+class CheckpointTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoints = Checkpoints(directory.name, keep=2)
+        EpisodeTracker._episode = 0
+
+    def test_resumed_training_must_match_the_uninterrupted_one(self):
+        network, synapse = make_custom_network(CORPUS, 2)
+        for _ in range(3):
+            simulate_episode(network)
+            self.checkpoints.maybe_save(network)
+        path = self.checkpoints.latest()
+        simulate_episode(network)
+
+        resumed, resumed_synapse = make_custom_network(CORPUS, 2)
+        self.assertEqual(self.checkpoints.restore(resumed, path), 3)
+        simulate_episode(resumed)
+
+        self.assertEqual(EpisodeTracker.episode(), 4)
+        for attr in ["W", "delay"]:
+            np.testing.assert_array_equal(
+                getattr(resumed_synapse, attr).data, getattr(synapse, attr).data
+            )
+        for attr in ["v", "threshold"]:
+            np.testing.assert_array_equal(
+                getattr(resumed["words", 0], attr), getattr(network["words", 0], attr)
+            )
+        np.testing.assert_array_equal(
+            resumed.dopamine_environment.get(), network.dopamine_environment.get()
+        )
+
+        # only the last `keep` checkpoints are kept
+        with open(self.checkpoints.manifest_path) as file:
+            episodes = [c["episode"] for c in json.load(file)["checkpoints"]]
+        self.assertEqual(episodes, [2, 3])
+        self.assertEqual(len(os.listdir(self.checkpoints.directory)), 3)
+
+    def test_inference_must_load_without_the_network(self):
+        network, _ = make_custom_network(CORPUS, 2)
+        simulate_episode(network)
+        path = self.checkpoints.save(network)
+
+        spikes = encode_spikes(CORPUS)
+        for network_index in range(2):
+            np.testing.assert_array_equal(
+                InferenceEngine.from_checkpoint(path, network_index).predict(spikes),
+                InferenceEngine.from_network(network, network_index).predict(spikes),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+
+import numpy as np
+
+from PymoNNto import Network, NeuronGroup, SynapseGroup
+from src.configs import corpus_config
+from src.core.environement.dopamine import DopamineEnvironmentProvider
+from src.core.learning.connectivity import SparseConnectivity, DenseConnectivity
+from src.core.learning.delay import SynapseDelay
+from src.core.learning.stdp import SynapsePairWiseSTDP
+from src.core.neurons.current import CurrentStimulus
+from src.core.neurons.neurons import StreamableLIFNeurons
+from src.core.neurons.trace import TraceHistory
+from src.data.spike_generator import spike_stream_i
+from src.helpers.base import behaviour_generator, reset_random_seed
+
+MAX_DELAY = 3
+LIF_BASE = {"v_rest": -65, "v_reset": -65, "threshold": -60, "dt": 1.0, "tau": 3}
+
+
+def make_custom_network(corpus, connectivity=None):
+    reset_random_seed()
+    network = Network()
+    network.dopamine_environment = DopamineEnvironmentProvider(level=1)
+    letters = NeuronGroup(
+        net=network,
+        tag="letters",
+        size=len(corpus_config.letters),
+        behaviour=behaviour_generator(
+            [
+                StreamableLIFNeurons(
+                    stream=[spike_stream_i(char) for char in corpus], **LIF_BASE
+                ),
+                TraceHistory(max_delay=MAX_DELAY),
+            ]
+        ),
+    )
+    words = NeuronGroup(
+        net=network,
+        tag="words",
+        size=len(corpus_config.words),
+        behaviour={
+            3: CurrentStimulus(synapse_lens_selector=["GLUTAMATE", 0]),
+            4: StreamableLIFNeurons(**LIF_BASE),
+            5: TraceHistory(max_delay=MAX_DELAY),
+        },
+    )
+    synapse = SynapseGroup(
+        net=network,
+        src=letters,
+        dst=words,
+        tag="GLUTAMATE",
+        behaviour={
+            1: SynapseDelay(max_delay=MAX_DELAY),
+            8: SynapsePairWiseSTDP(max_delay=MAX_DELAY, w_max=4.0, delay_factor=0.5),
+        },
+    )
+    synapse.connectivity = connectivity
+    network.initialize(info=False)
+    network.simulate_iterations(len(corpus), measure_block_time=False)
+    return synapse
+
+
+class SparseConnectivityTestCase(unittest.TestCase):
+    corpus = "arc    car   rca  arc     car    "
+
+    def test_full_sparse_synapses_must_match_dense_synapses(self):
+        dense = make_custom_network(self.corpus)
+        mask = np.ones((len(corpus_config.words), len(corpus_config.letters)), bool)
+        sparse = make_custom_network(self.corpus, SparseConnectivity.from_mask(mask))
+
+        np.testing.assert_allclose(sparse.W.toarray(), dense.W)
+        np.testing.assert_allclose(sparse.delay.toarray(), dense.delay)
+
+    def test_words_synapses_must_only_connect_word_letters(self):
+        connectivity = SparseConnectivity.from_words(len(corpus_config.words))
+        synapse = make_custom_network(self.corpus, connectivity)
+
+        self.assertEqual(
+            synapse.W.nnz, sum(len(set(word)) for word in corpus_config.words)
+        )
+        for i, word in enumerate(corpus_config.words):
+            letters = [corpus_config.letters.index(char) for char in word]
+            connected = np.flatnonzero(synapse.W[i].toarray())
+            self.assertTrue(set(connected) <= set(letters))
+
+    def test_edge_operations_must_match_dense_operations(self):
+        mask = np.random.random((5, 7)) < 0.5
+        mask[2] = False
+        sparse = SparseConnectivity.from_mask(mask)
+        dense = DenseConnectivity(mask.shape)
+        values = np.random.random(mask.shape) * mask
+
+        edges = values[mask]
+        np.testing.assert_allclose(sparse.row_sum(edges), dense.row_sum(values))
+        np.testing.assert_allclose(sparse.dense(edges), values)
+        np.testing.assert_array_equal(
+            sparse.select(edges, [0, 1, 4], [1, 2, 6]), values[[0, 1, 4], [1, 2, 6]]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
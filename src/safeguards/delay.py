@@ -0,0 +1,177 @@
+import unittest
+
+import numpy as np
+
+from PymoNNto import Behaviour, Network, NeuronGroup, SynapseGroup
+from src.configs import corpus_config
+from src.core.learning.connectivity import DenseConnectivity
+from src.core.learning.delay import SynapseDelay as FireHistorySynapseDelay
+from src.core.learning.delay_plan import DelayInterpolationPlan
+from src.core.learning.weight_effect_delay import (
+    SynapseDelay as WeightEffectSynapseDelay,
+)
+from src.core.neurons.neurons import StreamableLIFNeurons
+from src.data.spike_generator import spike_stream_i
+from src.helpers.base import behaviour_generator
+from src.helpers.history import RingHistory
+
+MAX_DELAY = 3
+
+
+class FireEffectProbe(Behaviour):
+    def set_variables(self, synapse):
+        self.history = []
+
+    def new_iteration(self, synapse):
+        self.history.append(
+            (
+                synapse.delay.copy(),
+                synapse.src.fired.copy(),
+                synapse.src.fire_effect.copy(),
+            )
+        )
+
+
+def legacy_weight_effect(history, max_delay):
+    """Per-cell reference of the weight effect delay, rolling over the whole tensor every step"""
+    weight_effect = None
+    for delay, fired, fire_effect in history:
+        if weight_effect is None:
+            weight_effect = np.zeros(
+                (delay.shape[0], fired.size, max_delay + 1), dtype=np.float32
+            )
+
+        for dst_index in range(weight_effect.shape[0]):
+            for (src_index,) in np.argwhere(fired != 0):
+                d = delay[dst_index, src_index]
+                delay_index = np.floor(d).astype(dtype=int)
+                mantis = d % 1.0 or 1.0
+                complement = 1 - mantis
+                if delay_index == 0:
+                    weight_effect[dst_index, src_index, -2:] += [mantis, complement]
+                elif complement == 0:
+                    weight_effect[dst_index, src_index, -delay_index - 1] += mantis
+                else:
+                    weight_effect[
+                        dst_index, src_index, -delay_index - 2 : -delay_index
+                    ] += [mantis, complement]
+
+        yield weight_effect[:, :, -1].copy(), fire_effect
+        weight_effect[:, :, -1] = 0
+        weight_effect = np.roll(weight_effect, 1, axis=2)
+
+
+def legacy_fire_history(history, max_delay):
+    """Reference of the fire history delay, rolling the whole history matrix every step"""
+    fired_history = None
+    for delay, fired, fire_effect in history:
+        if fired_history is None:
+            fired_history = np.zeros((fired.size, max_delay + 1), dtype=np.float32)
+            src_indices = np.arange(fired.size) * np.ones((delay.shape[0], 1), int)
+
+        fired_history = np.roll(fired_history, 1, axis=1)
+        fired_history[:, 0] = fired
+
+        delays_indices = delay.astype(int)
+        mantis = delay % 1.0
+        expected = (
+            fired_history[src_indices, delays_indices] * (1 - mantis)
+            + fired_history[src_indices, np.clip(delays_indices + 1, 0, max_delay)]
+            * mantis
+        )
+        yield expected, fire_effect
+
+
+def make_custom_network(corpus, synapse_delay, mode="random"):
+    network = Network()
+    letters = NeuronGroup(
+        net=network,
+        tag="letters",
+        size=len(corpus_config.letters),
+        behaviour=behaviour_generator(
+            [StreamableLIFNeurons(stream=[spike_stream_i(char) for char in corpus])]
+        ),
+    )
+    words = NeuronGroup(
+        net=network,
+        tag="words",
+        size=len(corpus_config.words),
+        behaviour=behaviour_generator([StreamableLIFNeurons()]),
+    )
+    SynapseGroup(
+        net=network,
+        src=letters,
+        dst=words,
+        tag="GLUTAMATE",
+        behaviour=behaviour_generator(
+            [
+                synapse_delay(max_delay=MAX_DELAY, mode=mode),
+                FireEffectProbe(tag="probe"),
+            ]
+        ),
+    )
+    network.initialize(info=False)
+    network.simulate_iterations(len(corpus), measure_block_time=False)
+    return network
+
+
+CORPUS = "arc   car  aaa c r   acr    "
+
+
+class WeightEffectSynapseDelayTestCase(unittest.TestCase):
+    def assert_same_as_legacy(self, network):
+        history = network["probe", 0].history
+        for expected, actual in legacy_weight_effect(history, MAX_DELAY):
+            np.testing.assert_array_equal(actual, expected)
+
+    def test_random_delays_must_match_legacy_fire_effect(self):
+        self.assert_same_as_legacy(
+            make_custom_network(CORPUS, WeightEffectSynapseDelay)
+        )
+
+    def test_integer_delays_must_match_legacy_fire_effect(self):
+        self.assert_same_as_legacy(
+            make_custom_network(CORPUS, WeightEffectSynapseDelay, mode=float(MAX_DELAY))
+        )
+
+
+class FireHistorySynapseDelayTestCase(unittest.TestCase):
+    def test_ring_history_must_match_rolled_fire_effect(self):
+        network = make_custom_network(CORPUS, FireHistorySynapseDelay)
+        history = network["probe", 0].history
+        for expected, actual in legacy_fire_history(history, MAX_DELAY):
+            np.testing.assert_array_equal(actual, expected)
+
+
+class DelayInterpolationPlanTestCase(unittest.TestCase):
+    def test_plan_must_be_rebuilt_only_on_delay_change(self):
+        plan = DelayInterpolationPlan(DenseConnectivity((2, 3)).sources, MAX_DELAY)
+        delay = np.random.random((2, 3)) * MAX_DELAY
+        self.assertTrue(plan.refresh(delay))
+        self.assertFalse(plan.refresh(delay))
+
+        delay += 0.5
+        plan.invalidate()
+        self.assertTrue(plan.refresh(delay))
+        self.assertTrue(plan.refresh(delay.copy()))
+
+    def test_lerp_must_interpolate_between_lags(self):
+        history = RingHistory(3, MAX_DELAY + 1)
+        for step in range(5):
+            history.push(np.arange(3) + step * 10)
+
+        plan = DelayInterpolationPlan(DenseConnectivity((2, 3)).sources, MAX_DELAY)
+        delay = np.array([[0.0, 1.25, 3.0], [2.5, 0.75, 1.0]])
+        plan.refresh(delay)
+
+        window = history.window()
+        lower = delay.astype(int)
+        upper = np.clip(lower + 1, 0, MAX_DELAY)
+        expected = window[plan.sources, lower] * (1 - delay % 1.0) + window[
+            plan.sources, upper
+        ] * (delay % 1.0)
+        np.testing.assert_array_equal(plan.lerp(history), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
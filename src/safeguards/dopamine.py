@@ -0,0 +1,103 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.configs import feature_flags
+from src.configs.plotters import disable_plotters, restore_plotters
+from src.core.environement.dopamine import (
+    DopamineEnvironmentProvider,
+    get_dopamine_environment,
+    modulate,
+)
+from src.core.learning.reinforcement import active_labels
+from src.data.spike_generator import NO_LABEL, encode_spikes
+from src.helpers.base import reset_random_seed
+from src.main import make_network
+from src.safeguards.simulator import make_labels
+
+WORDS = ["arc", "car", "rca"]
+CORPORA = ["arc   car  rca arc    car  " * 3, "rca  rca   arc car    arc  " * 3]
+
+
+def make_words_network(corpus):
+    reset_random_seed()
+    return make_network(
+        encode_spikes(corpus), make_labels(corpus, WORDS), None, words=WORDS
+    )
+
+
+class DopamineTestCase(unittest.TestCase):
+    def setUp(self):
+        flags = mock.patch.multiple(
+            feature_flags, enable_cm_plot=False, enable_metric_logs=False
+        )
+        flags.start()
+        self.addCleanup(flags.stop)
+        self.addCleanup(restore_plotters, disable_plotters())
+
+    def test_networks_of_a_process_must_not_share_their_reward(self):
+        alone = []
+        for corpus in CORPORA:
+            network = make_words_network(corpus)
+            network.simulate_iterations(len(corpus), measure_block_time=False)
+            alone.append(network)
+
+        # both networks are stepped in turn, their random draws are restored for each one
+        networks, states = [], []
+        for corpus in CORPORA:
+            networks.append(make_words_network(corpus))
+            states.append(np.random.get_state())
+        for _ in range(len(CORPORA[0])):
+            for index, network in enumerate(networks):
+                np.random.set_state(states[index])
+                network.simulate_iteration()
+                states[index] = np.random.get_state()
+
+        for network, expected in zip(networks, alone):
+            self.assertEqual(
+                network.dopamine_environment.get(),
+                expected.dopamine_environment.get(),
+            )
+            np.testing.assert_array_equal(
+                network["GLUTAMATE", 0].W, expected["GLUTAMATE", 0].W
+            )
+
+    def test_decay_over_many_steps_must_match_the_steps(self):
+        environment = DopamineEnvironmentProvider(level=1)
+        expected = DopamineEnvironmentProvider(level=1)
+        environment.decay(0.8, 5)
+        for _ in range(5):
+            expected.decay(0.8)
+        self.assertAlmostEqual(environment.get(), expected.get())
+
+    def test_per_network_reward_must_spread_over_the_neurons(self):
+        # 2 networks of 3 neurons
+        environment = DopamineEnvironmentProvider(6, level=0.5)
+        environment.set([1.0, -1.0], where=[True, False])
+        environment.decay(0.5, where=[False, True])
+        np.testing.assert_array_equal(
+            environment.get(), [1.0, 1.0, 1.0, 0.25, 0.25, 0.25]
+        )
+
+    def test_modulated_group_must_scale_the_reward_of_its_network(self):
+        network = make_words_network(CORPORA[0])
+        synapse = network["GLUTAMATE", 0]
+        get_dopamine_environment(network).set(0.5)
+        modulate(synapse, np.array([1.0, 0.0, 2.0]))
+        np.testing.assert_array_equal(
+            get_dopamine_environment(synapse).get(), [0.5, 0.0, 1.0]
+        )
+        self.assertEqual(get_dopamine_environment(network["words", 0]).get(), 0.5)
+
+
+class SupervisorTestCase(unittest.TestCase):
+    def test_active_label_must_be_the_latest_label(self):
+        labels = [NO_LABEL, NO_LABEL, 0, NO_LABEL, 3, NO_LABEL, 1]
+        np.testing.assert_array_equal(
+            active_labels(labels), [NO_LABEL, NO_LABEL, 0, 0, 3, 3, 1]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+
+import numpy as np
+
+from PymoNNto import Network, NeuronGroup
+from src.configs import corpus_config
+from src.core.learning.reinforcement import Supervisor
+from src.core.neurons.neurons import StreamableLIFNeurons
+from src.data.spike_generator import (
+    NO_LABEL,
+    encode_labels,
+    encode_spikes,
+    joined_corpus_generator,
+    label_codes,
+    spike_stream_i,
+    stream_data,
+    whole_labels,
+)
+from src.helpers.base import behaviour_generator
+from src.helpers.network import EventDrivenSimulator
+
+
+def make_custom_network(spikes, labels):
+    network = Network()
+    NeuronGroup(
+        net=network,
+        tag="letters",
+        size=len(corpus_config.letters),
+        behaviour=behaviour_generator([StreamableLIFNeurons(stream=spikes)]),
+    )
+    NeuronGroup(
+        net=network,
+        tag="words",
+        size=len(corpus_config.words),
+        behaviour=behaviour_generator(
+            [
+                StreamableLIFNeurons(),
+                Supervisor(tag="supervisor", dopamine_decay=0.25, outputs=labels),
+            ]
+        ),
+    )
+    network.initialize(info=False)
+    return network
+
+
+class SpikeEncoderTestCase(unittest.TestCase):
+    corpus = ["arc", "xyz", "car", "ab"]
+
+    def test_spikes_must_match_per_character_spikes(self):
+        joined_corpus = joined_corpus_generator(self.corpus)
+        expected = np.array([spike_stream_i(char) for char in joined_corpus])
+        np.testing.assert_array_equal(encode_spikes(joined_corpus), expected)
+
+    def test_labels_must_be_after_each_word(self):
+        labels = encode_labels(self.corpus)
+        gap = corpus_config.words_spacing_gap
+        self.assertEqual(len(labels), len(joined_corpus_generator(self.corpus)))
+        np.testing.assert_array_equal(
+            np.flatnonzero(labels != NO_LABEL), [3, 6 + gap, 9 + 2 * gap, 11 + 3 * gap]
+        )
+        unk = len(corpus_config.words)
+        np.testing.assert_array_equal(labels[labels != NO_LABEL], [0, unk, 1, unk])
+        np.testing.assert_array_equal(
+            label_codes([NO_LABEL, 0, 1, unk], 2), [-1, 1, 2, 0]
+        )
+
+
+class ChunkedSpikeStreamTestCase(unittest.TestCase):
+    def test_chunks_must_match_whole_stream(self):
+        stream = stream_data(50, prob=0.5, chunk_size=7, seed=3)
+        whole = stream_data(50, prob=0.5, chunk_size=50, seed=3)
+        spikes = np.concatenate(list(stream.spikes.chunks()))
+
+        self.assertEqual(len(stream), len(whole))
+        np.testing.assert_array_equal(spikes, whole.spikes[:])
+        np.testing.assert_array_equal(stream.labels[:], whole.labels[:])
+        # going back in time restarts the chunks
+        np.testing.assert_array_equal(stream.spikes[3], spikes[3])
+
+    def test_chunked_stream_must_feed_the_network(self):
+        stream = stream_data(20, prob=0.8, chunk_size=6, seed=5)
+        chunked = make_custom_network(stream.spikes, stream.labels)
+        network = make_custom_network(stream.spikes[:], stream.labels[:])
+
+        # two episodes, the second one restarts the chunks
+        for _ in range(2):
+            chunked.iteration = network.iteration = 0
+            for _ in range(len(stream)):
+                chunked.simulate_iteration()
+                network.simulate_iteration()
+                for tag in ["letters", "words"]:
+                    np.testing.assert_array_equal(
+                        chunked[tag, 0].fired, network[tag, 0].fired
+                    )
+                self.assertEqual(
+                    chunked.dopamine_environment.get(),
+                    network.dopamine_environment.get(),
+                )
+
+    def test_consumers_must_share_a_single_pass_over_the_chunks(self):
+        stream = stream_data(20, prob=0.8, chunk_size=6, seed=5)
+        whole = stream_data(20, prob=0.8, chunk_size=20, seed=5)
+        passes = []
+        chunks = stream.chunks
+        stream.chunks = lambda: passes.append(1) or chunks()
+
+        # the Supervisor table, the event-driven simulator and the length
+        network = make_custom_network(stream.spikes, stream.labels)
+        EventDrivenSimulator(
+            network,
+            stream.spikes,
+            window=4,
+            events=whole_labels(stream.labels) != NO_LABEL,
+        )
+        self.assertEqual(len(stream), len(whole))
+        self.assertEqual(len(passes), 1)
+        np.testing.assert_array_equal(whole_labels(stream.labels), whole.labels[:])
+
+
+if __name__ == "__main__":
+    unittest.main()
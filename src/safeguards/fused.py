@@ -0,0 +1,39 @@
+import unittest
+
+import numpy as np
+
+from src.safeguards.batch import CORPUS, make_custom_network
+
+
+def simulate(fused):
+    network, synapse = make_custom_network(CORPUS * 3, 2, fused=fused)
+    words = network["words", 0]
+    recorder = {"fired": [], "v": []}
+    for _ in range(len(CORPUS) * 3):
+        network.simulate_iteration()
+        recorder["fired"].append(words.fired.copy())
+        recorder["v"].append(words.v.copy())
+    return network, synapse, recorder
+
+
+class FusedOutputNeuronsTestCase(unittest.TestCase):
+    def test_fused_neurons_must_match_the_separate_behaviours(self):
+        network, synapse, recorder = simulate(fused=False)
+        fused_network, fused_synapse, fused_recorder = simulate(fused=True)
+
+        fired = np.array(recorder["fired"])
+        # every word has fired
+        self.assertTrue(fired.any(axis=0).all())
+        np.testing.assert_array_equal(fused_recorder["fired"], fired)
+        np.testing.assert_array_equal(fused_recorder["v"], recorder["v"])
+        for attr in ["W", "delay"]:
+            np.testing.assert_array_equal(
+                getattr(fused_synapse, attr).data, getattr(synapse, attr).data
+            )
+        np.testing.assert_array_equal(
+            fused_network["words", 0].threshold, network["words", 0].threshold
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
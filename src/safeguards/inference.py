@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from src.configs import corpus_config
+from src.core.inference.engine import InferenceEngine
+from src.core.learning.stdp import SynapsePairWiseSTDP
+from src.core.stabilizer.activity_base_homeostasis import ActivityBaseHomeostasis
+from src.core.stabilizer.winner_take_all import NO_WINNER
+from src.data.spike_generator import encode_spikes, stream_data
+from src.safeguards.batch import CORPUS, make_custom_network
+
+
+def frozen_network_winners(batch_size):
+    network, synapse = make_custom_network(CORPUS * 3, batch_size)
+    for obj in [synapse, network["words", 0]]:
+        for behaviour in obj.behaviour.values():
+            if isinstance(behaviour, (SynapsePairWiseSTDP, ActivityBaseHomeostasis)):
+                behaviour.behaviour_enabled = False
+
+    words = network["words", 0]
+    winners = []
+    for _ in range(len(CORPUS) * 3):
+        network.simulate_iteration()
+        fired = words.fired.reshape(batch_size, -1)
+        winners.append(np.where(fired.any(axis=1), fired.argmax(axis=1), NO_WINNER))
+    return network, np.array(winners)
+
+
+class InferenceEngineTestCase(unittest.TestCase):
+    def test_engine_must_fire_the_same_words_as_the_frozen_network(self):
+        network, winners = frozen_network_winners(batch_size=2)
+        spikes = encode_spikes(CORPUS * 3)
+        self.assertTrue((winners != NO_WINNER).any())
+
+        for network_index in range(2):
+            engine = InferenceEngine.from_network(network, network_index)
+            np.testing.assert_array_equal(
+                engine.predict(spikes), winners[:, network_index]
+            )
+
+    def test_chunks_must_match_whole_stream(self):
+        network, _ = frozen_network_winners(batch_size=1)
+        engine = InferenceEngine.from_network(network)
+        chunked = stream_data(80, prob=0.8, chunk_size=9, seed=2)
+        whole = stream_data(80, prob=0.8, chunk_size=80, seed=2)
+
+        np.testing.assert_array_equal(
+            engine.predict(chunked.spikes), engine.predict(whole.spikes[:])
+        )
+        for label_window in [None, 0, 3]:
+            np.testing.assert_array_equal(
+                engine.evaluate(chunked.spikes, chunked.labels, label_window).counts,
+                engine.evaluate(whole.spikes[:], whole.labels[:], label_window).counts,
+            )
+        labels = engine.evaluate(whole.spikes[:], whole.labels[:], 3).counts.sum()
+        self.assertEqual(labels, np.sum(whole.labels[:] != -1))
+        self.assertEqual(engine.words_count, len(corpus_config.words))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+from sklearn.metrics import accuracy_score, f1_score, precision_score
+
+from PymoNNto import Behaviour, Network, NeuronGroup
+from src.configs.plotters import disable_plotters, restore_plotters
+from src.core.metrics.confusion import ConfusionMatrix
+from src.core.metrics.metrics import Metrics
+from src.data.spike_generator import NO_LABEL, label_codes
+from src.helpers.base import behaviour_generator
+
+
+class FiringPattern(Behaviour):
+    def set_variables(self, n):
+        self.pattern = self.get_init_attr("pattern", None, n)
+        n.fired = n.get_neuron_vec("zeros") > 0
+
+    def new_iteration(self, n):
+        n.fired = self.pattern[n.iteration - 1].copy()
+
+
+def make_custom_network(labels, pattern, label_window):
+    network = Network()
+    NeuronGroup(
+        net=network,
+        tag="words",
+        size=pattern.shape[1],
+        behaviour=behaviour_generator(
+            [
+                FiringPattern(pattern=pattern),
+                Metrics(
+                    tag="metrics",
+                    words=["a", "b"],
+                    outputs=labels,
+                    label_window=label_window,
+                ),
+            ]
+        ),
+    )
+    network.initialize(info=False)
+    return network
+
+
+class ConfusionMatrixTestCase(unittest.TestCase):
+    def test_scores_must_match_sklearn_over_bit_codes(self):
+        random = np.random.default_rng(3)
+        words, batch, steps = 4, 2, 300
+        labels = random.choice([NO_LABEL, 0, 1, 2, 3, words], steps)
+        fired = random.random((steps, batch, words)) < 0.15
+
+        confusion = ConfusionMatrix(words, batch)
+        for label, step_fired in zip(labels, fired):
+            confusion.add(label, step_fired)
+        confusion.add_silent(labels[:10])
+
+        outputs = label_codes(np.append(labels, labels[:10]), words)
+        bit_range = 1 << np.arange(words)
+        for network in range(batch):
+            predictions = np.append(fired[:, network].dot(bit_range), [0] * 10)
+            self.assertAlmostEqual(
+                confusion.accuracy(network), accuracy_score(outputs, predictions)
+            )
+            self.assertAlmostEqual(
+                confusion.precision(network),
+                precision_score(outputs, predictions, average="micro"),
+            )
+            self.assertAlmostEqual(
+                confusion.f1(network), f1_score(outputs, predictions, average="micro")
+            )
+        self.assertEqual(confusion.matrix(1).sum(), steps + 10)
+
+        confusion.reset()
+        self.assertEqual(confusion.counts.sum(), 0)
+
+    def test_compact_counts_must_give_the_scores_of_the_matrix(self):
+        random = np.random.default_rng(5)
+        words, batch, steps = 4, 2, 300
+        labels = random.choice([NO_LABEL, 0, 1, 2, 3, words], steps)
+        fired = random.random((steps, batch, words)) < 0.15
+        predictions = random.integers(0, words + 3, steps)
+
+        dense = ConfusionMatrix(words, batch)
+        with mock.patch("src.core.metrics.confusion.MAX_MATRIX_CELLS", 0):
+            compact = ConfusionMatrix(words, batch)
+        for confusion in [dense, compact]:
+            for label, step_fired in zip(labels, fired):
+                confusion.add(label, step_fired)
+            confusion.add_silent(labels[:10])
+            confusion.add_classes(labels, predictions, network=1)
+
+        for network in range(batch):
+            self.assertEqual(compact.accuracy(network), dense.accuracy(network))
+            for counts in ["hits", "output_counts", "prediction_counts"]:
+                np.testing.assert_array_equal(
+                    getattr(compact, counts)(network), getattr(dense, counts)(network)
+                )
+        with self.assertRaises(AssertionError):
+            compact.matrix()
+        self.assertTrue(ConfusionMatrix(50_000).is_compact)
+
+
+class LabelWindowTestCase(unittest.TestCase):
+    def test_only_labels_must_be_scored_within_the_window(self):
+        self.addCleanup(restore_plotters, disable_plotters())
+        labels = np.full(12, NO_LABEL)
+        labels[[3, 8]] = [0, 1]
+        pattern = np.zeros((12, 2), dtype=bool)
+        pattern[4, 0] = pattern[6, 1] = True
+
+        for label_window, accuracy in [(0, 0), (1, 0.5), (2, 1)]:
+            network = make_custom_network(labels, pattern, label_window)
+            network.simulate_iterations(len(labels), measure_block_time=False)
+            metrics = network["metrics", 0]
+            self.assertEqual(metrics.scores[-1]["accuracy"], accuracy)
+            self.assertEqual(metrics.confusion.counts.sum(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+from src.core.visualizer.history_recoreder_1d import HistoryRecorder1D
+from src.core.visualizer.plot_worker import PlotWorker
+
+
+class PlotWorkerTestCase(unittest.TestCase):
+    def test_frames_must_be_dropped_under_backpressure(self):
+        worker = PlotWorker(max_pending=1)
+        self.addCleanup(worker.close)
+        started, release = threading.Event(), threading.Event()
+        rendered = []
+
+        worker.submit(lambda: (started.set(), release.wait()))
+        started.wait()
+        self.assertTrue(worker.submit(lambda: rendered.append(1), droppable=True))
+        self.assertFalse(worker.submit(lambda: rendered.append(2), droppable=True))
+        release.set()
+        worker.flush()
+
+        self.assertEqual(rendered, [1])
+        self.assertEqual(worker.dropped, 1)
+
+    def test_headless_plot_must_be_saved(self):
+        with tempfile.TemporaryDirectory() as directory:
+            worker = PlotWorker(directory=directory)
+            self.addCleanup(worker.close)
+            recorder = HistoryRecorder1D(title="test", vertical_history_separator=True)
+            for value in range(5):
+                recorder.add(np.array([value, 2 * value]))
+
+            recorder.submit_plot(worker, scale=None, should_reset=False, legend="ab")
+            worker.flush()
+            self.assertEqual(worker.failed, 0)
+            self.assertEqual(len(os.listdir(directory)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.configs import network_config
+from src.helpers.checkpoint import network_state, restore_network_state
+from src.helpers.precision import dequantize, drift, quantize
+from src.safeguards.batch import CORPUS, make_custom_network
+
+
+def trained_network(precision="float32", weight_storage=None):
+    with mock.patch.multiple(
+        network_config, precision=precision, weight_storage=weight_storage
+    ):
+        network, synapse = make_custom_network(CORPUS * 3, 1)
+        network.simulate_iterations(len(CORPUS) * 3, measure_block_time=False)
+    return network, synapse
+
+
+class PrecisionTestCase(unittest.TestCase):
+    def test_float32_must_drift_slightly_from_float64(self):
+        reference, _ = trained_network("float64")
+        network, synapse = trained_network("float32")
+        self.assertEqual(synapse.W.dtype, np.float32)
+        self.assertEqual(network["words", 0].trace.buffer.dtype, np.float32)
+
+        differences = drift(network_state(reference), network_state(network))
+        for key in ["GLUTAMATE/W", "GLUTAMATE/delay", "words/threshold"]:
+            self.assertLess(differences[key], 1e-4, key)
+
+        _, synapse = trained_network("float32", "float16")
+        self.assertEqual(synapse.W.dtype, np.float16)
+        self.assertEqual(synapse.delay.dtype, np.float16)
+
+    def test_int8_weights_must_be_restored_within_a_quantization_step(self):
+        values = np.random.uniform(0, 4, 100)
+        codes, offset, scale = quantize(values)
+        self.assertEqual(codes.dtype, np.int8)
+        self.assertLessEqual(
+            np.abs(dequantize(codes, offset, scale) - values).max(), scale / 2 + 1e-12
+        )
+
+        network, synapse = trained_network()
+        W = synapse.W.data.copy()
+        with mock.patch.object(network_config, "weight_storage", "int8"):
+            state = network_state(network)
+        self.assertEqual(state["GLUTAMATE/W.int8"].dtype, np.int8)
+
+        synapse.W.data[:] = 0
+        restore_network_state(network, state)
+        np.testing.assert_allclose(synapse.W.data, W, atol=np.ptp(W) / 255)
+
+
+if __name__ == "__main__":
+    unittest.main()
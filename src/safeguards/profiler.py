@@ -0,0 +1,39 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.helpers.network import EpisodeTracker
+from src.helpers.profiler import BehaviourProfiler
+from src.safeguards.batch import CORPUS, make_custom_network
+
+
+class BehaviourProfilerTestCase(unittest.TestCase):
+    def test_every_step_of_every_behaviour_must_be_timed(self):
+        network, _ = make_custom_network(CORPUS, 1)
+        profiler = BehaviourProfiler(network, track_allocations=True).attach()
+        network.simulate_iterations(len(CORPUS), measure_block_time=False)
+        profiler.detach()
+
+        report = profiler.report()
+        self.assertTrue((report["calls"] == len(CORPUS)).all())
+        self.assertIn("GLUTAMATE/1:SynapseDelay", set(report["behaviour"]))
+        self.assertAlmostEqual(report["share"].sum(), 1)
+        self.assertTrue((report["p99_us"] >= 0).all())
+        self.assertFalse(report["mean_bytes"].isna().any())
+
+        # detached: back to the original behaviours
+        network.iteration = 0
+        network.simulate_iterations(1, measure_block_time=False)
+        self.assertTrue((profiler.report()["calls"] == len(CORPUS)).all())
+
+        with tempfile.TemporaryDirectory() as directory:
+            EpisodeTracker._episode = 1
+            path = profiler.export(directory)
+            np.testing.assert_array_equal(pd.read_csv(path)["calls"], report["calls"])
+            self.assertTrue(profiler.report().empty)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+import matplotlib
+import numpy as np
+
+from src.core.visualizer.history_recoreder_1d import HistoryRecorder1D
+
+matplotlib.use("Agg")
+
+
+class HistoryRecorderTestCase(unittest.TestCase):
+    def test_history_must_keep_the_latest_decimated_values(self):
+        recorder = HistoryRecorder1D(title="test", window_size=2, capacity=3)
+        for value in range(10):
+            recorder.add(np.array([value, -value]))
+
+        # values 0, 2, 4, 6, 8 are recorded, only the last 3 are kept
+        np.testing.assert_array_equal(recorder.history[:, 0], [4, 6, 8])
+        np.testing.assert_array_equal(recorder.latest(), [8, -8])
+
+        recorder.reset()
+        self.assertEqual(len(recorder.history), 0)
+
+    def test_windows_must_be_reduced(self):
+        for reduction, expected in [("min", [0, 3]), ("max", [2, 5]), ("mean", [1, 4])]:
+            recorder = HistoryRecorder1D(
+                title="test", window_size=3, reduction=reduction
+            )
+            for value in range(7):
+                recorder.add(value)
+            np.testing.assert_array_equal(recorder.history, expected)
+
+    def test_rows_kept_over_the_episodes_must_grow_over_the_capacity(self):
+        recorder = HistoryRecorder1D(
+            title="test", vertical_history_separator=True, capacity=4, grow=True
+        )
+        for episode in range(3):
+            for value in range(3):
+                recorder.add(3 * episode + value)
+            recorder.plot(should_reset=False)
+
+        np.testing.assert_array_equal(recorder.history, range(9))
+        np.testing.assert_array_equal(recorder.steps, range(9))
+        self.assertEqual(recorder.history_steps, [3, 6, 9])
+
+        # a bounded recorder must not be plotted over the episodes once it has lost rows
+        bounded = HistoryRecorder1D(title="test", capacity=4)
+        for value in range(5):
+            bounded.add(value)
+        with self.assertRaises(AssertionError):
+            bounded.plot(should_reset=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
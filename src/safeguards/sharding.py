@@ -0,0 +1,127 @@
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.configs import feature_flags
+from src.configs.plotters import disable_plotters, restore_plotters
+from src.data.spike_generator import encode_spikes
+from src.helpers.base import reset_random_seed
+from src.helpers.checkpoint import Checkpoints
+from src.helpers.network import EpisodeTracker
+from src.helpers.sharding import ShardedWords, shard_bounds
+from src.main import make_network
+from src.safeguards.simulator import make_labels
+
+WORDS = ["arc", "car", "rca", "acr", "bad", "dab"]
+CORPUS = "arc   car  rca arc    bad car  acr dab  arc  " * 4
+# the shards draw their own noise
+HYPERPARAMETERS = {"stimulus": {"noise_scale_factor": 0}}
+
+
+def make_words_network(spikes, labels, hyperparameters=HYPERPARAMETERS):
+    reset_random_seed()
+    return make_network(
+        spikes, labels, None, words=WORDS, hyperparameters=hyperparameters
+    )
+
+
+def simulate_episodes(network, episodes):
+    for _ in range(episodes):
+        EpisodeTracker.update()
+        network.iteration = 0
+        network.simulate_iterations(len(CORPUS), measure_block_time=False)
+
+
+class ShardingTestCase(unittest.TestCase):
+    def setUp(self):
+        flags = mock.patch.multiple(
+            feature_flags, enable_cm_plot=False, enable_metric_logs=False
+        )
+        flags.start()
+        self.addCleanup(flags.stop)
+        self.addCleanup(restore_plotters, disable_plotters())
+        EpisodeTracker._episode = 0
+
+    def test_shards_must_cover_the_words_evenly(self):
+        np.testing.assert_array_equal(shard_bounds(6, 4), [0, 1, 3, 4, 6])
+        with self.assertRaises(AssertionError):
+            shard_bounds(6, 7)
+
+    def test_sharded_training_must_match_the_single_process_one(self):
+        spikes, labels = encode_spikes(CORPUS), make_labels(CORPUS, WORDS)
+        for label_window in [None, 2]:
+            with self.subTest(label_window=label_window):
+                self.assert_sharded_training_matches(spikes, labels, label_window)
+
+    def assert_sharded_training_matches(self, spikes, labels, label_window):
+        hyperparameters = {
+            **HYPERPARAMETERS,
+            "metrics:train": {"label_window": label_window},
+        }
+        EpisodeTracker._episode = 0
+        network = make_words_network(spikes, labels, hyperparameters)
+        simulate_episodes(network, 2)
+
+        EpisodeTracker._episode = 0
+        sharded_network = make_words_network(spikes, labels, hyperparameters)
+        with ShardedWords(
+            sharded_network,
+            3,
+            spikes,
+            labels,
+            words=WORDS,
+            hyperparameters=hyperparameters,
+        ) as sharded:
+            scores = [sharded.train_episode() for _ in range(2)]
+            sharded.gather()
+
+        self.assertEqual(scores, network["metrics:train", 0].scores)
+        for attr in ["W", "delay"]:
+            np.testing.assert_array_equal(
+                getattr(sharded_network["GLUTAMATE", 0], attr),
+                getattr(network["GLUTAMATE", 0], attr),
+            )
+        np.testing.assert_array_equal(
+            sharded_network["words", 0].threshold, network["words", 0].threshold
+        )
+
+    def test_resumed_sharded_training_must_match_the_uninterrupted_one(self):
+        spikes, labels = encode_spikes(CORPUS), make_labels(CORPUS, WORDS)
+        network = make_words_network(spikes, labels)
+        simulate_episodes(network, 3)
+
+        EpisodeTracker._episode = 0
+        options = dict(words=WORDS, hyperparameters=HYPERPARAMETERS)
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoints = Checkpoints(directory)
+            sharded_network = make_words_network(spikes, labels)
+            with ShardedWords(sharded_network, 3, spikes, labels, **options) as sharded:
+                sharded.train(2, checkpoints=checkpoints)
+
+            resumed = make_words_network(spikes, labels)
+            self.assertEqual(checkpoints.restore(resumed), 2)
+            with ShardedWords(resumed, 3, spikes, labels, **options) as sharded:
+                sharded.train(1)
+                sharded.gather()
+
+        for attr in ["W", "delay"]:
+            np.testing.assert_array_equal(
+                getattr(resumed["GLUTAMATE", 0], attr),
+                getattr(network["GLUTAMATE", 0], attr),
+            )
+        for attr in ["v", "threshold"]:
+            np.testing.assert_array_equal(
+                getattr(resumed["words", 0], attr), getattr(network["words", 0], attr)
+            )
+        np.testing.assert_array_equal(
+            resumed["homeostasis", 0].activities, network["homeostasis", 0].activities
+        )
+        self.assertEqual(
+            resumed.dopamine_environment.get(), network.dopamine_environment.get()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
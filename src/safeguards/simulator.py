@@ -0,0 +1,139 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from PymoNNto import Network, NeuronGroup, SynapseGroup
+from src.configs import corpus_config, network_config
+from src.core.environement.dopamine import DopamineEnvironmentProvider
+from src.core.learning.delay import SynapseDelay as FireHistorySynapseDelay
+from src.core.learning.reinforcement import Supervisor
+from src.core.learning.stdp import SynapsePairWiseSTDP
+from src.core.learning.weight_effect_delay import (
+    SynapseDelay as WeightEffectSynapseDelay,
+)
+from src.core.neurons.current import CurrentStimulus
+from src.core.neurons.neurons import StreamableLIFNeurons
+from src.core.neurons.trace import TraceHistory
+from src.core.stabilizer.activity_base_homeostasis import ActivityBaseHomeostasis
+from src.core.stabilizer.winner_take_all import WinnerTakeAll
+from src.data.spike_generator import encode_spikes, NO_LABEL
+from src.helpers.base import behaviour_generator, reset_random_seed
+from src.helpers.network import EventDrivenSimulator
+
+MAX_DELAY = 3
+LIF_BASE = {"v_rest": -65, "v_reset": -65, "threshold": -60, "dt": 1.0, "tau": 3}
+CORPUS = "arc" + " " * 23 + "car" + " " * 17 + "rca" + " " * 11 + "arc" + " " * 30
+
+
+def make_labels(corpus, words=None):
+    labels = np.full(len(corpus), NO_LABEL)
+    for i, word in enumerate(corpus_config.words if words is None else words):
+        for start in range(len(corpus) - len(word)):
+            if corpus[start : start + len(word)] == word:
+                labels[start + len(word)] = i
+    return labels
+
+
+def make_custom_network(corpus, synapse_delay, event_driven):
+    reset_random_seed()
+    stream = encode_spikes(corpus)
+
+    network = Network()
+    network.dopamine_environment = DopamineEnvironmentProvider(level=1)
+    letters = NeuronGroup(
+        net=network,
+        tag="letters",
+        size=len(corpus_config.letters),
+        behaviour=behaviour_generator(
+            [
+                StreamableLIFNeurons(stream=stream, **LIF_BASE),
+                TraceHistory(max_delay=MAX_DELAY),
+            ]
+        ),
+    )
+    words = NeuronGroup(
+        net=network,
+        tag="words",
+        size=len(corpus_config.words),
+        behaviour={
+            3: CurrentStimulus(
+                noise_scale_factor=0,
+                stimulus_scale_factor=3,
+                synapse_lens_selector=["GLUTAMATE", 0],
+            ),
+            4: StreamableLIFNeurons(
+                **LIF_BASE, has_long_term_effect=True, capture_old_v=True
+            ),
+            5: TraceHistory(max_delay=MAX_DELAY),
+            6: ActivityBaseHomeostasis(window_size=20, activity_rate=2),
+            7: WinnerTakeAll(),
+            9: Supervisor(dopamine_decay=0.25, outputs=make_labels(corpus)),
+        },
+    )
+    synapse = SynapseGroup(
+        net=network,
+        src=letters,
+        dst=words,
+        tag="GLUTAMATE",
+        behaviour={
+            1: synapse_delay(max_delay=MAX_DELAY),
+            8: SynapsePairWiseSTDP(max_delay=MAX_DELAY, w_max=4.0, delay_factor=0.5),
+        },
+    )
+    network.initialize(info=False)
+
+    if event_driven:
+        simulator = EventDrivenSimulator(network, stream, window=MAX_DELAY + 1)
+        simulator.simulate()
+    else:
+        network.simulate_iterations(len(corpus), measure_block_time=False)
+    return network, synapse
+
+
+class EventDrivenSimulatorTestCase(unittest.TestCase):
+    def setUp(self):
+        # the closed forms of the silent spans match the steps up to the float64 rounding
+        precision = mock.patch.object(network_config, "precision", "float64")
+        precision.start()
+        self.addCleanup(precision.stop)
+
+    def assert_same_as_step_by_step(self, synapse_delay):
+        network, synapse = make_custom_network(CORPUS, synapse_delay, False)
+        event_network, event_synapse = make_custom_network(CORPUS, synapse_delay, True)
+
+        self.assertEqual(event_network.iteration, network.iteration)
+        self.assertAlmostEqual(
+            event_network.dopamine_environment.get(),
+            network.dopamine_environment.get(),
+        )
+        np.testing.assert_allclose(event_synapse.W, synapse.W)
+        np.testing.assert_allclose(event_synapse.delay, synapse.delay)
+        for tag in ["letters", "words"]:
+            for attr in ["v", "threshold"]:
+                np.testing.assert_allclose(
+                    getattr(event_network[tag, 0], attr), getattr(network[tag, 0], attr)
+                )
+            np.testing.assert_allclose(
+                event_network[tag, 0].trace.window(),
+                network[tag, 0].trace.window(),
+                atol=1e-12,
+            )
+
+    def test_silent_spans_must_be_skipped(self):
+        network = make_custom_network(CORPUS, FireHistorySynapseDelay, False)[0]
+        simulator = EventDrivenSimulator(
+            network, encode_spikes(CORPUS), window=MAX_DELAY + 1
+        )
+        self.assertLess(simulator.active_steps, len(CORPUS) / 2)
+        self.assertEqual(sum(steps for steps, _ in simulator.spans), len(CORPUS))
+
+    def test_fire_history_delay_must_match_step_by_step(self):
+        self.assert_same_as_step_by_step(FireHistorySynapseDelay)
+
+    def test_weight_effect_delay_must_match_step_by_step(self):
+        self.assert_same_as_step_by_step(WeightEffectSynapseDelay)
+
+
+if __name__ == "__main__":
+    unittest.main()
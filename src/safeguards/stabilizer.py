@@ -1,12 +1,16 @@
 import unittest
+from unittest import mock
 
 import numpy as np
 
 from PymoNNto import Network, NeuronGroup, Recorder
-from src.configs import corpus_config
+from src.configs import corpus_config, network_config
 from src.core.neurons.neurons import StreamableLIFNeurons
+from src.core.stabilizer.activity_base_homeostasis import ActivityBaseHomeostasis
+from src.core.stabilizer.count_base_homeostasis import CountBaseHomeostasis
 from src.core.stabilizer.winner_take_all import WinnerTakeAll
 from src.helpers.base import behaviour_generator
+from src.helpers.network import EventDrivenSimulator
 from src.safeguards.libs.override_neurons import OverrideNeurons, OVERRIDABLE_SUFFIX
 
 
@@ -60,5 +64,64 @@ class WinnerTakeAllTestCase(unittest.TestCase):
             self.assertLessEqual(np.sum(fired), 1)
 
 
+def make_homeostasis_network(homeostasis, fired):
+    network = Network()
+    NeuronGroup(
+        net=network,
+        tag="words",
+        size=fired.shape[1],
+        behaviour={
+            1: StreamableLIFNeurons(has_long_term_effect=True),
+            2: OverrideNeurons(**{f"fired{OVERRIDABLE_SUFFIX}": list(fired)}),
+            3: homeostasis,
+        },
+    )
+    network.initialize(info=False)
+    return network
+
+
+class HomeostasisTestCase(unittest.TestCase):
+    def setUp(self):
+        # the counts are exact, the accumulated activities are rounded step by step
+        precision = mock.patch.object(network_config, "precision", "float64")
+        precision.start()
+        self.addCleanup(precision.stop)
+        self.fired = np.random.default_rng(7).random((95, 6)) > 0.7
+        self.homeostasis = dict(window_size=10, activity_rate=6, updating_rate=0.1)
+
+    def test_counts_must_match_the_accumulated_activities(self):
+        networks = [
+            make_homeostasis_network(homeostasis(**self.homeostasis), self.fired)
+            for homeostasis in [ActivityBaseHomeostasis, CountBaseHomeostasis]
+        ]
+        for network in networks:
+            network.simulate_iterations(len(self.fired), measure_block_time=False)
+        np.testing.assert_allclose(
+            networks[1]["words", 0].threshold, networks[0]["words", 0].threshold
+        )
+
+    def test_skipped_steps_must_match_the_silent_steps(self):
+        # silent steps 30..64, over windows of 10 and 15 steps
+        self.fired[30:65] = False
+        homeostasis = dict(
+            **self.homeostasis, neuron_windows=[10, 15] * 3, target_ema=0.5
+        )
+        network = make_homeostasis_network(
+            CountBaseHomeostasis(**homeostasis), self.fired
+        )
+        network.simulate_iterations(len(self.fired), measure_block_time=False)
+
+        skipping = make_homeostasis_network(
+            CountBaseHomeostasis(**homeostasis), self.fired
+        )
+        EventDrivenSimulator(skipping, self.fired, window=0).simulate()
+        words = skipping["words", 0]
+
+        np.testing.assert_allclose(words.threshold, network["words", 0].threshold)
+        np.testing.assert_array_equal(
+            words.behaviour[3].targets, network["words", 0].behaviour[3].targets
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
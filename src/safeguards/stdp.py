@@ -1,7 +1,7 @@
 import numpy as np
 
 from PymoNNto import NeuronGroup, Network, SynapseGroup
-from src.core.environement.dopamine import DopamineEnvironment
+from src.core.environement.dopamine import DopamineEnvironmentProvider
 from src.core.learning.delay import SynapseDelay
 from src.core.learning.stdp import SynapsePairWiseSTDP
 from src.core.neurons.neurons import StreamableLIFNeurons
@@ -21,9 +21,9 @@ def make_single_char_spikes(corpus, selected_character):
 
 def main():
     network = Network()
+    network.dopamine_environment = DopamineEnvironmentProvider(level=1)
     i_corpus = "i  "
     j_corpus = " j "
-    DopamineEnvironment.set(1)
     connection_delay = 1
     lif_base = {
         "v_rest": -65,
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from src.configs import feature_flags, network_config
+from src.sweep import (
+    SCORES,
+    configure,
+    grid_configurations,
+    random_configurations,
+    summary,
+    sweep,
+    to_hyperparameters,
+)
+
+GRID = {"stdp.a_plus": [0.1, 0.2], "stdp.tau_plus": [3.0]}
+
+
+def make_rows(config_id, a_plus, epochs, f1):
+    return [
+        {
+            "config_id": config_id,
+            "seed": 1,
+            "epochs": epochs,
+            "corpus_size": 10,
+            "stdp.a_plus": a_plus,
+            "epoch": epoch,
+            **{score: f1[epoch - 1] for score in SCORES},
+        }
+        for epoch in range(1, epochs + 1)
+    ]
+
+
+class SweepTestCase(unittest.TestCase):
+    def test_grid_must_cover_every_combination(self):
+        self.assertEqual(
+            list(grid_configurations(GRID)),
+            [
+                {"stdp.a_plus": 0.1, "stdp.tau_plus": 3.0},
+                {"stdp.a_plus": 0.2, "stdp.tau_plus": 3.0},
+            ],
+        )
+
+    def test_random_samples_must_be_seeded_and_in_range(self):
+        ranges = {"stdp.a_plus": [0.05, 0.5], "homeostasis.updating_rate": [0, 0.1]}
+        samples = list(random_configurations(ranges, 5, seed=3))
+        self.assertEqual(samples, list(random_configurations(ranges, 5, seed=3)))
+        self.assertEqual(len(samples), 5)
+        for sample in samples:
+            for name, (low, high) in ranges.items():
+                self.assertTrue(low <= sample[name] <= high)
+
+    def test_resumed_sweep_must_only_run_the_new_runs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "sweep.csv")
+            configurations = [{"stdp.a_plus": 0.1, "network_config.max_delay": 2}]
+            options = dict(corpus_size=10, workers=1)
+
+            results = sweep(configurations, [1], output, epochs=1, **options)
+            self.assertEqual(len(results), 1)
+            # same runs, nothing left to do
+            self.assertEqual(
+                len(sweep(configurations, [1], output, epochs=1, **options)), 1
+            )
+            # a longer training is another run
+            results = sweep(configurations, [1], output, epochs=2, **options)
+            self.assertEqual(len(results), 3)
+            self.assertEqual(results["config_id"].nunique(), 2)
+
+    def test_config_parameters_must_set_their_module(self):
+        params = {
+            "stdp.a_plus": 0.1,
+            "network_config.max_delay": 8,
+            "feature_flags.enable_count_homeostasis": True,
+        }
+        self.assertEqual(to_hyperparameters(params), {"stdp": {"a_plus": 0.1}})
+        with mock.patch.object(network_config, "max_delay", 4), mock.patch.object(
+            feature_flags, "enable_count_homeostasis", False
+        ):
+            configure(params)
+            self.assertEqual(network_config.max_delay, 8)
+            self.assertTrue(feature_flags.enable_count_homeostasis)
+            with self.assertRaises(AssertionError):
+                configure({"network_config.max_delays": 8})
+
+    def test_resumed_sweep_must_keep_the_columns_of_the_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "sweep.csv")
+            pd.DataFrame(make_rows("a", 0.1, 1, [0.2])).to_csv(output, index=False)
+
+            with self.assertRaises(AssertionError):
+                sweep([{"stdp.tau_plus": 3.0}], [1], output, epochs=1, workers=1)
+            with self.assertRaises(AssertionError):
+                sweep([{"stdp.a_plus": 0.1, "stdp.tau_plus": 3.0}], [1], output)
+            self.assertEqual(len(pd.read_csv(output)), 1)
+
+    def test_summary_must_take_every_run_at_its_own_last_epoch(self):
+        results = pd.DataFrame(
+            make_rows("a", 0.1, 2, [0.2, 0.4])
+            + make_rows("b", 0.2, 1, [0.6])
+            + make_rows("c", 0.1, 1, [0.3])
+        )
+        scores = summary(results)
+        self.assertEqual(len(scores), 3)
+        self.assertAlmostEqual(scores.loc[(1, 10, 0.2), ("f1", "mean")], 0.6)
+        self.assertAlmostEqual(scores.loc[(2, 10, 0.1), ("f1", "mean")], 0.4)
+        self.assertAlmostEqual(scores.loc[(1, 10, 0.1), ("f1", "mean")], 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
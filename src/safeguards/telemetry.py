@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.core.visualizer.history_recoreder_1d import HistoryRecorder1D
+from src.core.visualizer.telemetry import TelemetrySink, load_series, read_index
+
+
+class TelemetryTestCase(unittest.TestCase):
+    def test_episodes_must_be_loaded_from_their_chunks_only(self):
+        with tempfile.TemporaryDirectory() as directory:
+            sink = TelemetrySink(directory, chunk_rows=4)
+            for episode in range(1, 7):
+                steps = np.arange(2)
+                sink.append("firing", episode, steps, np.stack((steps, -steps), 1))
+                sink.append("threshold", episode, steps, steps * 10.0)
+            sink.flush()
+
+            # 2 episodes per chunk
+            self.assertEqual(len(read_index(directory)), 6)
+            os.remove(os.path.join(directory, "firing-00000.npz"))
+            frame = load_series(directory, "firing", episodes=(3, 4))
+            np.testing.assert_array_equal(frame["episode"], [3, 3, 4, 4])
+            np.testing.assert_array_equal(frame["step"], [0, 1, 0, 1])
+            np.testing.assert_array_equal(frame[1], [0, -1, 0, -1])
+
+            # a new run appends to the same store without being mixed with the first one
+            second = TelemetrySink(directory)
+            second.append("threshold", 1, np.array([0]), np.array([[1.0]]))
+            second.flush()
+            self.assertEqual((sink.run, second.run), (0, 1))
+            frame = load_series(directory, "threshold", episodes=(1, 1))
+            np.testing.assert_array_equal(frame["run"], [1])
+            np.testing.assert_array_equal(frame[0], [1.0])
+            frame = load_series(directory, "threshold", episodes=(1, 1), run=0)
+            np.testing.assert_array_equal(frame[0], [0.0, 10.0])
+            self.assertEqual(len(load_series(directory, "threshold", run=0)), 12)
+
+    def test_recorder_must_export_every_row_once(self):
+        sink = mock.Mock()
+        recorder = HistoryRecorder1D(title="test", capacity=3)
+        with mock.patch(
+            "src.core.visualizer.history_recorder.get_telemetry_sink",
+            return_value=sink,
+        ):
+            for value in range(5):
+                recorder.add(value)
+            recorder.flush()
+            recorder.add(5)
+            recorder.flush()
+
+        # the full buffer is flushed before its oldest row is overwritten
+        first, second, third = sink.append.call_args_list
+        np.testing.assert_array_equal(first.args[2], [0, 1, 2])
+        np.testing.assert_array_equal(second.args[2], [3, 4])
+        np.testing.assert_array_equal(third.args[2], [5])
+        np.testing.assert_array_equal(third.args[3], [5])
+
+    def test_full_buffer_must_look_for_the_sink_once_per_capacity(self):
+        recorder = HistoryRecorder1D(title="test", capacity=3)
+        with mock.patch(
+            "src.core.visualizer.history_recorder.get_telemetry_sink",
+            return_value=None,
+        ) as get_sink:
+            for value in range(10):
+                recorder.add(value)
+
+        # at the 4th, 7th and 10th rows
+        self.assertEqual(get_sink.call_count, 3)
+        np.testing.assert_array_equal(recorder.history, [7, 8, 9])
+
+    def test_rows_of_the_previous_shape_must_be_exported(self):
+        sink = mock.Mock()
+        recorder = HistoryRecorder1D(title="test", capacity=3)
+        with mock.patch(
+            "src.core.visualizer.history_recorder.get_telemetry_sink",
+            return_value=sink,
+        ):
+            recorder.add(np.zeros(2))
+            recorder.add(np.ones(2))
+            recorder.add(np.ones(4))
+            recorder.flush()
+
+        first, second = sink.append.call_args_list
+        np.testing.assert_array_equal(first.args[3], [[0, 0], [1, 1]])
+        np.testing.assert_array_equal(second.args[3], [np.ones(4)])
+
+    def test_store_must_keep_the_rows_beyond_the_capacity(self):
+        with tempfile.TemporaryDirectory() as directory:
+            sink = TelemetrySink(directory, chunk_rows=5)
+            recorder = HistoryRecorder1D(title="test", capacity=4)
+            with mock.patch(
+                "src.core.visualizer.history_recorder.get_telemetry_sink",
+                return_value=sink,
+            ):
+                for value in range(11):
+                    recorder.add(value)
+                recorder.flush()
+            sink.flush()
+
+            frame = load_series(directory, "test")
+            np.testing.assert_array_equal(frame["step"], range(11))
+            np.testing.assert_array_equal(frame[0], range(11))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import itertools
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.configs import corpus_config, feature_flags
+from src.configs.plotters import disable_plotters, restore_plotters
+from src.data.spike_generator import NO_LABEL, encode_labels, encode_spikes
+from src.data.text_corpus import Vocabulary, iter_words, text_stream
+from src.helpers.base import reset_random_seed
+from src.main import make_network
+
+TEXT = "The cat, the DOG and the bird.\nThe cat-dog: sat!"
+
+
+class TextCorpusTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "text.txt")
+        with open(self.path, "w") as file:
+            file.write(TEXT)
+
+    def test_words_must_not_depend_on_the_read_chunks(self):
+        expected = "the cat the dog and the bird the cat dog sat".split()
+        self.assertEqual(list(iter_words(self.path)), expected)
+        self.assertEqual(list(iter_words(self.path, chunk_size=3)), expected)
+
+    def test_vocabulary_must_keep_the_frequent_words(self):
+        vocabulary = Vocabulary.from_text(self.path, min_count=2)
+        self.assertEqual(vocabulary.words, ["the", "cat", "dog"])
+        self.assertEqual(vocabulary.index("sat"), vocabulary.unk)
+        self.assertEqual(
+            Vocabulary.from_text(self.path, max_size=1).words, vocabulary.words[:1]
+        )
+
+    def test_chunks_must_match_whole_encoding(self):
+        vocabulary = Vocabulary.from_text(self.path, min_count=2)
+        stream = text_stream(self.path, vocabulary, chunk_words=4)
+
+        corpus = list(iter_words(self.path))
+        gap = " " * corpus_config.words_spacing_gap
+        labels = encode_labels(corpus, words=vocabulary.words)
+        np.testing.assert_array_equal(
+            stream.spikes[:], encode_spikes(gap.join(corpus) + gap)
+        )
+        np.testing.assert_array_equal(stream.labels[:], labels)
+        self.assertEqual(
+            list(stream.labels[:][stream.labels[:] != NO_LABEL]),
+            [0, 1, 0, 2, 3, 0, 3, 0, 1, 2, 3],
+        )
+
+    def test_large_vocabulary_must_train_end_to_end(self):
+        flags = mock.patch.multiple(
+            feature_flags, enable_cm_plot=False, enable_metric_logs=False
+        )
+        flags.start()
+        self.addCleanup(flags.stop)
+        self.addCleanup(restore_plotters, disable_plotters())
+        reset_random_seed()
+        words = ["".join(w) for w in itertools.product("abcdefghijk", repeat=3)]
+        with open(self.path, "w") as file:
+            file.write(" ".join(words[:1200] * 2))
+
+        vocabulary = Vocabulary.from_text(self.path, min_count=2)
+        stream = text_stream(self.path, vocabulary, chunk_words=500)
+        network = make_network(
+            stream.spikes, stream.labels, None, words=vocabulary.words
+        )
+        network.simulate_iterations(300, measure_block_time=False)
+
+        self.assertEqual(len(vocabulary), 1200)
+        self.assertEqual(network["words", 0].size, 1200)
+        # a spike per word and window at least
+        homeostasis = network["homeostasis", 0]
+        self.assertLessEqual(
+            homeostasis.activity_target * 1200, homeostasis.window_size
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
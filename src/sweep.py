@@ -0,0 +1,233 @@
+"""
+Hyperparameter sweep over the training of `main`, one configuration per worker process
+    - parameters are `<behaviour tag>.<attribute>`, e.g. `stdp.a_plus` or `homeostasis.updating_rate`,
+      or `<config>.<name>` of the `CONFIGS` modules, e.g. `network_config.max_delay` or `feature_flags.enable_*`
+    - grid: every combination of the given values, random: uniform samples in the given [low, high] ranges
+    - every configuration is trained with each of the seeds, plotters, logs and figures are off
+    - the results are appended to one tidy csv (a row per configuration, seed and epoch) as soon as a run is done,
+      so an interrupted sweep resumes by skipping the runs already in the csv (same parameters, seed, epochs and corpus),
+      the parameters must be the ones of the csv columns
+
+python -m src.sweep --grid '{"stdp.a_plus": [0.1, 0.2], "stdp.tau_plus": [3, 4]}' --seeds 1 2 --epochs 60
+python -m src.sweep --random '{"stdp.a_plus": [0.05, 0.5]}' --samples 20 --output out/random-sweep.csv
+python -m src.sweep --grid '{"network_config.max_delay": [2, 4, 8], "feature_flags.enable_count_homeostasis": [false, true]}'
+"""
+
+import argparse
+import hashlib
+import importlib
+import itertools
+import json
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.configs.network_config import epochs
+
+SCORES = ["accuracy", "precision", "f1", "recall"]
+# swept as parameters, e.g. `network_config.max_delay`
+CONFIGS = ["network_config", "feature_flags"]
+
+
+def grid_configurations(grid):
+    names = sorted(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def random_configurations(ranges, samples, seed=None):
+    random = np.random.default_rng(seed)
+    names = sorted(ranges)
+    for _ in range(samples):
+        yield {name: float(random.uniform(*ranges[name])) for name in names}
+
+
+def configuration_id(params, seed, epochs, corpus_size, corpus_seed=None):
+    """id of a run: its parameters, seed and training setting (a longer training is another run)"""
+    key = {
+        "params": params,
+        "seed": seed,
+        "epochs": epochs,
+        "corpus_size": corpus_size,
+    }
+    if corpus_seed is not None:
+        key["corpus_seed"] = corpus_seed
+    key = json.dumps(key, sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+
+def to_hyperparameters(params):
+    """`{"stdp.a_plus": 0.1}` => `{"stdp": {"a_plus": 0.1}}`, the `CONFIGS` parameters are left out"""
+    hyperparameters = {}
+    for name, value in params.items():
+        tag, attr = name.rsplit(".", 1)
+        if tag not in CONFIGS:
+            hyperparameters.setdefault(tag, {})[attr] = value
+    return hyperparameters
+
+
+def configure(params):
+    """set the `CONFIGS` parameters, e.g. `{"network_config.max_delay": 8}`, the others are left out"""
+    for name, value in params.items():
+        config, attr = name.rsplit(".", 1)
+        if config not in CONFIGS:
+            continue
+        module = importlib.import_module(f"src.configs.{config}")
+        if not hasattr(module, attr):
+            raise AssertionError(f"{config} has no {attr}")
+        setattr(module, attr, value)
+
+
+def result_columns(params):
+    """columns of the csv rows of a configuration"""
+    return ["config_id", "seed", "epochs", "corpus_size", *params, "epoch", *SCORES]
+
+
+def run_configuration(run):
+    """train one configuration in a fresh worker process and return its per epoch scores"""
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    configure(run["params"])
+
+    from src.configs import feature_flags
+    from src.configs.plotters import disable_plotters
+    from src.data.cache import load_data
+    from src.helpers.base import reset_random_seed
+    from src.main import make_network, train
+
+    feature_flags.enable_cm_plot = False
+    feature_flags.enable_metric_logs = False
+    disable_plotters()
+
+    reset_random_seed(run["seed"])
+    stream_i, stream_j, joined_corpus = load_data(
+        run["corpus_size"], prob=1, seed=run["corpus_seed"]
+    )
+    network = make_network(
+        stream_i,
+        stream_j,
+        joined_corpus,
+        hyperparameters=to_hyperparameters(run["params"]),
+    )
+    train(network, stream_i, stream_j, run["epochs"], progress=False)
+
+    return [
+        {
+            "config_id": run["config_id"],
+            "seed": run["seed"],
+            "epochs": run["epochs"],
+            "corpus_size": run["corpus_size"],
+            **run["params"],
+            "epoch": epoch,
+            **{score: scores[score] for score in SCORES},
+        }
+        for epoch, scores in enumerate(network["metrics:train", 0].scores, start=1)
+    ]
+
+
+def sweep(
+    configurations,
+    seeds,
+    output,
+    epochs=epochs,
+    corpus_size=1000,
+    corpus_seed=None,
+    workers=None,
+):
+    """`corpus_seed`: one cached corpus memory mapped by all the runs, a corpus per run seed otherwise"""
+    configurations = list(configurations)
+    done = set()
+    columns = result_columns(configurations[0]) if configurations else []
+    if os.path.exists(output):
+        done = set(pd.read_csv(output, usecols=["config_id"])["config_id"])
+        columns = list(pd.read_csv(output, nrows=0).columns)
+    for params in configurations:
+        # appended rows of other columns would corrupt the csv
+        if result_columns(params) != columns:
+            raise AssertionError(
+                f"the parameters {list(params)} don't match the columns {columns} of {output}"
+            )
+
+    runs = []
+    for params in configurations:
+        for seed in seeds:
+            config_id = configuration_id(params, seed, epochs, corpus_size, corpus_seed)
+            if config_id not in done:
+                runs.append(
+                    {
+                        "config_id": config_id,
+                        "seed": seed,
+                        "params": params,
+                        "epochs": epochs,
+                        "corpus_size": corpus_size,
+                        "corpus_seed": corpus_seed,
+                    }
+                )
+
+    print(f"[sweep] {len(runs)} runs left, {len(done)} already done")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    # a fresh process per run, the network state (e.g. episode tracker) and the configs are global
+    with multiprocessing.Pool(workers, maxtasksperchild=1) as pool:
+        for index, rows in enumerate(pool.imap_unordered(run_configuration, runs)):
+            pd.DataFrame(rows).to_csv(
+                output, mode="a", header=not os.path.exists(output), index=False
+            )
+            print(f"[sweep] {index + 1}/{len(runs)} {rows[-1]}")
+
+    return pd.read_csv(output)
+
+
+def summary(results):
+    """
+    last epoch scores of every configuration averaged over the seeds,
+    each run is taken at its own last epoch (e.g. the runs of different `epochs` are kept apart)
+    """
+    last = results[
+        results["epoch"] == results.groupby("config_id")["epoch"].transform("max")
+    ]
+    params = [
+        c for c in results.columns if c not in ["config_id", "seed", "epoch", *SCORES]
+    ]
+    return (
+        last.groupby(params, dropna=False)[SCORES]
+        .agg(["mean", "std"])
+        .sort_values(("f1", "mean"), ascending=False)
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    space = parser.add_mutually_exclusive_group(required=True)
+    space.add_argument("--grid", type=json.loads, help="json {param: [values]}")
+    space.add_argument("--random", type=json.loads, help="json {param: [low, high]}")
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--seeds", type=int, nargs="+", default=[42])
+    parser.add_argument("--epochs", type=int, default=epochs)
+    parser.add_argument("--corpus-size", type=int, default=1000)
+    parser.add_argument("--corpus-seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="out/sweep.csv")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    configurations = list(
+        grid_configurations(args.grid)
+        if args.grid is not None
+        else random_configurations(args.random, args.samples, seed=args.seeds[0])
+    )
+    results = sweep(
+        configurations,
+        args.seeds,
+        args.output,
+        epochs=args.epochs,
+        corpus_size=args.corpus_size,
+        corpus_seed=args.corpus_seed,
+        workers=args.workers,
+    )
+    print(summary(results))